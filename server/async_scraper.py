@@ -0,0 +1,252 @@
+"""
+asyncio client for realtor.com searches, property details and autocomplete
+
+`AsyncPropertyScraper` issues the same requests as DreameryPropertyScraper
+over one aiohttp connection pool, so a single event loop can keep hundreds
+of slow upstream calls in flight without a thread per request. Query
+compilation, search variables, page decoding and parsing are delegated to a
+wrapped DreameryPropertyScraper, so both clients return identical results.
+
+Searches that fan out into many sub-queries (comps beyond one page, long
+date ranges) run the thread-based planners from search_planner in a worker
+thread.
+
+    async with AsyncPropertyScraper() as scraper:
+        properties = await scraper.search_properties(location="Dallas, TX", limit=50)
+"""
+
+import asyncio
+import logging
+from itertools import islice
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from dedup import Deduplicator
+from dreamery_property_scraper import DreameryPropertyScraper, _persisted_query_error
+from exceptions import AuthenticationError, ScrapingError
+from json_backend import dumps_str, loads
+from metrics import HTTP_RETRIES, RATE_LIMITED, record_cache_lookup, stage_timer
+from queries import (
+    DATE_FILTER_FIELDS, STATUS_FILTERS, CompiledQuery, compile_home_query, compile_search_query, date_bounded,
+    normalize_field_groups, normalize_property_types, range_filters_in
+)
+from raw_filters import RawFilter
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPropertyScraper:
+    """Async counterpart of DreameryPropertyScraper's search, detail and autocomplete calls"""
+
+    # Same policy as the sync session's InstrumentedRetry
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 4
+    BACKOFF_MAX = 120
+    RETRY_STATUSES = frozenset({429, 403})
+    # Simultaneous upstream connections per event loop
+    CONNECTION_LIMIT = 100
+
+    def __init__(self, base_url: Optional[str] = None, use_persisted_queries: bool = False,
+                 connection_limit: Optional[int] = None, timeout: float = 30.0):
+        """
+        :param base_url: Serve every realtor.com endpoint from this origin (see DreameryPropertyScraper)
+        :param connection_limit: Upper bound on open upstream connections (default CONNECTION_LIMIT)
+        """
+        self._scraper = DreameryPropertyScraper(base_url=base_url, use_persisted_queries=use_persisted_queries)
+        self.connection_limit = connection_limit or self.CONNECTION_LIMIT
+        self.timeout = timeout
+        self.proxies = self._scraper.proxies
+        self.access_token: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncPropertyScraper":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the connection pool"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared aiohttp session, created on first use inside the running loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit),
+                headers=self._scraper._headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                json_serialize=dumps_str,
+            )
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Seconds to wait before retry number `attempt + 1` (urllib3's schedule, Retry-After first)"""
+        if retry_after and retry_after.isdigit() and int(retry_after) > 0:
+            return float(retry_after)
+        if attempt == 0:
+            return 0.0
+        return min(self.BACKOFF_FACTOR * 2 ** attempt, self.BACKOFF_MAX)
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        """Send a request with the sync session's retry policy and decode the JSON body"""
+        host = urlsplit(url).hostname or "unknown"
+        proxy = self.proxies.get(urlsplit(url).scheme)
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                async with self.session.request(method, url, proxy=proxy, **kwargs) as response:
+                    status = response.status
+                    retry_after = response.headers.get("Retry-After")
+                    body = await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.MAX_RETRIES:
+                    raise
+                HTTP_RETRIES.labels(host=host, reason=type(e).__name__).inc()
+                await asyncio.sleep(self._backoff(attempt, None))
+                continue
+
+            if status not in self.RETRY_STATUSES:
+                return loads(body)
+            if status == 429:
+                RATE_LIMITED.labels(source=host, kind="upstream_429").inc()
+            if attempt == self.MAX_RETRIES:
+                raise ScrapingError(f"{method} {url} still answered {status} after {self.MAX_RETRIES} retries")
+            HTTP_RETRIES.labels(host=host, reason=str(status)).inc()
+            await asyncio.sleep(self._backoff(attempt, retry_after if status == 429 else None))
+
+    async def get_access_token(self) -> str:
+        """Get access token for Realtor.com API"""
+        if self.access_token:
+            return self.access_token
+
+        async with self._token_lock:
+            if self.access_token:
+                return self.access_token
+            headers, body = self._scraper._token_request()
+            with stage_timer("scraper.token", in_flight=True):
+                data = await self._request("POST", self._scraper.AUTH_TOKEN_URL, headers=headers, data=body)
+            if not (access_token := data.get("access_token")):
+                raise AuthenticationError(
+                    "Failed to get access token, use a proxy/vpn or wait a moment and try again."
+                )
+            self.access_token = access_token
+            return access_token
+
+    async def handle_location(self, location: str) -> Optional[Dict[str, Any]]:
+        """Best autocomplete match for `location`, or None"""
+        try:
+            with stage_timer("scraper.autocomplete", in_flight=True):
+                response_json = await self._request(
+                    "GET", self._scraper.ADDRESS_AUTOCOMPLETE_URL,
+                    params=self._scraper._autocomplete_params(location),
+                )
+            result = response_json["autocomplete"]
+            return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Location lookup failed: {e}")
+            return None
+
+    async def _post_graphql(self, compiled: CompiledQuery, variables: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """POST a compiled query, by persisted-query hash first when enabled"""
+        url = self._scraper.SEARCH_GQL_URL
+        payload = {"operationName": compiled.operation_name, "variables": variables}
+
+        if self._scraper.use_persisted_queries:
+            response_json = await self._request(
+                "POST", url, json={**payload, "extensions": compiled.persisted_query_extension}
+            )
+            error = _persisted_query_error(response_json)
+            record_cache_lookup("persisted_query", error is None)
+            if error is None:
+                return response_json
+            if error == "PersistedQueryNotSupported":
+                logger.info("Persisted queries not supported by the server, sending full documents")
+                self._scraper.use_persisted_queries = False
+            else:
+                payload["extensions"] = compiled.persisted_query_extension
+
+        payload["query"] = compiled.document
+        return await self._request("POST", url, json=payload)
+
+    async def _get_home(self, property_id: str) -> Optional[Dict[str, Any]]:
+        """The raw GraphQL home, or None when not found"""
+        with stage_timer("scraper.property_details", in_flight=True):
+            response_json = await self._post_graphql(compile_home_query(), {"property_id": property_id})
+        return ((response_json or {}).get("data") or {}).get("home")
+
+    async def get_property_details(self, property_id: str) -> List[Any]:
+        """The property as a one-element list of `Property`, or [] when not found"""
+        try:
+            home = await self._get_home(property_id)
+            return [self._scraper._format_property_for_dreamery(home)] if home else []
+        except Exception as e:
+            logger.error(f"Failed to get property details: {e}")
+            return []
+
+    async def search_properties(self,
+                                location: str = "San Francisco, CA",
+                                listing_type: str = "for_sale",
+                                property_types: Optional[List[str]] = None,
+                                min_price: Optional[int] = None,
+                                max_price: Optional[int] = None,
+                                beds: Optional[int] = None,
+                                baths: Optional[int] = None,
+                                sqft_min: Optional[int] = None,
+                                sqft_max: Optional[int] = None,
+                                radius: Optional[float] = None,
+                                past_days: Optional[int] = None,
+                                date_from: Optional[str] = None,
+                                date_to: Optional[str] = None,
+                                limit: int = 50,
+                                field_groups: Union[str, List[str], None] = None,
+                                deduplicator: Optional[Deduplicator] = None,
+                                raw_filter: Union[RawFilter, Dict[str, Any], None] = None) -> List[Any]:
+        """Same parameters and results as DreameryPropertyScraper.search_properties"""
+        field_groups = normalize_field_groups(field_groups)
+        property_types = normalize_property_types(property_types)
+        raw_filter = RawFilter.coerce(raw_filter)
+        scraper = self._scraper
+        if listing_type not in STATUS_FILTERS:
+            listing_type = "for_sale"
+        try:
+            location_info = await self.handle_location(location)
+            if not location_info:
+                logger.error(f"Could not find location: {location}")
+                return []
+
+            search_variables = scraper._build_search_variables(
+                location_info, listing_type, property_types, min_price, max_price, beds, baths,
+                sqft_min, sqft_max, radius, past_days, limit, date_from=date_from, date_to=date_to
+            )
+            search_type = scraper._determine_search_type(location_info, radius)
+            if search_type == "single_property":
+                home = await self._get_home(location_info["mpr_id"])
+                homes = raw_filter.filter([home] if home else [])
+                return [scraper._format_property_for_dreamery(home) for home in homes]
+
+            date_field = DATE_FILTER_FIELDS[listing_type] if date_bounded(search_variables) else None
+            if (search_type == "comps" or date_field) and limit > scraper.DEFAULT_PAGE_SIZE:
+                # Planned fan-out searches run on the sync client's thread pools
+                return await asyncio.to_thread(
+                    scraper._perform_general_search, search_variables, search_type, limit,
+                    field_groups=field_groups, listing_type=listing_type, deduplicator=deduplicator,
+                    property_types=property_types, raw_filter=raw_filter,
+                )
+
+            compiled = compile_search_query(search_type, field_groups, date_field, listing_type=listing_type,
+                                            property_types=property_types,
+                                            range_filters=range_filters_in(search_variables))
+            with stage_timer("scraper.graphql_page", in_flight=True):
+                response_json = await self._post_graphql(compiled, search_variables)
+            homes, _ = scraper._search_page_results(compiled, response_json)
+            homes = islice((deduplicator or Deduplicator()).filter(raw_filter.filter(homes)), limit)
+            return [scraper._format_property_for_dreamery(home) for home in homes]
+        except Exception as e:
+            logger.error(f"Property search failed: {e}")
+            return []
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Columnar results: pandas then convert, against columnar.to_arrow / to_polars
+
+Parses synthetic homes (synthetic_data.py) once, then builds the result the
+way an analysis job had to before (the scrape_property pandas frame, then
+pa.Table.from_pandas / pl.from_pandas) and the way return_type="arrow" /
+"polars" does now (columnar.to_arrow / to_polars straight from the parsed
+properties). Reports wall time and peak traced memory per row count; a
+library that is not installed is skipped.
+
+Usage (from the server directory):
+    python benchmarks/bench_columnar.py --rows 1000,10000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import columnar
+from processors import process_property
+from synthetic_data import synthesize_homes
+from utils import ordered_properties, process_result
+
+
+def pandas_frame(properties) -> pd.DataFrame:
+    """The scrape_property pandas result"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=FutureWarning)
+        frame = pd.concat([process_result(prop) for prop in properties], ignore_index=True)[ordered_properties]
+        return frame.replace({"None": pd.NA, None: pd.NA, "": pd.NA})
+
+
+def paths():
+    """(name, build) for every conversion whose library is installed"""
+    found = [("pandas", pandas_frame)]
+    try:
+        columnar.require("arrow")
+    except ImportError as e:
+        print(f"skipping arrow: {e}")
+    else:
+        import pyarrow as pa
+
+        found += [
+            ("pandas→arrow", lambda properties: pa.Table.from_pandas(pandas_frame(properties), preserve_index=False)),
+            ("arrow", columnar.to_arrow),
+        ]
+    try:
+        columnar.require("polars")
+    except ImportError as e:
+        print(f"skipping polars: {e}")
+    else:
+        import polars as pl
+
+        found += [
+            ("pandas→polars", lambda properties: pl.from_pandas(pandas_frame(properties))),
+            ("polars", columnar.to_polars),
+        ]
+    return found
+
+
+def measure(build, properties, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(properties)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    build(properties)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1000,10000", help="Comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per path (best is reported)")
+    args = parser.parse_args()
+
+    builds = paths()
+    print(f"{'rows':>7} {'path':>14} {'best s':>8} {'peak MB':>8}")
+    for rows in (int(count) for count in args.rows.split(",")):
+        properties = [prop for prop in (process_property(home) for home in synthesize_homes(rows)) if prop]
+        for name, build in builds:
+            elapsed, peak = measure(build, properties, args.repeat)
+            print(f"{rows:>7} {name:>14} {elapsed:>8.3f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
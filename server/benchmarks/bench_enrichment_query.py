@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark the enrichment candidate selection on a generated SQLite table
+
+Builds a `properties` table (default 1M rows) where most rows were enriched
+recently, times `enrichment_candidates_query` before and after
+`apply_migrations`, and prints SQLite's query plan for both so the switch
+from a full table scan to an index range scan is visible.
+
+Usage:
+    python benchmarks/bench_enrichment_query.py --rows 1000000 --limit 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from properties_schema import apply_migrations, enrichment_candidates_query, properties_table
+
+
+def populate(engine, rows: int, stale_fraction: float, seed: int = 7) -> None:
+    """Fill the table; `stale_fraction` of the rows need enrichment"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    properties_table.create(engine)
+    # Drop the index created with the table so the baseline is measured without it
+    with engine.begin() as conn:
+        for index in properties_table.indexes:
+            conn.execute(text(f"DROP INDEX {index.name}"))
+
+    chunk = []
+    with engine.begin() as conn:
+        insert = properties_table.insert()
+        for i in range(rows):
+            has_coordinates = rng.random() > 0.05
+            if rng.random() < stale_fraction:
+                enrichment_date = None if rng.random() < 0.5 else now - timedelta(days=rng.randint(31, 400))
+            else:
+                enrichment_date = now - timedelta(days=rng.randint(0, 29), seconds=rng.randint(0, 86399))
+            chunk.append({
+                "property_id": f"M{i:09d}",
+                "address": '{"formatted_address": "1 Main St"}',
+                "latitude": 37.0 + rng.random() if has_coordinates else None,
+                "longitude": -122.0 - rng.random() if has_coordinates else None,
+                "list_price": rng.randint(100_000, 3_000_000),
+                "description": "{}",
+                "enrichment_date": enrichment_date,
+                "created_at": now,
+            })
+            if len(chunk) == 50_000:
+                conn.execute(insert, chunk)
+                chunk.clear()
+        if chunk:
+            conn.execute(insert, chunk)
+
+
+def explain(engine, params: dict) -> str:
+    query = enrichment_candidates_query(True, True)
+    compiled = query.compile(engine)
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled.string}",
+            tuple(compiled.construct_params(params)[name] for name in compiled.positiontup),
+        ).fetchall()
+    return "\n".join(f"    {row[-1]}" for row in plan)
+
+
+def time_query(engine, params: dict, repeats: int) -> float:
+    query = enrichment_candidates_query(True, True)
+    timings = []
+    with engine.connect() as conn:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            conn.execute(query, params).fetchall()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrichment selection index benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to generate")
+    parser.add_argument("--stale-fraction", type=float, default=0.01,
+                        help="Fraction of rows that need enrichment")
+    parser.add_argument("--limit", type=int, default=500, help="LIMIT used by the selection")
+    parser.add_argument("--days-since-enrichment", type=int, default=30)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--db-path", type=str, default=None,
+                        help="SQLite file to use (default: a temporary file)")
+    args = parser.parse_args()
+
+    db_path = args.db_path or os.path.join(tempfile.mkdtemp(), "bench_properties.db")
+    engine = create_engine(f"sqlite:///{db_path}")
+    params = {
+        "cutoff": datetime.now() - timedelta(days=args.days_since_enrichment),
+        "limit": args.limit,
+    }
+
+    print(f"Generating {args.rows:,} rows in {db_path} ...")
+    start = time.perf_counter()
+    populate(engine, args.rows, args.stale_fraction)
+    print(f"  done in {time.perf_counter() - start:.1f}s")
+
+    print("\nWithout index:")
+    print(explain(engine, params))
+    before_ms = time_query(engine, params, args.repeats)
+    print(f"  median {before_ms:.2f} ms")
+
+    apply_migrations(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    print("\nWith index:")
+    print(explain(engine, params))
+    after_ms = time_query(engine, params, args.repeats)
+    print(f"  median {after_ms:.2f} ms")
+
+    print(f"\nSpeedup: {before_ms / after_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+CLI export: DataFrame to_csv/to_excel against export_writers streaming
+
+Parses synthetic homes (synthetic_data.py) and writes them to CSV or .xlsx
+the way cli.py used to (every property → process_result → one DataFrame →
+to_csv/to_excel) and the way it does now (property_row per property →
+export_writers.write_rows, parsing in the producer thread). Reports wall
+time and peak traced memory for each row count; the streaming peak should
+not grow with the rows.
+
+Usage (from the server directory):
+    python benchmarks/bench_export_writers.py --rows 1000,5000,20000 --format csv
+    python benchmarks/bench_export_writers.py --rows 5000 --format xlsx
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from export_writers import write_rows
+from processors import process_property
+from synthetic_data import synthesize_homes
+from utils import ordered_properties, process_result, property_row
+
+
+def _properties(homes):
+    return (prop for prop in (process_property(home) for home in homes) if prop)
+
+
+def dataframe_export(homes, path: str):
+    frames = [process_result(prop) for prop in _properties(homes)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=FutureWarning)
+        frame = pd.concat(frames, ignore_index=True)[ordered_properties].replace({"None": pd.NA, None: pd.NA, "": pd.NA})
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_excel(path, index=False)
+
+
+def streaming_export(homes, path: str):
+    write_rows((property_row(prop) for prop in _properties(homes)), path, ordered_properties)
+
+
+def measure(export, homes, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    export(homes, path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1000,5000,20000", help="Comma-separated row counts")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    args = parser.parse_args()
+
+    print(f"{'rows':>7} {'path':>10} {'wall s':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in (int(count) for count in args.rows.split(",")):
+            for name, export in (("dataframe", dataframe_export), ("streaming", streaming_export)):
+                # Synthesized before tracing starts, so only what the export allocates is measured
+                homes = iter(synthesize_homes(rows))
+                elapsed, peak = measure(export, homes, os.path.join(directory, f"{name}.{args.format}"))
+                print(f"{rows:>7} {name:>10} {elapsed:>8.2f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Cold-start import time of the CLI and API entry points
+
+Imports each module in a fresh interpreter under `python -X importtime`
+(--runs times) and reports the median cumulative import time, the modules
+with the most self time, and which heavy optional modules (pandas, numpy,
+openpyxl, ...) were pulled in. tests/test_import_time.py enforces the
+same budgets.
+
+Usage (from the server directory):
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --modules cli,realtor_api --runs 9 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median cumulative import time per entry point, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "cli": 50,
+    "scraper_api": 500,
+    "realtor_api": 700,
+    "realtor_asgi": 900,
+}
+
+# Only loaded on paths that build DataFrames, Excel files or compact tables
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "pyarrow", "bs4")
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """(self µs, cumulative µs) of every module loaded by `import module` in a fresh interpreter"""
+    # -X importtime also lists failed optional imports (e.g. pandas probing for pyarrow); keep only loaded ones
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys, {module}; print(*sys.modules, sep='\\n')"],
+        cwd=SERVER_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            times.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    loaded = set(completed.stdout.split())
+    return {name: timing for name, timing in times.items() if name in loaded}
+
+
+def heavy_modules(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    """Top-level packages of HEAVY_MODULES that were imported"""
+    return sorted({name.split(".")[0] for name in times} & set(HEAVY_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(IMPORT_BUDGETS_MS), help="Comma-separated modules")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules (self time) to list")
+    args = parser.parse_args()
+
+    for module in args.modules.split(","):
+        runs = [import_times(module) for _ in range(args.runs)]
+        total_ms = statistics.median(times[module][1] for times in runs) / 1000
+        budget = IMPORT_BUDGETS_MS.get(module)
+        verdict = "" if budget is None else f" (budget {budget} ms, {'ok' if total_ms <= budget else 'OVER'})"
+        print(f"{module}: {total_ms:.0f} ms median of {args.runs}{verdict}, "
+              f"{len(runs[-1])} modules, heavy: {', '.join(heavy_modules(runs[-1])) or 'none'}")
+        slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"    {self_us / 1000:>7.1f} ms self {cumulative_us / 1000:>7.1f} ms cumulative  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Compare JSON backends on a 10k-property payload
+
+For every installed backend (orjson, msgspec, stdlib json) times:
+  - decode:  a synthetic 10k-home `home_search` response body
+  - encode:  10k parsed properties, as the API serves them
+             (python-mode `model_dump()` handed to the backend)
+The baseline row is the previous path: `model_dump(mode='json')` + `json.dumps`.
+
+Decoding a payload this size allocates millions of containers, and cyclic GC
+passes can take more time than the decoder itself. Use --no-gc to time the
+decoders alone.
+
+Usage (from the server directory):
+    python benchmarks/bench_json_backends.py --homes 10000 --repeat 3
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_backend import BACKEND_PREFERENCE, get_backend
+from processors import get_key, process_extra_property_details, process_property
+from synthetic_data import home_search_response, synthesize_homes
+
+
+def best_of(repeat, func):
+    """Fastest of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--homes", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-gc", action="store_true", help="Disable cyclic GC while timing")
+    args = parser.parse_args()
+
+    homes = synthesize_homes(args.homes, seed=7)
+    body = json.dumps(home_search_response(homes)).encode("utf-8")
+    properties = [
+        process_property(home, extra_property_data=True, get_key_func=get_key,
+                         process_extra_property_details_func=process_extra_property_details)
+        for home in homes
+    ]
+    print(f"Payload: {args.homes} homes, {len(body) / 1e6:.1f} MB response body"
+          f"{' (GC disabled)' if args.no_gc else ''}\n")
+    if args.no_gc:
+        gc.disable()
+
+    baseline_encode = best_of(args.repeat, lambda: json.dumps([p.model_dump(mode="json") for p in properties]))
+    print(f"{'backend':<10} {'decode':>10} {'encode':>10} {'encode vs baseline':>20}")
+    print(f"{'baseline':<10} {best_of(args.repeat, lambda: json.loads(body)):>9.3f}s {baseline_encode:>9.3f}s {'1.00x':>20}")
+
+    for name in BACKEND_PREFERENCE:
+        if name != "json" and get_backend(name).name != name:
+            print(f"{name:<10} {'not installed':>10}")
+            continue
+        backend = get_backend(name)
+        decode = best_of(args.repeat, lambda: backend.loads(body))
+        encode = best_of(args.repeat, lambda: backend.dumps([p.model_dump() for p in properties]))
+        print(f"{name:<10} {decode:>9.3f}s {encode:>9.3f}s {baseline_encode / encode:>19.2f}x")
+
+
+if __name__ == "__main__":
+    main()
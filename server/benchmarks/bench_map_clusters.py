@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Map clustering: latency and payload of /api/realtor/search/clusters
+
+Clusters `--points` coordinates clustered around US metro areas (as in
+bench_spatial_index.py) with map_clusters.MapClusterer for a 1280x800 px
+viewport at random places and several zoom levels. Reports cold (tiles
+computed) and warm (tiles cached) latency, the JSON payload of the cluster
+response, and the payload the same viewport would cost as full property
+dicts (property_to_dict of synthetic properties, per dict, times the
+properties the viewport covers).
+
+Usage (from the server directory):
+    python benchmarks/bench_map_clusters.py --points 1000000 --zooms 4,8,11,14 --viewports 50
+"""
+
+import argparse
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bench_spatial_index import clustered_points
+from json_backend import dumps
+from map_clusters import TILE_PIXELS, MapClusterer
+from processors import process_property
+from realtor_api import property_to_dict
+from spatial_index import IndexedPoints
+from synthetic_data import synthesize_homes
+
+VIEWPORT_PIXELS = (1280, 800)
+
+
+def viewport(lat: float, lon: float, zoom: int):
+    """(south, west, north, east) of a VIEWPORT_PIXELS map centered on (lat, lon)"""
+    scale = TILE_PIXELS * 2 ** zoom
+    x = (lon + 180) / 360 * scale
+    sin_lat = math.sin(math.radians(lat))
+    y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+    width, height = VIEWPORT_PIXELS
+
+    def latitude(pixel_y: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * pixel_y / scale))))
+
+    return (latitude(y + height / 2), (x - width / 2) / scale * 360 - 180,
+            latitude(y - height / 2), (x + width / 2) / scale * 360 - 180)
+
+
+def property_dict_bytes(sample: int = 200) -> float:
+    """Average JSON size of one full property dict"""
+    properties = [prop for prop in (process_property(home) for home in synthesize_homes(sample)) if prop]
+    return statistics.mean(len(dumps(property_to_dict(prop))) for prop in properties)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--zooms", default="4,8,11,14", help="Comma-separated zoom levels")
+    parser.add_argument("--viewports", type=int, default=50, help="Viewports per zoom level")
+    args = parser.parse_args()
+
+    latitudes, longitudes = clustered_points(args.points)
+    rng = np.random.default_rng(2)
+    prices = rng.lognormal(12.8, 0.5, args.points).round()
+    points = IndexedPoints.build([str(position) for position in range(args.points)], latitudes, longitudes, prices)
+    dict_bytes = property_dict_bytes()
+    print(f"{args.points} points; a full property dict is {dict_bytes / 1024:.1f} KB of JSON")
+
+    print(f"{'zoom':>4} {'cold p50 ms':>11} {'cold p99 ms':>11} {'warm p50 ms':>11} {'clusters':>8} {'points':>7} "
+          f"{'covered':>8} {'payload KB':>10} {'as dicts MB':>11}")
+    anchors = rng.integers(0, args.points, args.viewports)
+    for zoom in (int(value) for value in args.zooms.split(",")):
+        clusterer = MapClusterer(lambda: points)
+        cold, warm, clusters, singles, covered, payload = [], [], [], [], [], []
+        for anchor in anchors:
+            box = viewport(latitudes[anchor], longitudes[anchor], zoom)
+            start = time.perf_counter()
+            result = clusterer.clusters(*box, zoom)
+            cold.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            clusterer.clusters(*box, zoom)
+            warm.append((time.perf_counter() - start) * 1000)
+            clusters.append(len(result["clusters"]))
+            singles.append(len(result["points"]))
+            covered.append(result["total"])
+            payload.append(len(dumps({"success": True, **result})))
+            # Each viewport starts cold
+            clusterer = MapClusterer(lambda: points)
+        print(f"{zoom:>4} {np.median(cold):>11.1f} {np.percentile(cold, 99):>11.1f} {np.median(warm):>11.2f} "
+              f"{np.median(clusters):>8.0f} {np.median(singles):>7.0f} {np.median(covered):>8.0f} "
+              f"{np.median(payload) / 1024:>10.1f} {np.median(covered) * dict_bytes / 2**20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Parse throughput of parallel_parse.ParsePool by worker count
+
+Parses a synthetic page of raw homes (synthetic_data.py, 50k by default)
+in-process (1 worker) and in 2, 4 and 8 worker processes, and reports
+wall time, homes/s and speedup over one worker. Worker start-up is timed
+separately; a long-lived pool pays it once.
+
+Modes:
+  table   process_property, returned as compact.PropertyTable chunks (search_properties_* with compact=True)
+  frame   process_property + utils.process_result, returned as DataFrame chunks (scrape_property pandas path)
+
+Speedup is bounded by the CPUs this process may run on (printed first).
+
+Usage (from the server directory):
+    python benchmarks/bench_parallel_parse.py --homes 50000 --workers 1,2,4,8
+    python benchmarks/bench_parallel_parse.py --mode frame --homes 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parallel_parse import ParsePool, _available_cpus
+from synthetic_data import synthesize_homes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--homes", type=int, default=50_000)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--mode", choices=["table", "frame"], default="table")
+    parser.add_argument("--chunk-size", type=int, default=ParsePool.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    homes = synthesize_homes(args.homes)
+    print(f"{args.homes} synthetic homes, mode={args.mode}, {_available_cpus()} CPU(s) available\n")
+    print(f"{'workers':>8} {'start s':>8} {'parse s':>8} {'homes/s':>9} {'speedup':>8} {'rows':>7}")
+
+    baseline = None
+    for workers in (int(count) for count in args.workers.split(",")):
+        with ParsePool(workers=workers, chunk_size=args.chunk_size) as pool:
+            start = time.perf_counter()
+            if workers > 1:
+                # Start every worker (and its imports) before timing
+                list(pool.executor.map(abs, range(workers * 4)))
+            started = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = pool.parse(homes) if args.mode == "table" else pool.parse_frame(homes)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {started:>8.2f} {elapsed:>8.2f} {args.homes / elapsed:>9.0f} "
+              f"{baseline / elapsed:>7.2f}x {len(result):>7}")
+
+
+if __name__ == "__main__":
+    main()
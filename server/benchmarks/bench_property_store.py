@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Property store: saving a search, answering its repeat and indexed queries
+
+Parses synthetic homes (synthetic_data.py), saves them as one search in a
+temporary SQLite property store and times what scrape_property(store=...,
+max_age=...) and GET /api/realtor/store/properties then do: the repeat of
+the search (first `--page` results and all of them) and location/price/beds
+queries. Each query's SQLite plan is printed so a missing index shows up as
+a SCAN.
+
+Usage (from the server directory):
+    python benchmarks/bench_property_store.py --rows 5000 --page 200 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import sqlite
+
+from processors import process_property
+from property_store import PropertyStore, query_statement
+from synthetic_data import synthesize_homes
+
+
+def timed(func, repeat: int):
+    """(median seconds, last result) of `repeat` calls"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Properties in the stored search")
+    parser.add_argument("--page", type=int, default=200, help="Limit of the smaller repeat search")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    properties = [prop for prop in (process_property(home) for home in synthesize_homes(args.rows)) if prop]
+    sample = properties[0]
+    params = {"location": f"{sample.address.city}, {sample.address.state}", "listing_type": "FOR_SALE"}
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PropertyStore(f"sqlite:///{os.path.join(directory, 'store.db')}")
+        start = time.perf_counter()
+        store.save_search(params, properties, args.rows)
+        print(f"save_search: {len(properties)} properties in {time.perf_counter() - start:.2f} s")
+
+        measurements = [
+            (f"repeat search, limit {args.page}", lambda: store.fresh_search(params, args.page, 3600), None),
+            (f"repeat search, limit {args.rows}", lambda: store.fresh_search(params, args.rows, 3600), None),
+        ]
+        queries = [
+            ("state + city + min_beds", {"state": sample.address.state, "city": sample.address.city, "min_beds": 3}),
+            ("zip_code", {"zip_code": sample.address.zip}),
+            ("price range", {"min_price": 200_000, "max_price": 300_000}),
+            ("status + listed_after", {"status": sample.status, "listed_after": "2024-06-01"}),
+        ]
+        for name, filters in queries:
+            measurements.append((f"query {name}", lambda filters=filters: store.query(limit=args.page, **filters),
+                                 filters))
+
+        print(f"{'measurement':>36} {'median ms':>10} {'rows':>6}")
+        for name, func, filters in measurements:
+            elapsed, result = timed(func, args.repeat)
+            print(f"{name:>36} {elapsed * 1000:>10.1f} {len(result):>6}")
+            if filters is not None:
+                print(f"{'':>36} plan: {_plan(store, filters)}")
+
+
+def _plan(store: PropertyStore, filters) -> str:
+    """SQLite's plan of the query behind `store.query(**filters)`"""
+    statement = query_statement(**filters).compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    with store.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+
+if __name__ == "__main__":
+    main()
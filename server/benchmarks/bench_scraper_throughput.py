@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraper throughput against the local realtor.com stand-in
+
+Starts realtor_standin_server on a background thread, runs concurrent
+searches through DreameryPropertyScraper pointed at it, and reports
+searches/s, homes/s, per-search latency and how many injected 429/403
+responses the retry policy absorbed.
+
+Usage (from the server directory):
+    python benchmarks/bench_scraper_throughput.py --searches 200 --concurrency 8 --latency-ms 150
+    python benchmarks/bench_scraper_throughput.py --rate-429 0.1 --retry-after 1
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dreamery_property_scraper import DreameryPropertyScraper
+from realtor_standin_server import StandinConfig, serve_in_thread
+
+
+def run_search(base_url: str, location: str, extra_property_data: bool):
+    """One full search (autocomplete + home_search + parsing). Returns (homes, seconds)."""
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    start = time.perf_counter()
+    properties = scraper.search_properties_advanced(
+        location=location, limit=200, extra_property_data=extra_property_data
+    )
+    return len(properties), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--location", default="Dallas, TX")
+    parser.add_argument("--extra-property-data", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--total", type=int, default=1000)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-403", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=None)
+    args = parser.parse_args()
+
+    # Per-request access logs would dominate the output
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        page_size=args.page_size,
+        total=args.total,
+        rate_429=args.rate_429,
+        rate_403=args.rate_403,
+        retry_after=args.retry_after,
+    )
+    server, base_url = serve_in_thread(config)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(
+                lambda _: run_search(base_url, args.location, args.extra_property_data),
+                range(args.searches),
+            ))
+        elapsed = time.perf_counter() - start
+        stats = server.app.config["STANDIN_STATS"].snapshot()
+    finally:
+        server.shutdown()
+
+    homes = sum(count for count, _ in results)
+    latencies = sorted(seconds for _, seconds in results)
+    failed = sum(1 for count, _ in results if count == 0)
+
+    print(f"Stand-in: {config}")
+    print(f"Searches: {args.searches} at concurrency {args.concurrency} in {elapsed:.2f}s")
+    print(f"Throughput: {args.searches / elapsed:.1f} searches/s, {homes / elapsed:.0f} homes/s")
+    print(f"Search latency: p50 {statistics.median(latencies) * 1000:.0f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+    print(f"Empty searches (retries exhausted or errors): {failed}")
+    print("Stand-in responses:")
+    for key in sorted(stats):
+        print(f"  {key}: {stats[key]}")
+
+
+if __name__ == "__main__":
+    main()
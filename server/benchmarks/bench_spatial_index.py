@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Spatial index: bbox and radius query latency at 1M points
+
+Generates `--points` coordinates clustered around US metro areas (plus a
+rural background), builds a spatial_index.SpatialIndex and runs map
+viewport (bbox) and radius queries at random places where the homes are,
+reporting build time, index memory and p50/p95/p99 latency per query kind.
+A brute-force pass (vectorized haversine / comparisons over every point)
+gives the baseline the index is there to beat. The target is a p99 under
+10 ms at 1M points.
+
+Usage (from the server directory):
+    python benchmarks/bench_spatial_index.py --points 1000000 --queries 2000
+    python benchmarks/bench_spatial_index.py --points 1000000 --cell-degrees 0.02 --limit 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from spatial_index import DEFAULT_CELL_DEGREES, SpatialIndex, haversine_miles_array
+
+P99_TARGET_MS = 10.0
+
+
+def clustered_points(count: int, seed: int = 0):
+    """(latitudes, longitudes): 90% around 60 metro centers, 10% spread over the continental US"""
+    rng = np.random.default_rng(seed)
+    centers = np.column_stack([rng.uniform(26, 48, 60), rng.uniform(-122, -71, 60)])
+    urban = int(count * 0.9)
+    which = rng.integers(0, len(centers), urban)
+    spread = rng.uniform(0.05, 0.3, len(centers))[which]
+    latitudes = np.concatenate([centers[which, 0] + rng.normal(0, 1, urban) * spread,
+                                rng.uniform(25, 49, count - urban)])
+    longitudes = np.concatenate([centers[which, 1] + rng.normal(0, 1, urban) * spread,
+                                 rng.uniform(-124, -67, count - urban)])
+    return latitudes, longitudes
+
+
+def percentiles(samples_ms):
+    return np.percentile(samples_ms, [50, 95, 99])
+
+
+def run(name, queries, query, brute_force, brute_force_runs: int):
+    times = []
+    sizes = []
+    for arguments in queries:
+        start = time.perf_counter()
+        result = query(*arguments)
+        times.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(result[0] if isinstance(result, tuple) else result))
+    brute = []
+    for arguments in queries[:brute_force_runs]:
+        start = time.perf_counter()
+        brute_force(*arguments)
+        brute.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = percentiles(times)
+    flag = "ok" if p99 < P99_TARGET_MS else "OVER TARGET"
+    print(f"{name:>16} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {np.median(brute):>12.1f} {np.mean(sizes):>9.0f}  {flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per kind")
+    parser.add_argument("--cell-degrees", type=float, default=DEFAULT_CELL_DEGREES)
+    parser.add_argument("--limit", type=int, default=500, help="Result limit, as the API applies (0: none)")
+    parser.add_argument("--brute-force-runs", type=int, default=20)
+    args = parser.parse_args()
+    limit = args.limit or None
+
+    latitudes, longitudes = clustered_points(args.points)
+    start = time.perf_counter()
+    index = SpatialIndex(latitudes, longitudes, args.cell_degrees)
+    build = time.perf_counter() - start
+    print(f"{args.points} points, cell {args.cell_degrees}°: built in {build:.2f} s, {index.nbytes / 2**20:.0f} MB")
+
+    rng = np.random.default_rng(1)
+    anchors = rng.integers(0, args.points, args.queries)
+    viewports = [
+        (lat - height / 2, lon - width / 2, lat + height / 2, lon + width / 2)
+        for lat, lon, height, width in zip(latitudes[anchors], longitudes[anchors],
+                                           rng.uniform(0.02, 0.3, args.queries), rng.uniform(0.02, 0.4, args.queries))
+    ]
+
+    def bbox_brute_force(south, west, north, east):
+        return np.nonzero((latitudes >= south) & (latitudes <= north) & (longitudes >= west) & (longitudes <= east))[0]
+
+    def radius_brute_force(lat, lon, miles):
+        return np.nonzero(haversine_miles_array(lat, lon, latitudes, longitudes) <= miles)[0]
+
+    print(f"{'query':>16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'brute p50 ms':>12} {'avg rows':>9}")
+    run("bbox viewport", viewports, lambda *box: index.bbox(*box, limit=limit), bbox_brute_force,
+        args.brute_force_runs)
+    for miles in (0.5, 5.0):
+        circles = [(lat, lon, miles) for lat, lon in zip(latitudes[anchors], longitudes[anchors])]
+        run(f"radius {miles} mi", circles, lambda lat, lon, r: index.radius(lat, lon, r, limit=limit),
+            radius_brute_force, args.brute_force_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import io
+import json
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("pytest_benchmark")
+
+import requests
+from requests.adapters import HTTPAdapter
+from synthetic_data import (
+    autocomplete_response, home_detail_response, home_search_response,
+    recorded_homes, synthesize_homes
+)
+
+# Page sizes exercised by every parametrized benchmark
+PAGE_SIZES: Dict[str, int] = {
+    "small": len(recorded_homes()),
+    "page_200": 200,
+    "synthetic_10k": 10_000,
+}
+
+
+@pytest.fixture(scope="session", params=list(PAGE_SIZES))
+def page(request):
+    """(name, raw homes) for each recorded/synthetic page size"""
+    name = request.param
+    homes = recorded_homes() if name == "small" else synthesize_homes(PAGE_SIZES[name], seed=42)
+    return name, homes
+
+
+class RecordedTransport(HTTPAdapter):
+    """Transport adapter answering scraper requests from recorded responses, without network I/O"""
+
+    def __init__(self, homes):
+        super().__init__()
+        self.search_body = json.dumps(home_search_response(homes)).encode()
+        self.detail_body = json.dumps(home_detail_response()).encode()
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        if "suggest" in request.url:
+            location = parse_qs(urlparse(request.url).query).get("input", [""])[0]
+            body = json.dumps(autocomplete_response(location)).encode()
+        elif request.body and b"home_search" in (request.body if isinstance(request.body, bytes) else request.body.encode()):
+            body = self.search_body
+        else:
+            body = self.detail_body
+
+        response = requests.Response()
+        response.status_code = 200
+        # A readable body, so both .content and streamed iter_content() work
+        response.raw = io.BytesIO(body)
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+@pytest.fixture
+def recorded_transport(monkeypatch, page):
+    """Route every scraper HTTP request of the current test through RecordedTransport"""
+    transport = RecordedTransport(page[1])
+    monkeypatch.setattr(HTTPAdapter, "send", lambda adapter, request, **kwargs: transport.send(request, **kwargs))
+    return transport
+
+
+@pytest.fixture
+def track_memory(benchmark):
+    """Record the peak traced allocation of one extra call in the benchmark results.
+
+    The value lands in `extra_info` (and in saved runs via --benchmark-autosave),
+    and the call fails when it exceeds `budget_kb` so memory regressions break the
+    run just like `--benchmark-compare-fail` does for time.
+    """
+    def measure(func: Callable[[], object], budget_kb: float) -> float:
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_kb = peak / 1024
+        benchmark.extra_info["peak_memory_kb"] = round(peak_kb, 1)
+        benchmark.extra_info["memory_budget_kb"] = round(budget_kb, 1)
+        assert peak_kb <= budget_kb, f"peak memory {peak_kb:.0f} KB exceeds budget {budget_kb:.0f} KB"
+        return peak_kb
+
+    return measure
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+HTTP load test of the realtor search API against the local stand-in
+
+Starts realtor_standin_server on a background thread, serves realtor_api (or
+its ASGI variant realtor_asgi) pointed at it (REALTOR_BASE_URL) and drives
+POST /api/realtor/search from
+concurrent keep-alive clients for a fixed time at each concurrency level.
+Reports requests/s, latency percentiles and errors, so worker and thread
+counts in gunicorn.conf.py can be sized from numbers rather than guesses.
+
+Servers:
+  --server gunicorn   gunicorn -c gunicorn.conf.py realtor_api:app in a subprocess
+                      (--workers/--threads override the profile)
+  --server uvicorn    uvicorn realtor_asgi:app in a subprocess (--workers processes)
+  --server werkzeug   the threaded development server in this process
+  --target URL        an API already running elsewhere (start it with
+                      REALTOR_BASE_URL pointing at a stand-in)
+
+Usage (from the server directory):
+    python benchmarks/load_test.py --server gunicorn --workers 4 --threads 8 --concurrency 1,8,32
+    python benchmarks/load_test.py --server werkzeug --duration 10 --latency-ms 150
+
+    # Flask vs ASGI capacity on one core with slow upstream calls
+    python benchmarks/load_test.py --server gunicorn --workers 1 --threads 8 --one-core --latency-ms 1000 --page-size 5 --limit 5 --concurrency 8,32,128
+    python benchmarks/load_test.py --server uvicorn --workers 1 --one-core --latency-ms 1000 --page-size 5 --limit 5 --concurrency 8,32,128
+"""
+
+import argparse
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+from realtor_standin_server import StandinConfig, serve_in_thread
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, process=None, timeout: float = 30.0):
+    """Poll the health endpoint until the API answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"API server exited with status {process.returncode}")
+        try:
+            if requests.get(f"{url}/api/realtor/health", timeout=1).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API at {url} did not come up within {timeout:.0f}s")
+
+
+def _pin_to_first_core():
+    os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+
+def start_gunicorn(standin_url: str, workers: int, threads: int, one_core: bool = False):
+    """realtor_api under the production profile. Returns (process, url)."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        REALTOR_BASE_URL=standin_url,
+        DREAMERY_BIND=f"127.0.0.1:{port}",
+        DREAMERY_LOG_LEVEL="warning",
+        DREAMERY_ACCESS_LOG="",
+    )
+    if workers:
+        env["DREAMERY_WORKERS"] = str(workers)
+    if threads:
+        env["DREAMERY_THREADS"] = str(threads)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "realtor_api:app"],
+        cwd=SERVER_DIR, env=env, preexec_fn=_pin_to_first_core if one_core else None,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def start_uvicorn(standin_url: str, workers: int, one_core: bool = False):
+    """realtor_asgi under uvicorn. Returns (process, url)."""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "realtor_asgi:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers or 1), "--no-access-log", "--log-level", "warning"],
+        cwd=SERVER_DIR, env=dict(os.environ, REALTOR_BASE_URL=standin_url),
+        preexec_fn=_pin_to_first_core if one_core else None,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def start_werkzeug(standin_url: str):
+    """realtor_api on the threaded development server in this process. Returns (server, url)."""
+    from werkzeug.serving import make_server
+
+    os.environ["REALTOR_BASE_URL"] = standin_url
+    import realtor_api
+
+    server = make_server("127.0.0.1", 0, realtor_api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="realtor-api", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run_level(url: str, concurrency: int, duration: float, body: dict):
+    """Concurrent clients posting searches for `duration` seconds. Returns (latencies, status counts, elapsed)."""
+    deadline = time.monotonic() + duration
+
+    def client(_):
+        session = requests.Session()
+        latencies, statuses = [], Counter()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                response = session.post(f"{url}/api/realtor/search", json=body, timeout=120)
+                statuses[response.status_code] += 1
+            except requests.RequestException as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        return latencies, statuses
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for client_latencies, _ in results for latency in client_latencies)
+    statuses = sum((client_statuses for _, client_statuses in results), Counter())
+    return latencies, statuses, elapsed
+
+
+def percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=["gunicorn", "uvicorn", "werkzeug"], default="gunicorn")
+    parser.add_argument("--target", help="Load an already running API instead of starting one")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="gunicorn/uvicorn worker processes (default: the profile's / 1)")
+    parser.add_argument("--threads", type=int, default=0, help="gunicorn threads per worker (default: the profile's)")
+    parser.add_argument("--one-core", action="store_true", help="Pin the API server process(es) to one CPU")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated client counts")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--location", default="Dallas, TX")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stand-in latency per upstream request")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=200,
+                        help="Homes per upstream page; small pages isolate time spent waiting on upstream")
+    args = parser.parse_args()
+
+    # Per-request access logs would dominate the output
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    config = StandinConfig(latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms, page_size=args.page_size,
+                           rate_429=args.rate_429, retry_after=1 if args.rate_429 else None)
+    standin, standin_url = serve_in_thread(config)
+
+    api = None
+    try:
+        if args.target:
+            url = args.target.rstrip("/")
+            label = url
+        elif args.server == "gunicorn":
+            api, url = start_gunicorn(standin_url, args.workers, args.threads, args.one_core)
+            label = f"gunicorn (workers={args.workers or 'profile'}, threads={args.threads or 'profile'})"
+        elif args.server == "uvicorn":
+            api, url = start_uvicorn(standin_url, args.workers, args.one_core)
+            label = f"uvicorn realtor_asgi (workers={args.workers or 1})"
+        else:
+            api, url = start_werkzeug(standin_url)
+            label = "werkzeug (threaded)"
+        if args.one_core:
+            label += ", one core"
+        wait_until_up(url, api if isinstance(api, subprocess.Popen) else None)
+
+        body = {"location": args.location, "limit": args.limit}
+        print(f"API: {label}")
+        print(f"Stand-in: {config}\n")
+        print(f"{'clients':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  errors")
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            latencies, statuses, elapsed = run_level(url, concurrency, args.duration, body)
+            errors = {status: count for status, count in statuses.items() if status != 200}
+            print(f"{concurrency:>8} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+                  f"{statistics.median(latencies) * 1000 if latencies else float('nan'):>8.0f} "
+                  f"{percentile(latencies, 0.95) * 1000:>8.0f} {percentile(latencies, 0.99) * 1000:>8.0f}  "
+                  f"{errors or '-'}")
+        print(f"\nStand-in responses: {standin.app.config['STANDIN_STATS'].snapshot()}")
+    finally:
+        if isinstance(api, subprocess.Popen):
+            api.terminate()
+            api.wait(timeout=30)
+        elif api is not None:
+            api.shutdown()
+        standin.shutdown()
+
+
+if __name__ == "__main__":
+    main()
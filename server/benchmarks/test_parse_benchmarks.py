@@ -0,0 +1,106 @@
+"""
+Time and memory benchmarks for the scrape -> parse -> DataFrame path
+
+Run with:
+    python -m pytest benchmarks/test_parse_benchmarks.py --benchmark-autosave
+    python -m pytest benchmarks/test_parse_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:15%
+"""
+
+import pytest
+
+from dreamery_property_scraper import DreameryPropertyScraper
+from processors import get_key, process_extra_property_details, process_property
+from realtor_api import property_to_dict
+from scraper_api import scrape_property
+from utils import process_result
+
+# Peak traced allocation allowed per home, in KB (roughly 2x the measured values)
+MEMORY_BUDGET_KB_PER_HOME = {
+    "format_property_for_dreamery": 60,
+    "process_property": 60,
+    "process_result": 120,
+    "property_to_dict": 60,
+    "scrape_property": 250,
+}
+# Fixed overhead (pandas frames, response bodies, imports on first use)
+MEMORY_BUDGET_BASE_KB = 4_096
+
+
+def _budget(name, homes):
+    return MEMORY_BUDGET_BASE_KB + MEMORY_BUDGET_KB_PER_HOME[name] * len(homes)
+
+
+def _run(benchmark, page, func):
+    """Few rounds for the 10k page so the suite finishes in minutes"""
+    name, _ = page
+    if name == "synthetic_10k":
+        return benchmark.pedantic(func, rounds=3, iterations=1, warmup_rounds=0)
+    return benchmark(func)
+
+
+def _process_all(homes):
+    return [
+        process_property(
+            home,
+            extra_property_data=True,
+            get_key_func=get_key,
+            process_extra_property_details_func=process_extra_property_details,
+        )
+        for home in homes
+    ]
+
+
+def test_format_property_for_dreamery(benchmark, page, track_memory):
+    _, homes = page
+    scraper = DreameryPropertyScraper()
+
+    def run():
+        return [scraper._format_property_for_dreamery(home) for home in homes]
+
+    result = _run(benchmark, page, run)
+    assert len(result) == len(homes)
+    track_memory(run, _budget("format_property_for_dreamery", homes))
+
+
+def test_process_property(benchmark, page, track_memory):
+    _, homes = page
+
+    result = _run(benchmark, page, lambda: _process_all(homes))
+    assert all(prop is not None for prop in result)
+    track_memory(lambda: _process_all(homes), _budget("process_property", homes))
+
+
+def test_process_result(benchmark, page, track_memory):
+    _, homes = page
+    properties = _process_all(homes)
+
+    def run():
+        return [process_result(prop) for prop in properties]
+
+    result = _run(benchmark, page, run)
+    assert len(result) == len(homes)
+    track_memory(run, _budget("process_result", homes))
+
+
+def test_property_to_dict(benchmark, page, track_memory):
+    _, homes = page
+    properties = _process_all(homes)
+
+    def run():
+        return [property_to_dict(prop) for prop in properties]
+
+    result = _run(benchmark, page, run)
+    assert len(result) == len(homes)
+    track_memory(run, _budget("property_to_dict", homes))
+
+
+def test_scrape_property_end_to_end(benchmark, page, recorded_transport, track_memory):
+    _, homes = page
+
+    def run():
+        return scrape_property("Dallas, TX", listing_type="for_sale", limit=10_000)
+
+    result = _run(benchmark, page, run)
+    assert len(result) == len(homes)
+    assert recorded_transport.requests > 0
+    track_memory(run, _budget("scrape_property", homes))
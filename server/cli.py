@@ -7,7 +7,7 @@ import datetime
 import os
 import sys
 from pathlib import Path
-from scraper_api import scrape_property
+from json_backend import write_json
 
 
 def main():
@@ -135,6 +135,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help and usage errors skip the scraper's start-up cost
+    from scraper_api import iter_properties, scrape_property
+
     try:
         print(f"Scraping properties in {args.location}...")
         print(f"Listing type: {args.listing_type}")
@@ -165,6 +168,54 @@ def main():
         if args.date_from or args.date_to:
             print(f"Date range: {args.date_from or 'N/A'} to {args.date_to or 'N/A'}")
 
+        if args.output in ("excel", "csv") and args.return_type in ("pandas", "pydantic"):
+            # Rows are written as their pages are scraped and parsed
+            from export_writers import write_rows
+            from models import Property
+            from utils import ordered_properties, property_row
+
+            properties = iter_properties(
+                location=args.location,
+                listing_type=args.listing_type,
+                property_type=args.property_type,
+                radius=args.radius,
+                mls_only=args.mls_only,
+                past_days=args.days,
+                proxy=args.proxy,
+                date_from=args.date_from,
+                date_to=args.date_to,
+                foreclosure=args.foreclosure,
+                extra_property_data=args.extra_data,
+                exclude_pending=args.exclude_pending,
+                limit=args.limit,
+            )
+            if args.return_type == "pandas":
+                rows, columns = (property_row(prop) for prop in properties), ordered_properties
+            else:
+                rows = (prop.model_dump() for prop in properties)
+                columns = [*Property.model_fields, *Property.model_computed_fields]
+
+            # Generate filename if not provided
+            if not args.filename:
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                location_safe = args.location.replace(" ", "_").replace(",", "").replace(" ", "")
+                args.filename = f"DreameryProperties_{location_safe}_{timestamp}"
+
+            # Create output directory if it doesn't exist
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+            output_filename = output_dir / f"{args.filename}.{'xlsx' if args.output == 'excel' else 'csv'}"
+            data_count = write_rows(rows, output_filename, columns)
+            if not data_count:
+                output_filename.unlink()
+                print("No properties found.")
+                return
+
+            print(f"Found {data_count} properties")
+            print(f"{'Excel' if args.output == 'excel' else 'CSV'} file saved as {output_filename}")
+            return
+
         # Call the scraping API
         result = scrape_property(
             location=args.location,
@@ -202,19 +253,10 @@ def main():
             output_dir = Path(args.output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            # Save based on output format
-            if args.output == "excel":
-                output_filename = output_dir / f"{args.filename}.xlsx"
-                result.to_excel(output_filename, index=False)
-                print(f"Excel file saved as {output_filename}")
-            elif args.output == "csv":
-                output_filename = output_dir / f"{args.filename}.csv"
-                result.to_csv(output_filename, index=False)
-                print(f"CSV file saved as {output_filename}")
-            elif args.output == "json":
-                output_filename = output_dir / f"{args.filename}.json"
-                result.to_json(output_filename, orient='records', indent=2)
-                print(f"JSON file saved as {output_filename}")
+            # Excel and CSV are streamed above
+            output_filename = output_dir / f"{args.filename}.json"
+            result.to_json(output_filename, orient='records', indent=2)
+            print(f"JSON file saved as {output_filename}")
         
         elif args.return_type == "pydantic":
             if not result:
@@ -242,25 +284,10 @@ def main():
                 else:
                     data.append(property)
             
-            # Save based on output format
-            if args.output == "excel":
-                import pandas as pd
-                df = pd.DataFrame(data)
-                output_filename = output_dir / f"{args.filename}.xlsx"
-                df.to_excel(output_filename, index=False)
-                print(f"Excel file saved as {output_filename}")
-            elif args.output == "csv":
-                import pandas as pd
-                df = pd.DataFrame(data)
-                output_filename = output_dir / f"{args.filename}.csv"
-                df.to_csv(output_filename, index=False)
-                print(f"CSV file saved as {output_filename}")
-            elif args.output == "json":
-                import json
-                output_filename = output_dir / f"{args.filename}.json"
-                with open(output_filename, 'w') as f:
-                    json.dump(data, f, indent=2, default=str)
-                print(f"JSON file saved as {output_filename}")
+            # Excel and CSV are streamed above
+            output_filename = output_dir / f"{args.filename}.json"
+            write_json(output_filename, data)
+            print(f"JSON file saved as {output_filename}")
         
         else:  # raw
             if not result:
@@ -282,17 +309,13 @@ def main():
             
             # Save based on output format
             if args.output == "json":
-                import json
                 output_filename = output_dir / f"{args.filename}.json"
-                with open(output_filename, 'w') as f:
-                    json.dump(result, f, indent=2, default=str)
+                write_json(output_filename, result)
                 print(f"JSON file saved as {output_filename}")
             else:
                 print("Raw data can only be saved as JSON format")
-                import json
                 output_filename = output_dir / f"{args.filename}.json"
-                with open(output_filename, 'w') as f:
-                    json.dump(result, f, indent=2, default=str)
+                write_json(output_filename, result)
                 print(f"JSON file saved as {output_filename}")
 
     except Exception as e:
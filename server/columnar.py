@@ -0,0 +1,142 @@
+"""
+Arrow and polars results for scrape_property
+
+Analysis jobs used to take the pandas result and convert it, paying for a
+DataFrame per property, the concat, object-dtype inference and then the
+copy into Arrow / polars. `to_arrow` and `to_polars` build the table
+straight from parsed properties instead:
+
+  - each property is flattened once by utils.property_row (the same row the
+    pandas result is made of) and appended to plain per-column lists
+  - every column has a fixed type (`COLUMN_TYPES`, strings unless listed),
+    so nothing is inferred and a column that is empty on one search has the
+    same type as on the next; dates are date32 and the phone and tax
+    history columns are lists of structs
+  - missing values ("None", "" and None) are nulls, as in the pandas result
+
+pyarrow and polars are optional; each is imported only when its return type
+is requested.
+
+    table = scrape_property("Dallas, TX", return_type="arrow")
+"""
+
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
+
+from models import Property
+from utils import ordered_properties, property_row
+
+if TYPE_CHECKING:
+    import polars as pl
+    import pyarrow as pa
+
+# Type specs: a scalar type name, {field: spec} for a struct, [spec] for a list of spec
+_ASSESSMENT = {"building": "int64", "land": "int64", "total": "int64"}
+_PHONE = {"number": "string", "type": "string", "primary": "bool", "ext": "string"}
+_TAX_HISTORY = {
+    "assessment": _ASSESSMENT, "market": _ASSESSMENT, "appraisal": _ASSESSMENT, "value": _ASSESSMENT,
+    "tax": "int64", "year": "int64", "assessed_year": "int64",
+}
+
+# Columns of ordered_properties that are not strings
+COLUMN_TYPES: Dict[str, Any] = {
+    **dict.fromkeys(
+        ["beds", "full_baths", "half_baths", "sqft", "year_built", "days_on_mls", "list_price", "list_price_min",
+         "list_price_max", "sold_price", "last_sold_price", "assessed_value", "estimated_value", "tax",
+         "lot_sqft", "price_per_sqft", "stories", "hoa_fee"],
+        "int64",
+    ),
+    **dict.fromkeys(["latitude", "longitude", "parking_garage"], "float64"),
+    "new_construction": "bool",
+    **dict.fromkeys(["list_date", "pending_date", "last_sold_date"], "date"),
+    "agent_phones": [_PHONE],
+    "office_phones": [_PHONE],
+    "tax_history": [_TAX_HISTORY],
+}
+
+_MISSING = ("", "None")
+
+# Library behind each return type
+_LIBRARIES = {"arrow": "pyarrow", "polars": "polars"}
+
+
+def require(return_type: str):
+    """The library behind `return_type` ("arrow" or "polars"); ImportError with an install hint when missing"""
+    module = _LIBRARIES[return_type]
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(f"return_type={return_type!r} needs {module}: pip install {module}") from e
+
+
+def property_columns(properties: Iterable[Property]) -> Dict[str, List[Any]]:
+    """The rows of `properties` as one list per ordered_properties column, missing values as None"""
+    columns: Dict[str, List[Any]] = {name: [] for name in ordered_properties}
+    appends = [(name, columns[name].append) for name in ordered_properties]
+    for prop in properties:
+        row = property_row(prop)
+        for name, append in appends:
+            value = row[name]
+            append(None if isinstance(value, str) and value in _MISSING else value)
+    return columns
+
+
+def _dates(values: List[Optional[str]]) -> List[Optional[date]]:
+    # property_row writes dates as YYYY-MM-DD; a date string it passed through may carry a time
+    return [date.fromisoformat(value[:10]) if value else None for value in values]
+
+
+def _arrow_type(pa, spec):
+    if isinstance(spec, list):
+        return pa.list_(_arrow_type(pa, spec[0]))
+    if isinstance(spec, dict):
+        return pa.struct([(name, _arrow_type(pa, field)) for name, field in spec.items()])
+    return {"string": pa.string(), "int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_(),
+            "date": pa.date32()}[spec]
+
+
+def arrow_schema() -> "pa.Schema":
+    """Schema of `to_arrow` tables"""
+    pa = require("arrow")
+    return pa.schema([(name, _arrow_type(pa, COLUMN_TYPES.get(name, "string"))) for name in ordered_properties])
+
+
+def to_arrow(properties: Iterable[Property]) -> "pa.Table":
+    """`properties` as a pyarrow Table with `arrow_schema()`"""
+    pa = require("arrow")
+    schema = arrow_schema()
+    columns = property_columns(properties)
+    return pa.Table.from_arrays([
+        pa.array(_dates(columns[field.name]) if field.type == pa.date32() else columns[field.name], field.type)
+        for field in schema
+    ], schema=schema)
+
+
+def _polars_type(pl, spec):
+    if isinstance(spec, list):
+        return pl.List(_polars_type(pl, spec[0]))
+    if isinstance(spec, dict):
+        return pl.Struct({name: _polars_type(pl, field) for name, field in spec.items()})
+    return {"string": pl.Utf8, "int64": pl.Int64, "float64": pl.Float64, "bool": pl.Boolean, "date": pl.Date}[spec]
+
+
+def polars_schema() -> Dict[str, "pl.DataType"]:
+    """Schema of `to_polars` frames"""
+    pl = require("polars")
+    return {name: _polars_type(pl, COLUMN_TYPES.get(name, "string")) for name in ordered_properties}
+
+
+def to_polars(properties: Iterable[Property]) -> "pl.DataFrame":
+    """`properties` as a polars DataFrame with `polars_schema()`"""
+    pl = require("polars")
+    schema = polars_schema()
+    columns = property_columns(properties)
+    return pl.DataFrame([
+        pl.Series(name, _dates(columns[name]) if dtype == pl.Date else columns[name], dtype=dtype)
+        for name, dtype in schema.items()
+    ])
+
+
+def to_columnar(properties: Iterable[Property], return_type: str) -> Union["pa.Table", "pl.DataFrame"]:
+    """`to_arrow` or `to_polars` by return type name"""
+    return to_arrow(properties) if return_type == "arrow" else to_polars(properties)
@@ -0,0 +1,409 @@
+"""
+Compact, array-backed container for large property result sets
+
+A parsed `Property` with its nested Address, Description, advertisers,
+photos and tax history costs several KB of Python objects. `PropertyTable`
+stores the scalar fields as columns instead:
+  - integers, floats, booleans and dates: NumPy arrays (+ validity masks)
+  - repeated strings (city, state, status, style, ...): interned dictionary codes
+  - unique strings (ids, urls, street lines): one UTF-8 buffer plus offsets
+
+Indexing or iterating yields `Property` views built on access. With
+`keep_details=True` the nested parts (advertisers, photos, tax history,
+...) are kept per row as zlib-compressed JSON and restored in the views;
+otherwise views carry the scalar fields only. `to_pandas()` hands the
+arrays to pandas without copying (strings excepted) and `to_arrow()` (needs
+pyarrow) wraps the buffers directly.
+
+    table = PropertyTable.from_properties(scraper.search_properties_advanced(...))
+    df = table.to_pandas()
+"""
+
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import json_backend
+from dedup import merge_records
+from models import Property
+
+# (column name, dotted path on Property, kind)
+COLUMNS: Tuple[Tuple[str, str, str], ...] = (
+    ("property_id", "property_id", "text"),
+    ("listing_id", "listing_id", "text"),
+    ("property_url", "property_url", "text"),
+    ("permalink", "permalink", "text"),
+    ("mls", "mls", "category"),
+    ("mls_id", "mls_id", "text"),
+    ("status", "status", "category"),
+    ("mls_status", "mls_status", "category"),
+    ("full_line", "address.full_line", "text"),
+    ("street", "address.street", "text"),
+    ("unit", "address.unit", "text"),
+    ("street_number", "address.street_number", "text"),
+    ("street_name", "address.street_name", "text"),
+    ("street_direction", "address.street_direction", "category"),
+    ("street_suffix", "address.street_suffix", "category"),
+    ("city", "address.city", "category"),
+    ("state", "address.state", "category"),
+    ("zip_code", "address.zip", "category"),
+    ("county", "county", "category"),
+    ("fips_code", "fips_code", "category"),
+    ("neighborhoods", "neighborhoods", "text"),
+    ("latitude", "latitude", "float"),
+    ("longitude", "longitude", "float"),
+    ("list_price", "list_price", "int"),
+    ("list_price_min", "list_price_min", "int"),
+    ("list_price_max", "list_price_max", "int"),
+    ("prc_sqft", "prc_sqft", "int"),
+    ("hoa_fee", "hoa_fee", "int"),
+    ("days_on_mls", "days_on_mls", "int"),
+    ("assessed_value", "assessed_value", "int"),
+    ("estimated_value", "estimated_value", "int"),
+    ("tax", "tax", "int"),
+    ("last_sold_price", "last_sold_price", "int"),
+    ("new_construction", "new_construction", "bool"),
+    ("list_date", "list_date", "datetime"),
+    ("pending_date", "pending_date", "datetime"),
+    ("last_sold_date", "last_sold_date", "datetime"),
+    ("style", "description.style", "category"),
+    ("type", "description.type", "category"),
+    ("name", "description.name", "text"),
+    ("beds", "description.beds", "int"),
+    ("full_baths", "description.baths_full", "int"),
+    ("half_baths", "description.baths_half", "int"),
+    ("sqft", "description.sqft", "int"),
+    ("lot_sqft", "description.lot_sqft", "int"),
+    ("sold_price", "description.sold_price", "int"),
+    ("year_built", "description.year_built", "int"),
+    ("parking_garage", "description.garage", "float"),
+    ("stories", "description.stories", "int"),
+    ("primary_photo", "description.primary_photo", "text"),
+    ("text", "description.text", "text"),
+)
+
+# Derived fields that are recomputed on the views
+_COMPUTED = {"address": {"formatted_address": True}}
+
+_NAT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _get(obj: Any, path: str) -> Any:
+    for name in path.split("."):
+        if obj is None:
+            return None
+        obj = getattr(obj, name, None)
+    return obj.value if isinstance(obj, Enum) else obj
+
+
+def _details_exclude() -> Dict[str, Any]:
+    """model_dump `exclude` spec for everything stored in columns"""
+    exclude: Dict[str, Any] = {}
+    for _, path, _ in COLUMNS:
+        parent, _, leaf = path.rpartition(".")
+        if parent:
+            exclude.setdefault(parent, {})[leaf] = True
+        else:
+            exclude[leaf] = True
+    for parent, names in _COMPUTED.items():
+        exclude.setdefault(parent, {}).update(names)
+    return exclude
+
+
+_DETAILS_EXCLUDE = _details_exclude()
+
+
+class _Column:
+    """Finished column; `value(i)` returns the Python value of row i"""
+    kind = ""
+
+    def value(self, index: int) -> Any:
+        raise NotImplementedError
+
+    def to_numpy(self) -> np.ndarray:
+        raise NotImplementedError
+
+    def to_pandas(self):
+        return self.to_numpy()
+
+    def to_arrow(self, pa):
+        raise NotImplementedError
+
+    @property
+    def nbytes(self) -> int:
+        raise NotImplementedError
+
+
+class _NumericColumn(_Column):
+    """int64/float64/bool/datetime64[us] values with a validity mask (floats use NaN)"""
+
+    def __init__(self, kind: str, values: np.ndarray, valid: Optional[np.ndarray]):
+        self.kind = kind
+        self.values = values
+        self.valid = valid
+
+    def value(self, index: int) -> Any:
+        if self.valid is not None and not self.valid[index]:
+            return None
+        value = self.values[index]
+        if self.kind == "float":
+            return None if np.isnan(value) else float(value)
+        # datetime64 NaT reads as None
+        return value.item()
+
+    def to_numpy(self) -> np.ndarray:
+        return self.values
+
+    def to_pandas(self):
+        import pandas as pd
+        if self.kind == "int":
+            return pd.arrays.IntegerArray(self.values, ~self.valid)
+        if self.kind == "bool":
+            return pd.arrays.BooleanArray(self.values, ~self.valid)
+        return self.values
+
+    def to_arrow(self, pa):
+        mask = None if self.valid is None else ~self.valid
+        return pa.array(self.values, mask=mask)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (self.valid.nbytes if self.valid is not None else 0)
+
+
+class _CategoryColumn(_Column):
+    """int32 codes into interned categories; -1 is null"""
+    kind = "category"
+
+    def __init__(self, codes: np.ndarray, categories: List[str]):
+        self.codes = codes
+        self.categories = categories
+
+    def value(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return None if code < 0 else self.categories[code]
+
+    def to_numpy(self) -> np.ndarray:
+        lookup = np.array(self.categories + [None], dtype=object)
+        return lookup[self.codes]
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.Categorical.from_codes(self.codes, categories=self.categories)
+
+    def to_arrow(self, pa):
+        indices = pa.array(self.codes, mask=self.codes < 0)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(self.categories, type=pa.string()))
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(len(category) + 49 for category in self.categories)
+
+
+class _TextColumn(_Column):
+    """UTF-8 bytes of every row in one buffer, sliced by int64 offsets"""
+    kind = "text"
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, valid: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self.valid = valid
+
+    def raw(self, index: int) -> Optional[bytes]:
+        if not self.valid[index]:
+            return None
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def value(self, index: int) -> Optional[str]:
+        raw = self.raw(index)
+        return None if raw is None else raw.decode("utf-8")
+
+    def to_numpy(self) -> np.ndarray:
+        return np.array([self.value(index) for index in range(len(self.valid))], dtype=object)
+
+    def to_arrow(self, pa):
+        return pa.LargeStringArray.from_buffers(
+            len(self.valid), pa.py_buffer(self.offsets), pa.py_buffer(self.data),
+            pa.py_buffer(np.packbits(self.valid, bitorder="little")),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.offsets.nbytes + self.valid.nbytes
+
+
+class _ColumnBuilder:
+    """Appends Python values into typed buffers; `finish()` wraps them without copying"""
+
+    _TYPECODES = {"int": "q", "float": "d", "bool": "b", "datetime": "q"}
+    _DTYPES = {"int": np.int64, "float": np.float64, "bool": np.bool_, "datetime": "datetime64[us]"}
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.valid = bytearray()
+        if kind == "category":
+            self.codes = array("i")
+            self.lookup: Dict[str, int] = {}
+        elif kind == "text":
+            self.data = bytearray()
+            self.offsets = array("q", [0])
+        else:
+            self.values = array(self._TYPECODES[kind])
+
+    def append(self, value: Any):
+        self.valid.append(value is not None)
+        if self.kind == "category":
+            self.codes.append(-1 if value is None else self.lookup.setdefault(str(value), len(self.lookup)))
+        elif self.kind == "text":
+            if value is not None:
+                self.data += value if isinstance(value, bytes) else str(value).encode("utf-8")
+            self.offsets.append(len(self.data))
+        elif self.kind == "datetime":
+            self.values.append(_NAT if value is None else _epoch_micros(value))
+        elif self.kind == "float":
+            self.values.append(float("nan") if value is None else float(value))
+        else:
+            self.values.append(0 if value is None else int(value))
+
+    def finish(self) -> _Column:
+        valid = np.frombuffer(self.valid, dtype=np.bool_) if self.valid else np.zeros(0, dtype=np.bool_)
+        if self.kind == "category":
+            return _CategoryColumn(_frombuffer(self.codes, np.int32), list(self.lookup))
+        if self.kind == "text":
+            return _TextColumn(np.frombuffer(self.data, dtype=np.uint8) if self.data else np.zeros(0, np.uint8),
+                               _frombuffer(self.offsets, np.int64), valid)
+        values = _frombuffer(self.values, self._DTYPES[self.kind] if self.kind != "datetime" else np.int64)
+        if self.kind == "datetime":
+            return _NumericColumn("datetime", values.view("datetime64[us]"), None)
+        if self.kind == "float":
+            return _NumericColumn("float", values, None)
+        return _NumericColumn(self.kind, values, valid)
+
+
+def _concat_columns(columns: List[_Column]) -> _Column:
+    """Columns of one kind appended in order; category codes are remapped onto the merged categories"""
+    first = columns[0]
+    if isinstance(first, _CategoryColumn):
+        lookup: Dict[str, int] = {}
+        codes = []
+        for column in columns:
+            remap = np.array([lookup.setdefault(category, len(lookup)) for category in column.categories] + [-1],
+                             dtype=np.int32)
+            codes.append(remap[column.codes])
+        return _CategoryColumn(np.concatenate(codes), list(lookup))
+    if isinstance(first, _TextColumn):
+        offsets, base = [np.zeros(1, dtype=np.int64)], 0
+        for column in columns:
+            offsets.append(column.offsets[1:] + base)
+            base += len(column.data)
+        return _TextColumn(np.concatenate([column.data for column in columns]), np.concatenate(offsets),
+                           np.concatenate([column.valid for column in columns]))
+    valid = None if first.valid is None else np.concatenate([column.valid for column in columns])
+    return _NumericColumn(first.kind, np.concatenate([column.values for column in columns]), valid)
+
+
+def _frombuffer(buffer: array, dtype) -> np.ndarray:
+    return np.frombuffer(buffer, dtype=dtype) if len(buffer) else np.zeros(0, dtype=dtype)
+
+
+def _epoch_micros(value: datetime) -> int:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+class PropertyTable(Sequence):
+    """Struct-of-arrays store of many properties; items are `Property` views built on access"""
+
+    def __init__(self, columns: Dict[str, _Column], length: int, details: Optional[_TextColumn] = None):
+        self.columns = columns
+        self._length = length
+        self._details = details
+
+    @classmethod
+    def from_properties(cls, properties: Iterable[Property], keep_details: bool = False) -> "PropertyTable":
+        """Build from parsed properties; accepts a generator so the objects can be dropped as they go"""
+        builders = {name: _ColumnBuilder(kind) for name, _, kind in COLUMNS}
+        details = _ColumnBuilder("text") if keep_details else None
+        length = 0
+        for prop in properties:
+            for name, path, _ in COLUMNS:
+                builders[name].append(_get(prop, path))
+            if details is not None:
+                dumped = prop.model_dump(exclude=_DETAILS_EXCLUDE, exclude_none=True)
+                details.append(zlib.compress(json_backend.dumps(dumped)) if dumped else None)
+            length += 1
+        return cls(
+            {name: builder.finish() for name, builder in builders.items()},
+            length,
+            details.finish() if details is not None else None,
+        )
+
+    @classmethod
+    def concat(cls, tables: Iterable["PropertyTable"]) -> "PropertyTable":
+        """One table with the rows of `tables` in order (e.g. chunks parsed by parallel_parse workers)"""
+        tables = list(tables)
+        if not tables:
+            return cls.from_properties([])
+        columns = {name: _concat_columns([table.columns[name] for table in tables]) for name, _, _ in COLUMNS}
+        details = None
+        if all(table._details is not None for table in tables):
+            details = _concat_columns([table._details for table in tables])
+        return cls(columns, sum(len(table) for table in tables), details)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Property, List[Property]]:
+        if isinstance(index, slice):
+            return [self._view(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PropertyTable index out of range")
+        return self._view(index)
+
+    def __iter__(self) -> Iterator[Property]:
+        return (self._view(index) for index in range(self._length))
+
+    def _view(self, index: int) -> Property:
+        data: Dict[str, Any] = {}
+        for name, path, _ in COLUMNS:
+            value = self.columns[name].value(index)
+            if value is None:
+                continue
+            parent, _, leaf = path.rpartition(".")
+            (data.setdefault(parent, {}) if parent else data)[leaf] = value
+        if self._details is not None:
+            raw = self._details.raw(index)
+            if raw:
+                data = merge_records(json_backend.loads(zlib.decompress(raw)), data)
+        return Property.model_validate(data)
+
+    def column(self, name: str) -> np.ndarray:
+        """One column as a NumPy array (int/bool nulls read as 0/False; see `to_pandas` for nullable types)"""
+        return self.columns[name].to_numpy()
+
+    def to_pandas(self):
+        """DataFrame of the scalar columns; numeric, date and category data are not copied"""
+        import pandas as pd
+        return pd.DataFrame({name: column.to_pandas() for name, column in self.columns.items()}, copy=False)
+
+    def to_arrow(self):
+        """pyarrow Table over the same buffers (requires pyarrow)"""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("PropertyTable.to_arrow() requires pyarrow (pip install pyarrow)") from e
+        return pa.table({name: column.to_arrow(pa) for name, column in self.columns.items()})
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers"""
+        total = sum(column.nbytes for column in self.columns.values())
+        return total + (self._details.nbytes if self._details is not None else 0)
@@ -0,0 +1,155 @@
+"""
+De-duplication of raw GraphQL homes across queries
+
+Comps searches, spatial tiles, date windows, several ZIP codes or repeated
+runs return the same home many times. `Deduplicator` drops the repeats on
+the raw dicts, before they are parsed into `Property` objects and DataFrame
+rows. Homes are keyed by `property_id`, or by `listing_id` when a home has
+no property_id.
+
+The seen-set is pluggable:
+  - ExactSeenSet: a set of ints (numeric ids) or strings; exact, ~70 bytes per id
+  - BloomSeenSet: fixed-size bit array, ~1.2 MB per million ids at a 1% false
+    positive rate. A false positive drops a genuinely new home, so use it only
+    for jobs too large to keep every id.
+
+`merge_records` lays one raw record over another (compact.PropertyTable uses
+it to restore a view's details).
+"""
+
+import hashlib
+import math
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from metrics import record_cache_lookup
+
+Key = Union[int, str]
+
+
+def home_key(home: Dict[str, Any]) -> Optional[Key]:
+    """Dedup key of a raw home: property_id (or listing_id), as an int when numeric"""
+    value = home.get("property_id")
+    prefix = ""
+    if value is None:
+        value = home.get("listing_id")
+        # Keep listing ids apart from property ids
+        prefix = "listing:"
+    if value is None:
+        return None
+    value = str(value)
+    return int(value) if value.isdigit() and not prefix else prefix + value
+
+
+class ExactSeenSet:
+    """Exact seen-set of home keys"""
+
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def add(self, key: Key) -> bool:
+        """Add `key`; True when it was not seen before"""
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class BloomSeenSet:
+    """Bloom filter seen-set; may report an unseen key as seen (never the reverse)"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, key: Key) -> List[int]:
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: Key) -> bool:
+        """Add `key`; True when it was (probably) not seen before"""
+        positions = self._positions(key)
+        bits = self._bits
+        with self._lock:
+            missing = [position for position in positions if not bits[position >> 3] & (1 << (position & 7))]
+            for position in missing:
+                bits[position >> 3] |= 1 << (position & 7)
+            if missing:
+                self._count += 1
+            return bool(missing)
+
+    def __contains__(self, key: Key) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        """Approximate number of distinct keys added"""
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def merge_records(base: Dict[str, Any], richer: Dict[str, Any]) -> Dict[str, Any]:
+    """`richer` laid over `base`: nested dicts merge, other non-empty values in `richer` win"""
+    merged = dict(base)
+    for key, value in richer.items():
+        if _is_empty(value):
+            continue
+        current = merged.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = merge_records(current, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class Deduplicator:
+    """Drops homes already seen by this job; share one instance across the queries of a job"""
+
+    def __init__(self, seen: Union[ExactSeenSet, BloomSeenSet, None] = None):
+        self.seen = seen if seen is not None else ExactSeenSet()
+        self.duplicates = 0
+
+    @classmethod
+    def bloom(cls, capacity: int = 1_000_000, error_rate: float = 0.01) -> "Deduplicator":
+        """Deduplicator backed by a Bloom filter sized for `capacity` ids"""
+        return cls(BloomSeenSet(capacity, error_rate))
+
+    def first_seen(self, home: Dict[str, Any]) -> bool:
+        """Record `home`; True when no home with its key was seen before (homes without ids always pass)"""
+        key = home_key(home)
+        if key is None:
+            return True
+        new = self.seen.add(key)
+        record_cache_lookup("dedup_seen", not new)
+        if not new:
+            self.duplicates += 1
+        return new
+
+    def filter(self, homes: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """The homes not seen before, in order"""
+        return (home for home in homes if self.first_seen(home))
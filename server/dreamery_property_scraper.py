@@ -1,18 +1,18 @@
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
 import json
+import os
 import uuid
-from typing import Dict, List, Dict, Optional, Union, Any, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Dict, Optional, Tuple, Union, Any, Union
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import logging
 import re
+import threading
 import time
 from urllib.parse import urlencode, urljoin
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from json import JSONDecodeError
 from models import PropertyData, Property, Address, Description, PropertyType, ListingType, SearchPropertyType, ReturnType, HomeFlags, PetPolicy, OpenHouse, Unit, HomeMonthlyFee, HomeOneTimeFee, HomeParkingDetails, PropertyDetails, Popularity, TaxRecord, PropertyEstimate, HomeEstimates, Advertisers, Agent, Office, Broker, Builder
 from parsers import (
@@ -20,12 +20,41 @@ from parsers import (
     parse_tax_record, parse_estimates, parse_neighborhoods, calculate_days_on_mls
 )
 from processors import process_property, process_extra_property_details, get_key
-from queries import HOMES_DATA, SEARCH_HOMES_DATA, GENERAL_RESULTS_QUERY, HOME_FRAGMENT
+from queries import (
+    GENERAL_RESULTS_QUERY, HOME_FRAGMENT,
+    DATE_FILTER_FIELDS, STATUS_FILTERS, CompiledQuery, compile_home_query, compile_search_query, date_bounded,
+    normalize_field_groups, normalize_property_types, range_filter_variables, range_filters_in
+)
 from enhanced_scraper import EnhancedScraper, ScraperInput
 from exceptions import AuthenticationError, ScrapingError, ValidationError, RateLimitError
+from json_backend import StreamedJSON, decode_response, decode_response_stream
+from metrics import InstrumentedRetry, record_cache_lookup, stage_timer, timed_stage
+from search_planner import DateWindowPlanner, SelectHomes, SpatialTilePlanner
+from dedup import Deduplicator
+from raw_filters import RawFilter
+
+if TYPE_CHECKING:
+    from compact import PropertyTable
+    from parallel_parse import ParsePool
 
 logger = logging.getLogger(__name__)
 
+_PERSISTED_QUERY_ERRORS = ("PersistedQueryNotFound", "PersistedQueryNotSupported")
+
+
+def _persisted_query_error(response_json: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The persisted-query error in a GraphQL response, if any"""
+    for error in (response_json or {}).get("errors") or []:
+        if error.get("message") in _PERSISTED_QUERY_ERRORS:
+            return error["message"]
+    return None
+
+
+def _timed(homes: Iterator[Dict[str, Any]], stage: str) -> Iterator[Dict[str, Any]]:
+    """`homes` with `stage` timed from the first to the last home taken"""
+    with stage_timer(stage):
+        yield from homes
+
 @dataclass
 class PropertyAddress:
     street: str
@@ -63,23 +92,43 @@ class DreameryPropertyScraper:
     PROPERTY_URL = "https://www.realtor.com/realestateandhomes-detail/"
     PROPERTY_GQL = "https://graph.realtor.com/graphql"
     ADDRESS_AUTOCOMPLETE_URL = "https://parser-external.geo.moveaws.com/suggest"
+    AUTH_TOKEN_URL = "https://graph.realtor.com/auth/token"
     NUM_PROPERTY_WORKERS = 20
     DEFAULT_PAGE_SIZE = 200
+    # Connections kept per host; covers the planners' and property workers' concurrency
+    POOL_MAXSIZE = 32
+    LISTING_TYPES = {
+        'for_sale': ListingType.FOR_SALE,
+        'for_rent': ListingType.FOR_RENT,
+        'sold': ListingType.SOLD,
+        'pending': ListingType.PENDING
+    }
+
+    def __init__(self, use_enhanced_session: bool = True, base_url: Optional[str] = None,
+                 use_persisted_queries: bool = False):
+        """
+        :param base_url: Serve every realtor.com endpoint from this origin instead
+            (e.g. the local stand-in at http://127.0.0.1:5055). Defaults to the
+            REALTOR_BASE_URL environment variable; unset means the live endpoints.
+        :param use_persisted_queries: Send GraphQL queries by hash first (Apollo-style
+            persisted queries), falling back to the full document when the server
+            does not know the hash.
+        """
+        self.use_persisted_queries = use_persisted_queries
+        base_url = base_url or os.getenv("REALTOR_BASE_URL")
+        if base_url:
+            self._use_base_url(base_url)
 
-    def __init__(self, use_enhanced_session: bool = True):
         if use_enhanced_session:
             # Use enhanced session management
-            self.session = requests.Session()
-            retries = Retry(
+            retries = InstrumentedRetry(
                 total=3, 
                 backoff_factor=4, 
                 status_forcelist=[429, 403], 
                 allowed_methods=frozenset(["GET", "POST"])
             )
-            adapter = HTTPAdapter(max_retries=retries)
-            self.session.mount("http://", adapter)
-            self.session.mount("https://", adapter)
-            self.session.headers.update({
+            self._adapter = HTTPAdapter(max_retries=retries, pool_maxsize=self.POOL_MAXSIZE)
+            self._headers = {
                 "accept": "application/json, text/javascript",
                 "accept-language": "en-US,en;q=0.9",
                 "cache-control": "no-cache",
@@ -95,50 +144,73 @@ class DreameryPropertyScraper:
                 "sec-fetch-mode": "cors",
                 "sec-fetch-site": "same-origin",
                 "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
-            })
+            }
         else:
             # Use legacy session management
-            self.session = requests.Session()
-            self.session.headers.update({
+            self._adapter = HTTPAdapter(pool_maxsize=self.POOL_MAXSIZE)
+            self._headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5',
                 'Accept-Encoding': 'gzip, deflate',
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1',
-            })
+            }
+        # Applied to every thread's session; set before the first request
+        self.proxies: Dict[str, str] = {}
+        self._local = threading.local()
+        self._token_lock = threading.Lock()
         
         self.base_url = "https://www.realtor.com"
         self.api_base = "https://www.realtor.com/api/v1"
         self.access_token = None
 
+    @property
+    def session(self) -> requests.Session:
+        """This thread's Session; every thread's Session shares one connection pool
+
+        A `requests.Session` is not safe to share between threads (its cookie
+        jar and adapters mutate per request), so each thread using the scraper
+        gets its own view mounted on the scraper's single HTTPAdapter, whose
+        urllib3 pool is thread-safe.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            session.headers.update(self._headers)
+            session.proxies.update(self.proxies)
+            self._local.session = session
+        return session
+
+    def _use_base_url(self, base_url: str):
+        """Point the search, detail, autocomplete and auth endpoints at `base_url`"""
+        base_url = base_url.rstrip("/")
+        self.SEARCH_GQL_URL = f"{base_url}/api/v1/rdc_search_srp?client_id=rdc-search-new-communities&schema=vesta"
+        self.PROPERTY_URL = f"{base_url}/realestateandhomes-detail/"
+        self.PROPERTY_GQL = f"{base_url}/graphql"
+        self.ADDRESS_AUTOCOMPLETE_URL = f"{base_url}/suggest"
+        self.AUTH_TOKEN_URL = f"{base_url}/auth/token"
+        logger.info(f"Using realtor.com endpoints at {base_url}")
+
     def get_access_token(self) -> str:
         """Get access token for Realtor.com API"""
         if self.access_token:
             return self.access_token
-            
-        device_id = str(uuid.uuid4()).upper()
 
-        response = requests.post(
-            "https://graph.realtor.com/auth/token",
-            headers={
-                "Host": "graph.realtor.com",
-                "Accept": "*/*",
-                "Content-Type": "Application/json",
-                "X-Client-ID": "rdc_mobile_native,iphone",
-                "X-Visitor-ID": device_id,
-                "X-Client-Version": "24.21.23.679885",
-                "Accept-Language": "en-US,en;q=0.9",
-                "User-Agent": "Realtor.com/24.21.23.679885 CFNetwork/1494.0.7 Darwin/23.4.0",
-            },
-            data=json.dumps({
-                "grant_type": "device_mobile",
-                "device_id": device_id,
-                "client_app_id": "rdc_mobile_native,24.21.23.679885,iphone",
-            }),
-        )
+        with self._token_lock:
+            # Another thread may have fetched it while this one waited
+            if self.access_token:
+                return self.access_token
+            return self._fetch_access_token()
+
+    def _fetch_access_token(self) -> str:
+        headers, body = self._token_request()
+        with stage_timer("scraper.token", in_flight=True):
+            response = requests.post(self.AUTH_TOKEN_URL, headers=headers, data=body)
 
-        data = response.json()
+        data = decode_response(response)
 
         if not (access_token := data.get("access_token")):
             raise AuthenticationError(
@@ -149,6 +221,27 @@ class DreameryPropertyScraper:
         self.access_token = access_token
         return access_token
 
+    @staticmethod
+    def _token_request() -> Tuple[Dict[str, str], str]:
+        """Headers and body of a device token request, for a fresh device id"""
+        device_id = str(uuid.uuid4()).upper()
+        headers = {
+            "Host": "graph.realtor.com",
+            "Accept": "*/*",
+            "Content-Type": "Application/json",
+            "X-Client-ID": "rdc_mobile_native,iphone",
+            "X-Visitor-ID": device_id,
+            "X-Client-Version": "24.21.23.679885",
+            "Accept-Language": "en-US,en;q=0.9",
+            "User-Agent": "Realtor.com/24.21.23.679885 CFNetwork/1494.0.7 Darwin/23.4.0",
+        }
+        body = json.dumps({
+            "grant_type": "device_mobile",
+            "device_id": device_id,
+            "client_app_id": "rdc_mobile_native,24.21.23.679885,iphone",
+        })
+        return headers, body
+
     @classmethod
     def from_scraper_input(cls, scraper_input: ScraperInput) -> 'DreameryPropertyScraper':
         """Create scraper instance from Pydantic ScraperInput"""
@@ -173,7 +266,7 @@ class DreameryPropertyScraper:
         if scraper_input.proxy:
             proxy_url = scraper_input.proxy
             proxies = {"http": proxy_url, "https": proxy_url}
-            scraper.session.proxies.update(proxies)
+            scraper.proxies.update(proxies)
         
         return scraper
     
@@ -189,10 +282,33 @@ class DreameryPropertyScraper:
                          sqft_max: Optional[int] = None,
                          radius: Optional[float] = None,
                          past_days: Optional[int] = None,
-                         limit: int = 50) -> List[Dict[str, Any]]:
+                         date_from: Optional[str] = None,
+                         date_to: Optional[str] = None,
+                         limit: int = 50,
+                         field_groups: Union[str, List[str], None] = None,
+                         deduplicator: Optional[Deduplicator] = None,
+                         raw_filter: Union[RawFilter, Dict[str, Any], None] = None) -> List[Dict[str, Any]]:
         """
         Search for properties using Realtor.com API
+
+        :param listing_type, property_types, min_price, max_price, beds, baths, sqft_min, sqft_max:
+            Filters applied by realtor.com itself (see queries.compile_search_query); `beds` and
+            `baths` are minimums. Unknown property types raise ValueError.
+        :param past_days, date_from, date_to: Only homes sold, pending or listed (by listing_type) in the
+            last `past_days` days or between the ISO dates `date_from` and `date_to`; either date alone
+            leaves that end open. Ranges with a start and more homes than one page are fetched as
+            parallel date windows when `limit` allows.
+        :param field_groups: Result field groups or preset to request (see queries.SEARCH_FIELD_GROUPS),
+            e.g. "map" for id, price, beds/baths, coordinates and the primary photo. Defaults to all.
+        :param deduplicator: Seen-set shared across the searches of a job (see dedup.Deduplicator);
+            homes it has already seen are dropped before parsing. Only homes that pass `raw_filter` are
+            recorded as seen. Each search dedupes its own results regardless.
+        :param raw_filter: raw_filters.RawFilter (or a dict of its fields) evaluated on the raw homes;
+            only survivors are parsed and count towards `limit`.
         """
+        field_groups = normalize_field_groups(field_groups)
+        property_types = normalize_property_types(property_types)
+        raw_filter = RawFilter.coerce(raw_filter)
         try:
             # Map listing types
             listing_type_map = {
@@ -212,7 +328,8 @@ class DreameryPropertyScraper:
             search_variables = self._build_search_variables(
                 location_info, listing_type_map.get(listing_type, 'for_sale'),
                 property_types, min_price, max_price, beds, baths, 
-                sqft_min, sqft_max, radius, past_days, limit
+                sqft_min, sqft_max, radius, past_days, limit,
+                date_from=date_from, date_to=date_to
             )
             
             # Determine search type
@@ -220,14 +337,67 @@ class DreameryPropertyScraper:
             
             # Perform search
             if search_type == "single_property":
-                return self._handle_single_property(location_info)
+                homes = raw_filter.filter(self._handle_single_property(location_info, format_results=False))
+                return [self._format_property_for_dreamery(home) for home in homes]
             else:
-                return self._perform_general_search(search_variables, search_type, limit)
+                return self._perform_general_search(search_variables, search_type, limit,
+                                                    field_groups=field_groups, listing_type=listing_type,
+                                                    property_types=property_types, deduplicator=deduplicator,
+                                                    raw_filter=raw_filter)
                 
         except Exception as e:
             logger.error(f"Property search failed: {e}")
             return []
 
+    def search_raw_homes(self,
+                         location: str,
+                         listing_type: str = "for_sale",
+                         property_types: Optional[Tuple[str, ...]] = None,
+                         min_price: Optional[int] = None,
+                         max_price: Optional[int] = None,
+                         beds: Optional[int] = None,
+                         baths: Optional[int] = None,
+                         sqft_min: Optional[int] = None,
+                         sqft_max: Optional[int] = None,
+                         radius: Optional[float] = None,
+                         past_days: Optional[int] = None,
+                         date_from: Optional[str] = None,
+                         date_to: Optional[str] = None,
+                         limit: int = 50,
+                         field_groups: Optional[Tuple[str, ...]] = None,
+                         deduplicator: Optional[Deduplicator] = None,
+                         raw_filter: Optional[RawFilter] = None,
+                         stream: bool = False) -> Optional[Iterable[Dict[str, Any]]]:
+        """
+        The raw GraphQL homes of a search, before any parsing (None when the location is unknown)
+
+        Takes normalized field groups, property types and raw filter; see search_properties for the rest.
+        A single page is decoded home by home while it downloads; iterate the result once. With
+        stream=True multi-page searches are also returned as an iterator, yielding each sub-query's
+        homes as its page arrives.
+        """
+        raw_filter = raw_filter or RawFilter()
+        location_info = self._handle_location(location)
+        if not location_info:
+            logger.error(f"Could not find location: {location}")
+            return None
+        
+        search_variables = self._build_search_variables(
+            location_info, self.LISTING_TYPES.get(listing_type, ListingType.FOR_SALE),
+            property_types, min_price, max_price, beds, baths, 
+            sqft_min, sqft_max, radius, past_days, limit,
+            date_from=date_from, date_to=date_to
+        )
+        search_type = self._determine_search_type(location_info, radius)
+        
+        if search_type == "single_property":
+            return list(raw_filter.filter(self._handle_single_property(location_info, format_results=False)))
+        return self._perform_general_search(search_variables, search_type, limit,
+                                            format_results=False, field_groups=field_groups,
+                                            listing_type=listing_type, property_types=property_types,
+                                            deduplicator=deduplicator, raw_filter=raw_filter,
+                                            stream=stream)
+
     def search_properties_advanced(self, 
                                  location: str = "San Francisco, CA",
                                  listing_type: str = "for_sale",
@@ -240,58 +410,71 @@ class DreameryPropertyScraper:
                                  sqft_max: Optional[int] = None,
                                  radius: Optional[float] = None,
                                  past_days: Optional[int] = None,
+                                 date_from: Optional[str] = None,
+                                 date_to: Optional[str] = None,
                                  limit: int = 50,
                                  mls_only: bool = False,
                                  extra_property_data: bool = False,
-                                 exclude_pending: bool = False) -> List[Property]:
+                                 exclude_pending: bool = False,
+                                 field_groups: Union[str, List[str], None] = None,
+                                 deduplicator: Optional[Deduplicator] = None,
+                                 raw_filter: Union[RawFilter, Dict[str, Any], None] = None,
+                                 compact: bool = False,
+                                 alt_photos: bool = True,
+                                 parse_pool: Optional["ParsePool"] = None) -> Union[List[Property], "PropertyTable"]:
         """
         Advanced property search using the new processors for comprehensive data extraction
+
+        With compact=True the results are returned as a compact.PropertyTable (array-backed,
+        an order of magnitude smaller than a list of Property objects) instead of a list.
+        alt_photos=False drops the alternate photos while parsing.
+
+        With a parallel_parse.ParsePool the homes are parsed in its worker processes. Pair it
+        with compact=True: a list result rebuilds every Property in this process.
         """
+        field_groups = normalize_field_groups(field_groups)
+        property_types = normalize_property_types(property_types)
+        raw_filter = RawFilter.coerce(raw_filter).with_options(mls_only, exclude_pending, listing_type)
         try:
-            # Map listing types
-            listing_type_map = {
-                'for_sale': ListingType.FOR_SALE,
-                'for_rent': ListingType.FOR_RENT,
-                'sold': ListingType.SOLD,
-                'pending': ListingType.PENDING
-            }
-            
-            # Get location info
-            location_info = self._handle_location(location)
-            if not location_info:
-                logger.error(f"Could not find location: {location}")
-                return []
-            
-            # Build search variables
-            search_variables = self._build_search_variables(
-                location_info, listing_type_map.get(listing_type, ListingType.FOR_SALE),
-                property_types, min_price, max_price, beds, baths, 
-                sqft_min, sqft_max, radius, past_days, limit
+            # Raw GraphQL homes, the processors do the parsing
+            properties = self.search_raw_homes(
+                location, listing_type, property_types, min_price, max_price, beds, baths, sqft_min, sqft_max,
+                radius, past_days, date_from, date_to, limit, field_groups=field_groups,
+                deduplicator=deduplicator, raw_filter=raw_filter
             )
+            if properties is None:
+                return []
             
-            # Determine search type
-            search_type = self._determine_search_type(location_info, radius)
-            
-            # Perform search
-            if search_type == "single_property":
-                properties = self._handle_single_property(location_info)
-            else:
-                properties = self._perform_general_search(search_variables, search_type, limit)
+            if parse_pool is not None:
+                # Parsed in worker processes, which hand back columnar chunks
+                table = parse_pool.parse(properties, mls_only=mls_only, extra_property_data=extra_property_data,
+                                         exclude_pending=exclude_pending,
+                                         listing_type=self.LISTING_TYPES.get(listing_type, ListingType.FOR_SALE),
+                                         alt_photos=alt_photos)
+                return table if compact else list(table)
             
             # Process properties using the new processors
-            processed_properties = []
-            for prop in properties:
-                processed_prop = self._process_property_with_processors(
-                    prop,
-                    mls_only=mls_only,
-                    extra_property_data=extra_property_data,
-                    exclude_pending=exclude_pending,
-                    listing_type=listing_type_map.get(listing_type, ListingType.FOR_SALE)
+            processed_properties = (
+                processed_prop for processed_prop in (
+                    self._process_property_with_processors(
+                        prop,
+                        mls_only=mls_only,
+                        extra_property_data=extra_property_data,
+                        exclude_pending=exclude_pending,
+                        listing_type=self.LISTING_TYPES.get(listing_type, ListingType.FOR_SALE),
+                        alt_photos=alt_photos
+                    )
+                    for prop in properties
                 )
-                if processed_prop:
-                    processed_properties.append(processed_prop)
+                if processed_prop
+            )
             
-            return processed_properties
+            if compact:
+                from compact import PropertyTable
+
+                # Each Property is folded into the table as it is parsed
+                return PropertyTable.from_properties(processed_properties, keep_details=True)
+            return list(processed_properties)
                 
         except Exception as e:
             logger.error(f"Advanced property search failed: {e}")
@@ -309,58 +492,68 @@ class DreameryPropertyScraper:
                                       sqft_max: Optional[int] = None,
                                       radius: Optional[float] = None,
                                       past_days: Optional[int] = None,
+                                      date_from: Optional[str] = None,
+                                      date_to: Optional[str] = None,
                                       limit: int = 50,
                                       mls_only: bool = False,
                                       extra_property_data: bool = True,
-                                      exclude_pending: bool = False) -> List[Property]:
+                                      exclude_pending: bool = False,
+                                      field_groups: Union[str, List[str], None] = None,
+                                      deduplicator: Optional[Deduplicator] = None,
+                                      raw_filter: Union[RawFilter, Dict[str, Any], None] = None,
+                                      compact: bool = False,
+                                      alt_photos: bool = True,
+                                      parse_pool: Optional["ParsePool"] = None) -> Union[List[Property], "PropertyTable"]:
         """
         Comprehensive property search using enhanced GraphQL queries for maximum data extraction
+
+        With compact=True the results are returned as a compact.PropertyTable, alt_photos=False
+        drops the alternate photos and parse_pool parses in worker processes (see
+        search_properties_advanced).
         """
+        field_groups = normalize_field_groups(field_groups)
+        property_types = normalize_property_types(property_types)
+        raw_filter = RawFilter.coerce(raw_filter).with_options(mls_only, exclude_pending, listing_type)
         try:
-            # Map listing types
-            listing_type_map = {
-                'for_sale': ListingType.FOR_SALE,
-                'for_rent': ListingType.FOR_RENT,
-                'sold': ListingType.SOLD,
-                'pending': ListingType.PENDING
-            }
-            
-            # Get location info
-            location_info = self._handle_location(location)
-            if not location_info:
-                logger.error(f"Could not find location: {location}")
-                return []
-            
-            # Build search variables
-            search_variables = self._build_search_variables(
-                location_info, listing_type_map.get(listing_type, ListingType.FOR_SALE),
-                property_types, min_price, max_price, beds, baths, 
-                sqft_min, sqft_max, radius, past_days, limit
+            # Raw GraphQL homes, the processors do the parsing
+            properties = self.search_raw_homes(
+                location, listing_type, property_types, min_price, max_price, beds, baths, sqft_min, sqft_max,
+                radius, past_days, date_from, date_to, limit, field_groups=field_groups,
+                deduplicator=deduplicator, raw_filter=raw_filter
             )
+            if properties is None:
+                return []
             
-            # Determine search type
-            search_type = self._determine_search_type(location_info, radius)
-            
-            # Perform search with enhanced queries
-            if search_type == "single_property":
-                properties = self._handle_single_property(location_info)
-            else:
-                properties = self._perform_general_search(search_variables, search_type, limit)
+            if parse_pool is not None:
+                # Parsed in worker processes, which hand back columnar chunks
+                table = parse_pool.parse(properties, mls_only=mls_only, extra_property_data=extra_property_data,
+                                         exclude_pending=exclude_pending,
+                                         listing_type=self.LISTING_TYPES.get(listing_type, ListingType.FOR_SALE),
+                                         alt_photos=alt_photos)
+                return table if compact else list(table)
             
             # Process properties using the new processors with comprehensive data
-            processed_properties = []
-            for prop in properties:
-                processed_prop = self._process_property_with_processors(
-                    prop,
-                    mls_only=mls_only,
-                    extra_property_data=extra_property_data,
-                    exclude_pending=exclude_pending,
-                    listing_type=listing_type_map.get(listing_type, ListingType.FOR_SALE)
+            processed_properties = (
+                processed_prop for processed_prop in (
+                    self._process_property_with_processors(
+                        prop,
+                        mls_only=mls_only,
+                        extra_property_data=extra_property_data,
+                        exclude_pending=exclude_pending,
+                        listing_type=self.LISTING_TYPES.get(listing_type, ListingType.FOR_SALE),
+                        alt_photos=alt_photos
+                    )
+                    for prop in properties
                 )
-                if processed_prop:
-                    processed_properties.append(processed_prop)
+                if processed_prop
+            )
             
-            return processed_properties
+            if compact:
+                from compact import PropertyTable
+
+                # Each Property is folded into the table as it is parsed
+                return PropertyTable.from_properties(processed_properties, keep_details=True)
+            return list(processed_properties)
                 
         except Exception as e:
             logger.error(f"Comprehensive property search failed: {e}")
@@ -368,35 +561,53 @@ class DreameryPropertyScraper:
     
     def _handle_location(self, location: str) -> Optional[Dict[str, Any]]:
         """Handle location lookup using Realtor.com API"""
-        params = {
-            "input": location,
-            "client_id": "rdc-search-new-communities",
-            "limit": "1",
-            "area_types": "city,state,county,postal_code,address,street,neighborhood,school,school_district,university,park",
-        }
-
         try:
-            response = self.session.get(self.ADDRESS_AUTOCOMPLETE_URL, params=params)
-            response_json = response.json()
+            with stage_timer("scraper.autocomplete", in_flight=True):
+                response = self.session.get(self.ADDRESS_AUTOCOMPLETE_URL, params=self._autocomplete_params(location))
+                response_json = decode_response(response)
             result = response_json["autocomplete"]
             return result[0] if result else None
         except Exception as e:
             logger.error(f"Location lookup failed: {e}")
             return None
     
+    @staticmethod
+    def _autocomplete_params(location: str) -> Dict[str, str]:
+        """Query string of the best-match autocomplete lookup for `location`"""
+        return {
+            "input": location,
+            "client_id": "rdc-search-new-communities",
+            "limit": "1",
+            "area_types": "city,state,county,postal_code,address,street,neighborhood,school,school_district,university,park",
+        }
+    
     def _build_search_variables(self, location_info: Dict[str, Any], listing_type: str,
                                property_types: Optional[List[str]], min_price: Optional[int],
                                max_price: Optional[int], beds: Optional[int], baths: Optional[int],
                                sqft_min: Optional[int], sqft_max: Optional[int], radius: Optional[float],
-                               past_days: Optional[int], limit: int) -> Dict[str, Any]:
+                               past_days: Optional[int], limit: int,
+                               date_from: Optional[str] = None, date_to: Optional[str] = None) -> Dict[str, Any]:
         """Build search variables for GraphQL query"""
         search_variables = {"offset": 0}
         
+        search_variables.update(range_filter_variables(
+            list_price_min=min_price, list_price_max=max_price,
+            beds_min=beds, baths_min=baths,
+            sqft_min=sqft_min, sqft_max=sqft_max,
+        ))
+        
+        date_range = self._date_range(past_days, date_from, date_to)
+        if date_range:
+            for key, day in zip(("date_min", "date_max"), date_range):
+                if day is not None:
+                    search_variables[key] = day.isoformat()
+        
         location_type = location_info["area_type"]
         
         if location_type == "address":
             if radius:
-                coordinates = list(location_info["centroid"].values())
+                centroid = location_info["centroid"]
+                coordinates = [centroid["lon"], centroid["lat"]]
                 search_variables.update({
                     "coordinates": coordinates,
                     "radius": f"{radius}mi",
@@ -415,6 +626,22 @@ class DreameryPropertyScraper:
         
         return search_variables
     
+    @staticmethod
+    def _date_range(past_days: Optional[int], date_from: Optional[str],
+                    date_to: Optional[str]) -> Optional[Tuple[Optional[date], Optional[date]]]:
+        """Inclusive date bounds from date_from/date_to (ISO dates, either may be open) or the last
+        `past_days` days"""
+        if date_from or date_to:
+            start = date.fromisoformat(date_from) if date_from else None
+            end = date.fromisoformat(date_to) if date_to else None
+            if start and end and end < start:
+                raise ValueError(f"date_to {date_to} is before date_from {date_from}")
+            return start, end
+        if past_days:
+            today = date.today()
+            return today - timedelta(days=past_days), today
+        return None
+    
     def _determine_search_type(self, location_info: Dict[str, Any], radius: Optional[float]) -> str:
         """Determine the type of search to perform"""
         location_type = location_info["area_type"]
@@ -427,28 +654,27 @@ class DreameryPropertyScraper:
         else:
             return "area"
     
-    def _handle_single_property(self, location_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _handle_single_property(self, location_info: Dict[str, Any],
+                                format_results: bool = True) -> List[Dict[str, Any]]:
         """Handle single property search"""
         property_id = location_info["mpr_id"]
-        return self._get_property_details(property_id)
+        return self._get_property_details(property_id, format_results=format_results)
     
-    def _get_property_details(self, property_id: str) -> List[Dict[str, Any]]:
-        """Get details for a single property using enhanced query template"""
-        query = f"""
-        query Home($property_id: ID!) {{
-            home(property_id: $property_id) {HOMES_DATA}
-        }}
-        """
+    def _get_property_details(self, property_id: str, format_results: bool = True) -> List[Dict[str, Any]]:
+        """Get details for a single property using enhanced query template
         
+        With format_results=False the raw GraphQL home is returned for the processors.
+        """
         variables = {"property_id": property_id}
-        payload = {"query": query, "variables": variables}
         
         try:
-            response = self.session.post(self.SEARCH_GQL_URL, json=payload)
-            response_json = response.json()
+            with stage_timer("scraper.property_details", in_flight=True):
+                response_json = self._post_graphql(compile_home_query(), variables)
             
             if "data" in response_json and response_json["data"]["home"]:
                 property_data = response_json["data"]["home"]
+                if not format_results:
+                    return [property_data]
                 return [self._format_property_for_dreamery(property_data)]
             else:
                 return []
@@ -457,32 +683,60 @@ class DreameryPropertyScraper:
             return []
     
     def _perform_general_search(self, search_variables: Dict[str, Any], 
-                               search_type: str, limit: int) -> List[Dict[str, Any]]:
-        """Perform general property search"""
-        query = self._build_search_query(search_type)
-        payload = {"query": query, "variables": search_variables}
+                               search_type: str, limit: int,
+                               format_results: bool = True,
+                               field_groups: Union[str, List[str], None] = None,
+                               listing_type: str = "for_sale",
+                               deduplicator: Optional[Deduplicator] = None,
+                               property_types: Optional[Tuple[str, ...]] = None,
+                               raw_filter: Optional[RawFilter] = None,
+                               stream: bool = False) -> Iterable[Dict[str, Any]]:
+        """Perform general property search
+        
+        Searches that ask for more than one page are split so the per-query cap
+        does not truncate them: comps searches into spatial tiles, date-bounded
+        area searches into date windows (see search_planner). Homes already seen
+        by `deduplicator` are dropped before formatting. With format_results=False
+        the raw GraphQL homes are returned for the processors; a single page is
+        returned as an iterator that decodes the homes as they download, so
+        iterate it once. stream=True returns split searches as iterators too.
+        
+        Status, property type, range and date filters are part of the query, so
+        only matching homes are downloaded and parsed. `raw_filter` drops the
+        remaining unwanted homes from the raw results before they are parsed, and
+        before deduplication, so a home one search rejects is not marked as seen.
+        """
+        listing_type = listing_type if listing_type in STATUS_FILTERS else "for_sale"
+        date_field = DATE_FILTER_FIELDS[listing_type] if date_bounded(search_variables) else None
+        compiled = compile_search_query(search_type, field_groups, date_field, listing_type=listing_type,
+                                        property_types=property_types,
+                                        range_filters=range_filters_in(search_variables))
+        
+        deduplicator = deduplicator or Deduplicator()
+        
+        def select(homes: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            # Drop filtered-out homes, then repeats (only kept homes count as seen)
+            return deduplicator.filter(raw_filter.filter(homes) if raw_filter is not None else homes)
         
         try:
-            response = self.session.post(self.SEARCH_GQL_URL, json=payload)
-            response_json = response.json()
-            
-            search_key = "home_search" if "home_search" in query else "property_search"
-            
-            if (response_json is None or "data" not in response_json or 
-                response_json["data"] is None or search_key not in response_json["data"] or
-                response_json["data"][search_key] is None or 
-                "results" not in response_json["data"][search_key]):
-                return []
+            # Planned searches select while fetching, so only kept homes count towards `limit`
+            if search_type == "comps" and limit > self.DEFAULT_PAGE_SIZE:
+                properties_list = self._tiled_radius_search(compiled, search_variables, limit, stream, select)
+            elif date_field and "date_min" in search_variables and limit > self.DEFAULT_PAGE_SIZE:
+                properties_list = self._date_sharded_search(compiled, search_variables, limit, stream, select)
+            else:
+                # Homes are decoded one at a time while the page downloads
+                page, total_properties = self._stream_search_page(compiled, search_variables)
+                properties_list = select(page)
             
-            properties_list = response_json["data"][search_key]["results"]
-            total_properties = response_json["data"][search_key]["total"]
+            homes = islice(properties_list, limit)
             
-            # Limit results
-            properties_list = properties_list[:limit]
+            if not format_results:
+                return homes if isinstance(properties_list, Iterator) else list(homes)
             
-            # Format properties for Dreamery
+            # Format properties for Dreamery as they arrive
             formatted_properties = []
-            for prop in properties_list:
+            for prop in homes:
                 formatted_prop = self._format_property_for_dreamery(prop)
                 formatted_properties.append(formatted_prop)
             
@@ -492,53 +746,138 @@ class DreameryPropertyScraper:
             logger.error(f"General search failed: {e}")
             return []
     
-    def _build_search_query(self, search_type: str) -> str:
-        """Build GraphQL query based on search type using enhanced query templates"""
-        if search_type == "comps":
-            return f"""
-            query Property_search($coordinates: [Float]!, $radius: String!, $offset: Int!) {{
-                home_search(
-                    query: {{
-                        nearby: {{
-                            coordinates: $coordinates
-                            radius: $radius
-                        }}
-                        status: for_sale
-                    }}
-                    limit: 200
-                    offset: $offset
-                ) {{
-                    total
-                    results {SEARCH_HOMES_DATA}
-                }}
-            }}
-            """
-        else:  # area search
-            return f"""
-            query Home_search($city: String, $county: [String], $state_code: String, 
-                            $postal_code: String, $offset: Int) {{
-                home_search(
-                    query: {{
-                        city: $city
-                        county: $county
-                        postal_code: $postal_code
-                        state_code: $state_code
-                        status: for_sale
-                    }}
-                    limit: 200
-                    offset: $offset
-                ) {{
-                    total
-                    results {SEARCH_HOMES_DATA}
-                }}
-            }}
-            """
+    def _fetch_search_page(self, compiled: CompiledQuery,
+                           variables: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of a search query: (raw GraphQL homes, total matching homes)
+
+        An error response raises ScrapingError instead of reading as an empty page, so the
+        search planners retry the sub-query.
+        """
+        with stage_timer("scraper.graphql_page", in_flight=True):
+            response_json = self._post_graphql(compiled, variables)
+        search_key = self._search_key(compiled)
+        if not ((response_json or {}).get("data") or {}).get(search_key):
+            errors = (response_json or {}).get("errors") or (response_json or {}).get("error")
+            raise ScrapingError(f"Search page returned no {search_key}: {errors}")
+        return self._search_page_results(compiled, response_json)
+    
+    def _stream_search_page(self, compiled: CompiledQuery,
+                            variables: Dict[str, Any]) -> Tuple[Iterator[Dict[str, Any]], int]:
+        """One page of a search query decoded as it downloads: (raw GraphQL homes, total matching homes)
+
+        `total` precedes `results` in the query, so it is known before the first home.
+        """
+        search_key = self._search_key(compiled)
+        with stage_timer("scraper.graphql_page", in_flight=True):
+            streamed = self._post_graphql(compiled, variables, stream_path=("data", search_key, "results"))
+        search_results = (streamed.document.get("data") or {}).get(search_key) or {}
+        return iter(streamed), search_results.get("total") or 0
+    
+    @staticmethod
+    def _search_key(compiled: CompiledQuery) -> str:
+        return "home_search" if "home_search" in compiled.document else "property_search"
     
+    @staticmethod
+    def _search_page_results(compiled: CompiledQuery,
+                             response_json: Optional[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """(raw GraphQL homes, total matching homes) of a decoded search response"""
+        search_key = DreameryPropertyScraper._search_key(compiled)
+        
+        if (response_json is None or "data" not in response_json or 
+            response_json["data"] is None or search_key not in response_json["data"] or
+            response_json["data"][search_key] is None or 
+            "results" not in response_json["data"][search_key]):
+            return [], 0
+        
+        search_results = response_json["data"][search_key]
+        return search_results["results"] or [], search_results.get("total") or 0
+    
+    def _tiled_radius_search(self, compiled: CompiledQuery, search_variables: Dict[str, Any], limit: int,
+                             stream: bool = False, select: Optional[SelectHomes] = None
+                             ) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """Radius search split into concurrently fetched quadtree tiles, deduplicated by property_id
+        and passed through `select`"""
+        lon, lat = search_variables["coordinates"][:2]
+        radius = float(str(search_variables["radius"]).rstrip("mi"))
+        planner = SpatialTilePlanner(
+            lambda variables: self._fetch_search_page(compiled, variables),
+            max_workers=min(self.NUM_PROPERTY_WORKERS, 8),
+        )
+        if stream:
+            return _timed(planner.search_radius(lat, lon, radius, base_variables=search_variables, limit=limit,
+                                                stream=True, select=select), "scraper.tiled_search")
+        with stage_timer("scraper.tiled_search"):
+            return planner.search_radius(lat, lon, radius, base_variables=search_variables, limit=limit,
+                                         select=select)
+    
+    def _date_sharded_search(self, compiled: CompiledQuery, search_variables: Dict[str, Any], limit: int,
+                             stream: bool = False, select: Optional[SelectHomes] = None
+                             ) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """Date-bounded search split into concurrently fetched date windows, deduplicated by property_id
+        and passed through `select`"""
+        planner = DateWindowPlanner(
+            lambda variables: self._fetch_search_page(compiled, variables),
+            max_workers=min(self.NUM_PROPERTY_WORKERS, 8),
+        )
+        # An open end is today: nothing is sold, pending or listed in the future
+        date_min = date.fromisoformat(search_variables["date_min"])
+        date_max = date.fromisoformat(search_variables.get("date_max") or date.today().isoformat())
+        if stream:
+            return _timed(planner.search(date_min, date_max, base_variables=search_variables, limit=limit,
+                                         stream=True, select=select), "scraper.date_sharded_search")
+        with stage_timer("scraper.date_sharded_search"):
+            return planner.search(date_min, date_max, base_variables=search_variables, limit=limit,
+                                  select=select)
+    
+    def _build_search_query(self, search_type: str,
+                            field_groups: Union[str, List[str], None] = None) -> str:
+        """GraphQL document for a search type and result field projection (compiled once per process)"""
+        return compile_search_query(search_type, field_groups).document
+
+    def _post_graphql(self, compiled: CompiledQuery, variables: Dict[str, Any],
+                      stream_path: Optional[Tuple[str, ...]] = None) -> Union[Optional[Dict[str, Any]], StreamedJSON]:
+        """POST a compiled query and return the decoded response.
+
+        With persisted queries enabled the first attempt sends only the query
+        hash; when the server does not know it (or does not support persisted
+        queries) the full document is sent along with the hash so later
+        requests can use the hash alone.
+
+        With `stream_path` the response is returned as a json_backend.StreamedJSON
+        yielding the items of the array at that path while the body downloads.
+        """
+        payload = {"operationName": compiled.operation_name, "variables": variables}
+
+        def post(body: Dict[str, Any]) -> Union[Optional[Dict[str, Any]], StreamedJSON]:
+            if stream_path is None:
+                return decode_response(self.session.post(self.SEARCH_GQL_URL, json=body))
+            return decode_response_stream(self.session.post(self.SEARCH_GQL_URL, json=body, stream=True), stream_path)
+
+        if self.use_persisted_queries:
+            response_json = post({**payload, "extensions": compiled.persisted_query_extension})
+            error = _persisted_query_error(
+                response_json.document if isinstance(response_json, StreamedJSON) else response_json
+            )
+            record_cache_lookup("persisted_query", error is None)
+            if error is None:
+                return response_json
+            if isinstance(response_json, StreamedJSON):
+                response_json.close()
+            if error == "PersistedQueryNotSupported":
+                logger.info("Persisted queries not supported by the server, sending full documents")
+                self.use_persisted_queries = False
+            else:
+                payload["extensions"] = compiled.persisted_query_extension
+
+        payload["query"] = compiled.document
+        return post(payload)
+
     def _process_property_with_processors(self, prop: Dict[str, Any], 
                                         mls_only: bool = False, 
                                         extra_property_data: bool = False,
                                         exclude_pending: bool = False,
-                                        listing_type: ListingType = ListingType.FOR_SALE) -> Union[Property, None]:
+                                        listing_type: ListingType = ListingType.FOR_SALE,
+                                        alt_photos: bool = True) -> Union[Property, None]:
         """Process property using the new processors for comprehensive data extraction"""
         try:
             return process_property(
@@ -548,12 +887,14 @@ class DreameryPropertyScraper:
                 exclude_pending=exclude_pending,
                 listing_type=listing_type,
                 get_key_func=get_key,
-                process_extra_property_details_func=process_extra_property_details
+                process_extra_property_details_func=process_extra_property_details,
+                alt_photos=alt_photos
             )
         except Exception as e:
             logger.error(f"Error processing property with processors: {e}")
             return None
 
+    @timed_stage("parse.format_property")
     def _format_property_for_dreamery(self, prop: Dict[str, Any]) -> Property:
         """Format property for Dreamery frontend using new parsers"""
         try:
@@ -163,9 +163,13 @@ class EnhancedRealtorAPI:
 # Flask API endpoints for the enhanced service
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from metrics import install_flask_metrics
+from json_backend import install_flask_json
 
 app = Flask(__name__)
 CORS(app)
+install_flask_json(app)  # orjson/msgspec responses when installed
+install_flask_metrics(app, "enhanced_realtor_api")  # Request timing and GET /metrics
 
 enhanced_api = EnhancedRealtorAPI()
 
@@ -6,13 +6,19 @@ Processes properties from the database and enriches them with external data
 import os
 import sys
 import json
+import time
+import queue
+import signal
 import logging
 import argparse
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-import pandas as pd
-from sqlalchemy import create_engine, text
-from external_data_service import ExternalDataService
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+from sqlalchemy import create_engine, event, text
+from external_data_service import EnrichmentStopped, ExternalDataService
+from properties_schema import apply_migrations, enrichment_candidates_query
+from metrics import record_cache_lookup
+from json_backend import write_json
 from environment_config import config
 
 # Configure logging
@@ -22,13 +28,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_DEPTH = 100
+
+# Marks the end of a stage's output on the queue feeding the next stage
+_END_OF_STREAM = object()
+
+UPDATE_ENRICHED_PROPERTY_QUERY = """
+UPDATE properties 
+SET 
+    walk_score = :walk_score,
+    bike_score = :bike_score,
+    transit_score = :transit_score,
+    amenities = :amenities,
+    transit_data = :transit_data,
+    demographics = :demographics,
+    schools = :schools,
+    enrichment_date = :enrichment_date,
+    updated_at = :updated_at
+WHERE property_id = :property_id
+"""
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    """Let the writer commit while the reader's cursor is still open (SQLite only)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 class PropertyEnrichmentPipeline:
     """Pipeline for enriching property data with external APIs"""
     
     def __init__(self, db_url: str = None):
-        self.external_service = ExternalDataService()
+        self._stop_event = threading.Event()
+        # Rate-limit waits end early on a stop request
+        self.external_service = ExternalDataService(stop_event=self._stop_event)
         self.db_url = db_url or os.getenv('DATABASE_URL', 'sqlite:///properties.db')
         self.engine = create_engine(self.db_url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', _enable_sqlite_wal)
         self.processed_count = 0
         self.error_count = 0
         self.cache_enabled = config.cache_config['enabled']
@@ -37,33 +74,32 @@ class PropertyEnrichmentPipeline:
                                 days_since_enrichment: int = 30) -> List[Dict[str, Any]]:
         """Get properties that need enrichment from the database"""
         try:
-            query = """
-            SELECT 
-                property_id,
-                address,
-                latitude,
-                longitude,
-                list_price,
-                description,
-                enrichment_date,
-                created_at
-            FROM properties 
-            WHERE latitude IS NOT NULL 
-            AND longitude IS NOT NULL
-            """
-            
-            if days_since_enrichment:
-                cutoff_date = datetime.now() - timedelta(days=days_since_enrichment)
-                query += f" AND (enrichment_date IS NULL OR enrichment_date < '{cutoff_date}')"
-            
-            if limit:
-                query += f" LIMIT {limit}"
-            
-            with self.engine.connect() as conn:
-                result = conn.execute(text(query))
-                properties = []
-                for row in result:
-                    properties.append({
+            properties = list(self.iter_properties_to_enrich(limit, days_since_enrichment))
+            logger.info(f"Found {len(properties)} properties to enrich")
+            return properties
+                
+        except Exception as e:
+            logger.error(f"Error getting properties to enrich: {e}")
+            return []
+    
+    def iter_properties_to_enrich(self, limit: int = None, days_since_enrichment: int = 30,
+                                  chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Stream properties that need enrichment from the database in chunks"""
+        params = {}
+        if days_since_enrichment:
+            params['cutoff'] = datetime.now() - timedelta(days=days_since_enrichment)
+        if limit:
+            params['limit'] = limit
+        query = enrichment_candidates_query('cutoff' in params, 'limit' in params)
+        
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(query, params)
+            while not self._stop_event.is_set():
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {
                         'property_id': row.property_id,
                         'address': json.loads(row.address) if isinstance(row.address, str) else row.address,
                         'latitude': float(row.latitude),
@@ -72,46 +108,14 @@ class PropertyEnrichmentPipeline:
                         'description': json.loads(row.description) if isinstance(row.description, str) else row.description,
                         'enrichment_date': row.enrichment_date,
                         'created_at': row.created_at
-                    })
-                
-                logger.info(f"Found {len(properties)} properties to enrich")
-                return properties
-                
-        except Exception as e:
-            logger.error(f"Error getting properties to enrich: {e}")
-            return []
+                    }
     
     def save_enriched_property(self, property_id: str, enriched_data: Dict[str, Any]) -> bool:
         """Save enriched data back to the database"""
         try:
-            update_query = """
-            UPDATE properties 
-            SET 
-                walk_score = :walk_score,
-                bike_score = :bike_score,
-                transit_score = :transit_score,
-                amenities = :amenities,
-                transit_data = :transit_data,
-                demographics = :demographics,
-                schools = :schools,
-                enrichment_date = :enrichment_date,
-                updated_at = :updated_at
-            WHERE property_id = :property_id
-            """
-            
             with self.engine.connect() as conn:
-                conn.execute(text(update_query), {
-                    'property_id': property_id,
-                    'walk_score': enriched_data.get('walk_score'),
-                    'bike_score': enriched_data.get('bike_score'),
-                    'transit_score': enriched_data.get('transit_score'),
-                    'amenities': json.dumps(enriched_data.get('amenities', [])),
-                    'transit_data': json.dumps(enriched_data.get('transit')),
-                    'demographics': json.dumps(enriched_data.get('demographics')),
-                    'schools': json.dumps(enriched_data.get('schools', [])),
-                    'enrichment_date': datetime.now(),
-                    'updated_at': datetime.now()
-                })
+                conn.execute(text(UPDATE_ENRICHED_PROPERTY_QUERY),
+                             self._update_params(property_id, enriched_data))
                 conn.commit()
                 
             logger.info(f"Saved enriched data for property {property_id}")
@@ -121,9 +125,100 @@ class PropertyEnrichmentPipeline:
             logger.error(f"Error saving enriched data for property {property_id}: {e}")
             return False
     
+    def save_enriched_properties(self, records: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Save a batch of (property_id, enriched_data) records in one transaction.
+        
+        Falls back to row-by-row saves if the batch fails so that a single bad
+        record does not discard the rest. Returns the number of rows saved.
+        """
+        if not records:
+            return 0
+        
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text(UPDATE_ENRICHED_PROPERTY_QUERY), [
+                    self._update_params(property_id, enriched_data)
+                    for property_id, enriched_data in records
+                ])
+            logger.info(f"Saved enriched data for {len(records)} properties")
+            return len(records)
+        except Exception as e:
+            logger.error(f"Batch save of {len(records)} properties failed, retrying individually: {e}")
+            return sum(
+                1 for property_id, enriched_data in records
+                if self.save_enriched_property(property_id, enriched_data)
+            )
+    
+    def _update_params(self, property_id: str, enriched_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the bound parameters for the enrichment UPDATE statement"""
+        now = datetime.now()
+        return {
+            'property_id': property_id,
+            'walk_score': enriched_data.get('walk_score'),
+            'bike_score': enriched_data.get('bike_score'),
+            'transit_score': enriched_data.get('transit_score'),
+            'amenities': json.dumps(enriched_data.get('amenities', [])),
+            'transit_data': json.dumps(enriched_data.get('transit')),
+            'demographics': json.dumps(enriched_data.get('demographics')),
+            'schools': json.dumps(enriched_data.get('schools', [])),
+            'enrichment_date': now,
+            'updated_at': now
+        }
+    
+    def _is_recently_enriched(self, property_data: Dict[str, Any]) -> bool:
+        """Check whether a property was enriched within the cache window"""
+        if not self.cache_enabled:
+            return False
+        fresh = bool(
+            property_data.get('enrichment_date') and 
+            property_data['enrichment_date'] > datetime.now() - timedelta(hours=config.cache_config['duration_hours'])
+        )
+        record_cache_lookup('enrichment_recent', fresh)
+        return fresh
+    
+    def _to_db_format(self, enriched) -> Dict[str, Any]:
+        """Convert EnrichedPropertyData into the column layout of the properties table"""
+        return {
+            'walk_score': enriched.walk_score_data.walk_score if enriched.walk_score_data else None,
+            'bike_score': enriched.walk_score_data.bike_score if enriched.walk_score_data else None,
+            'transit_score': enriched.walk_score_data.transit_score if enriched.walk_score_data else None,
+            'amenities': [
+                {
+                    'name': amenity.name,
+                    'type': amenity.type,
+                    'rating': amenity.rating,
+                    'distance_meters': amenity.distance_meters,
+                    'price_level': amenity.price_level
+                } for amenity in enriched.amenities
+            ],
+            'transit': {
+                'nearest_stop': enriched.transit_data.nearest_stop if enriched.transit_data else None,
+                'distance_meters': enriched.transit_data.distance_meters if enriched.transit_data else None,
+                'routes': enriched.transit_data.routes if enriched.transit_data else []
+            } if enriched.transit_data else None,
+            'demographics': {
+                'population': enriched.census_data.population if enriched.census_data else None,
+                'median_age': enriched.census_data.median_age if enriched.census_data else None,
+                'median_income': enriched.census_data.median_income if enriched.census_data else None,
+                'education_level': enriched.census_data.education_level if enriched.census_data else None,
+                'employment_rate': enriched.census_data.employment_rate if enriched.census_data else None,
+                'housing_units': enriched.census_data.housing_units if enriched.census_data else None
+            } if enriched.census_data else None,
+            'schools': [
+                {
+                    'name': school.name,
+                    'type': school.type,
+                    'rating': school.rating,
+                    'distance_meters': school.distance_meters,
+                    'district': school.district,
+                    'enrollment': school.enrollment
+                } for school in enriched.schools
+            ]
+        }
+    
     def enrich_properties_batch(self, properties: List[Dict[str, Any]], 
                               batch_size: int = 10) -> Dict[str, int]:
-        """Enrich a batch of properties"""
+        """Enrich a batch of properties sequentially"""
         results = {'processed': 0, 'errors': 0, 'skipped': 0}
         
         for i in range(0, len(properties), batch_size):
@@ -133,62 +228,20 @@ class PropertyEnrichmentPipeline:
             for property_data in batch:
                 try:
                     # Skip if already enriched recently (if cache is enabled)
-                    if (self.cache_enabled and 
-                        property_data.get('enrichment_date') and 
-                        property_data['enrichment_date'] > datetime.now() - timedelta(hours=config.cache_config['duration_hours'])):
+                    if self._is_recently_enriched(property_data):
                         results['skipped'] += 1
                         continue
                     
                     # Enrich property
                     enriched = self.external_service.enrich_property(property_data)
                     
-                    # Convert to database format
-                    enriched_data = {
-                        'walk_score': enriched.walk_score_data.walk_score if enriched.walk_score_data else None,
-                        'bike_score': enriched.walk_score_data.bike_score if enriched.walk_score_data else None,
-                        'transit_score': enriched.walk_score_data.transit_score if enriched.walk_score_data else None,
-                        'amenities': [
-                            {
-                                'name': amenity.name,
-                                'type': amenity.type,
-                                'rating': amenity.rating,
-                                'distance_meters': amenity.distance_meters,
-                                'price_level': amenity.price_level
-                            } for amenity in enriched.amenities
-                        ],
-                        'transit': {
-                            'nearest_stop': enriched.transit_data.nearest_stop if enriched.transit_data else None,
-                            'distance_meters': enriched.transit_data.distance_meters if enriched.transit_data else None,
-                            'routes': enriched.transit_data.routes if enriched.transit_data else []
-                        } if enriched.transit_data else None,
-                        'demographics': {
-                            'population': enriched.census_data.population if enriched.census_data else None,
-                            'median_age': enriched.census_data.median_age if enriched.census_data else None,
-                            'median_income': enriched.census_data.median_income if enriched.census_data else None,
-                            'education_level': enriched.census_data.education_level if enriched.census_data else None,
-                            'employment_rate': enriched.census_data.employment_rate if enriched.census_data else None,
-                            'housing_units': enriched.census_data.housing_units if enriched.census_data else None
-                        } if enriched.census_data else None,
-                        'schools': [
-                            {
-                                'name': school.name,
-                                'type': school.type,
-                                'rating': school.rating,
-                                'distance_meters': school.distance_meters,
-                                'district': school.district,
-                                'enrollment': school.enrollment
-                            } for school in enriched.schools
-                        ]
-                    }
-                    
                     # Save to database
-                    if self.save_enriched_property(property_data['property_id'], enriched_data):
+                    if self.save_enriched_property(property_data['property_id'], self._to_db_format(enriched)):
                         results['processed'] += 1
                     else:
                         results['errors'] += 1
                     
                     # Add delay between properties to respect rate limits
-                    import time
                     time.sleep(0.1)
                     
                 except Exception as e:
@@ -198,8 +251,164 @@ class PropertyEnrichmentPipeline:
         
         return results
     
+    def enrich_properties_concurrent(self, properties: Iterable[Dict[str, Any]],
+                                     workers: int = DEFAULT_WORKERS,
+                                     queue_depth: int = DEFAULT_QUEUE_DEPTH,
+                                     batch_size: int = 10) -> Dict[str, int]:
+        """Enrich properties with a three-stage reader -> workers -> writer pipeline.
+        
+        The stages are connected by bounded queues, so a slow writer or slow
+        external APIs block the reader instead of buffering the whole table in
+        memory. Setting the stop event (e.g. on SIGINT) stops the reader and
+        discards queued properties that no worker has started; properties being
+        enriched at that moment are still written before returning. If the
+        writer fails, the reader and workers stop as well and the unsaved
+        properties are counted as errors.
+        """
+        workers = max(1, workers)
+        queue_depth = max(1, queue_depth)
+        batch_size = max(1, batch_size)
+        
+        results = {'found': 0, 'processed': 0, 'errors': 0, 'skipped': 0}
+        results_lock = threading.Lock()
+        
+        def count(key: str, amount: int = 1) -> None:
+            with results_lock:
+                results[key] += amount
+        
+        work_queue = queue.Queue(maxsize=queue_depth)
+        write_queue = queue.Queue(maxsize=queue_depth)
+        # Set when the writer failed; the reader and workers stop as on a stop request
+        writer_failed = threading.Event()
+        
+        def put(target: queue.Queue, item, abort_on_stop: bool = False) -> bool:
+            # Block while the next stage is saturated, but keep honoring stop requests
+            while True:
+                try:
+                    target.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    if abort_on_stop and self._stop_event.is_set():
+                        return False
+        
+        def reader() -> None:
+            try:
+                for property_data in properties:
+                    if (self._stop_event.is_set() or writer_failed.is_set()
+                            or not put(work_queue, property_data, abort_on_stop=True)):
+                        logger.info("Stop requested, no longer reading properties")
+                        break
+                    count('found')
+            except Exception as e:
+                logger.error(f"Error reading properties to enrich: {e}")
+            finally:
+                for _ in range(workers):
+                    put(work_queue, _END_OF_STREAM)
+        
+        def worker() -> None:
+            try:
+                while True:
+                    property_data = work_queue.get()
+                    if property_data is _END_OF_STREAM:
+                        break
+                    
+                    if self._stop_event.is_set() or writer_failed.is_set():
+                        continue
+                    
+                    try:
+                        if self._is_recently_enriched(property_data):
+                            count('skipped')
+                            continue
+                        
+                        enriched = self.external_service.enrich_property(property_data)
+                        put(write_queue, (property_data['property_id'], self._to_db_format(enriched)))
+                    except EnrichmentStopped:
+                        # Left unsaved, so the property stays a candidate for the next run
+                        logger.info(f"Stop requested, not saving property {property_data.get('property_id')}")
+                    except Exception as e:
+                        logger.error(f"Error enriching property {property_data.get('property_id')}: {e}")
+                        count('errors')
+            finally:
+                put(write_queue, _END_OF_STREAM)
+        
+        def writer() -> None:
+            pending = []
+            finished_workers = 0
+            
+            def flush() -> None:
+                saved = self.save_enriched_properties(pending)
+                count('processed', saved)
+                count('errors', len(pending) - saved)
+                pending.clear()
+            
+            try:
+                while finished_workers < workers:
+                    try:
+                        item = write_queue.get(timeout=1.0)
+                    except queue.Empty:
+                        # Don't hold partial batches while enrichment is slow
+                        flush()
+                        continue
+                    
+                    if item is _END_OF_STREAM:
+                        finished_workers += 1
+                        continue
+                    
+                    pending.append(item)
+                    if len(pending) >= batch_size:
+                        flush()
+                
+                flush()
+            except Exception as e:
+                logger.error(f"Enrichment writer failed, stopping the pipeline: {e}")
+                writer_failed.set()
+                count('errors', len(pending))
+                # Keep draining so no worker blocks on a full queue; the rest is not saved
+                while finished_workers < workers:
+                    item = write_queue.get()
+                    if item is _END_OF_STREAM:
+                        finished_workers += 1
+                    else:
+                        count('errors')
+        
+        threads = [threading.Thread(target=reader, name='enrichment-reader', daemon=True)]
+        threads += [
+            threading.Thread(target=worker, name=f'enrichment-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        threads.append(threading.Thread(target=writer, name='enrichment-writer', daemon=True))
+        
+        for thread in threads:
+            thread.start()
+        
+        # Join with a timeout so the main thread stays responsive to signals
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+        
+        return results
+    
+    def request_stop(self) -> None:
+        """Ask a running pipeline to stop reading and drain what is in flight"""
+        self._stop_event.set()
+    
+    def _install_signal_handler(self):
+        """Route the first SIGINT to a graceful stop; a second one interrupts immediately"""
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        
+        def handle_sigint(signum, frame):
+            if self._stop_event.is_set():
+                raise KeyboardInterrupt
+            logger.warning("Interrupt received, finishing in-flight properties (press Ctrl+C again to abort)")
+            self.request_stop()
+        
+        return signal.signal(signal.SIGINT, handle_sigint)
+    
     def run_enrichment_pipeline(self, limit: int = None, batch_size: int = 10, 
-                              days_since_enrichment: int = 30) -> Dict[str, Any]:
+                              days_since_enrichment: int = 30,
+                              workers: int = DEFAULT_WORKERS,
+                              queue_depth: int = DEFAULT_QUEUE_DEPTH) -> Dict[str, Any]:
         """Run the complete enrichment pipeline"""
         logger.info("Starting property enrichment pipeline")
         
@@ -209,33 +418,49 @@ class PropertyEnrichmentPipeline:
             logger.error("Configuration validation failed")
             return {'success': False, 'error': 'Configuration validation failed', 'validation': validation}
         
-        # Get properties to enrich
-        properties = self.get_properties_to_enrich(limit, days_since_enrichment)
-        if not properties:
-            logger.info("No properties found to enrich")
-            return {'success': True, 'message': 'No properties found to enrich'}
+        # Workers wait for API budget instead of dropping calls that exceed it
+        self.external_service.block_on_rate_limit = True
+        self._stop_event.clear()
+        previous_handler = self._install_signal_handler()
         
         # Enrich properties
         start_time = datetime.now()
-        results = self.enrich_properties_batch(properties, batch_size)
+        try:
+            stats = self.enrich_properties_concurrent(
+                self.iter_properties_to_enrich(limit, days_since_enrichment),
+                workers=workers,
+                queue_depth=queue_depth,
+                batch_size=batch_size
+            )
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
         end_time = datetime.now()
         
+        properties_found = stats.pop('found')
+        if not properties_found:
+            logger.info("No properties found to enrich")
+            return {'success': True, 'message': 'No properties found to enrich'}
+        
         # Calculate statistics
         total_time = (end_time - start_time).total_seconds()
-        avg_time_per_property = total_time / results['processed'] if results['processed'] > 0 else 0
+        avg_time_per_property = total_time / stats['processed'] if stats['processed'] > 0 else 0
         
         pipeline_results = {
             'success': True,
+            'interrupted': self._stop_event.is_set(),
             'start_time': start_time.isoformat(),
             'end_time': end_time.isoformat(),
             'total_time_seconds': total_time,
-            'properties_found': len(properties),
-            'results': results,
+            'properties_found': properties_found,
+            'results': stats,
             'average_time_per_property': avg_time_per_property,
+            'workers': workers,
+            'queue_depth': queue_depth,
             'configuration': validation
         }
         
-        logger.info(f"Enrichment pipeline completed: {results}")
+        logger.info(f"Enrichment pipeline completed: {stats}")
         return pipeline_results
     
     def export_enriched_data(self, output_file: str = None) -> str:
@@ -287,8 +512,7 @@ class PropertyEnrichmentPipeline:
                     }
                     properties.append(property_data)
             
-            with open(output_file, 'w') as f:
-                json.dump(properties, f, indent=2)
+            write_json(output_file, properties)
             
             logger.info(f"Exported {len(properties)} enriched properties to {output_file}")
             return output_file
@@ -301,13 +525,19 @@ def main():
     """Command line interface for the enrichment pipeline"""
     parser = argparse.ArgumentParser(description='Property Data Enrichment Pipeline')
     parser.add_argument('--limit', type=int, help='Limit number of properties to process')
-    parser.add_argument('--batch-size', type=int, default=10, help='Batch size for processing')
+    parser.add_argument('--batch-size', type=int, default=10, help='Number of enriched rows written per database transaction')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help='Number of concurrent enrichment workers')
+    parser.add_argument('--queue-depth', type=int, default=DEFAULT_QUEUE_DEPTH,
+                       help='Maximum properties buffered between pipeline stages')
     parser.add_argument('--days-since-enrichment', type=int, default=30, 
                        help='Days since last enrichment to reprocess')
     parser.add_argument('--export', action='store_true', help='Export enriched data to JSON')
     parser.add_argument('--output-file', help='Output file for export')
     parser.add_argument('--validate-config', action='store_true', 
                        help='Validate configuration and exit')
+    parser.add_argument('--migrate', action='store_true',
+                       help='Create the properties table and its indexes if missing, then exit')
     
     args = parser.parse_args()
     
@@ -320,6 +550,11 @@ def main():
     # Initialize pipeline
     pipeline = PropertyEnrichmentPipeline()
     
+    if args.migrate:
+        created = apply_migrations(pipeline.engine)
+        print(f"Created: {', '.join(created)}" if created else "Schema is up to date")
+        sys.exit(0)
+    
     # Export data if requested
     if args.export:
         try:
@@ -334,7 +569,9 @@ def main():
             results = pipeline.run_enrichment_pipeline(
                 limit=args.limit,
                 batch_size=args.batch_size,
-                days_since_enrichment=args.days_since_enrichment
+                days_since_enrichment=args.days_since_enrichment,
+                workers=args.workers,
+                queue_depth=args.queue_depth
             )
             print(json.dumps(results, indent=2))
         except Exception as e:
@@ -0,0 +1,196 @@
+"""
+Streaming CSV and Excel writers for scraped properties
+
+The CLI used to collect every property, build a DataFrame and then call
+`to_csv` / `to_excel`, so memory grew with the row count and nothing was
+written until the scrape finished. These writers append rows as they are
+produced instead:
+
+  - `CSVRowWriter` writes through a large buffered text file
+  - `XLSXRowWriter` uses openpyxl's write-only workbook, which streams each
+    row to a temporary sheet file and zips the workbook on close
+  - `write_rows` runs the row source (the scrape and parse) in a producer
+    thread and writes batches as they arrive, so writing overlaps with
+    fetching the next pages
+
+Missing values (None, "" and "None") are written as empty cells, as in the
+scrape_property DataFrame.
+
+    rows = (property_row(prop) for prop in iter_properties("Dallas, TX"))
+    count = write_rows(rows, "dallas.xlsx", ordered_properties)
+"""
+
+import csv
+import logging
+import queue
+import threading
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Rows handed from the producer thread to the writer at a time
+BATCH_SIZE = 200
+# Batches the producer may run ahead of the writer
+QUEUE_DEPTH = 8
+
+# Marks the end of the producer's rows on the queue
+_END_OF_ROWS = object()
+
+_MISSING = (None, "", "None")
+
+
+class CSVRowWriter:
+    """Appends rows to a CSV file with a header of `columns`"""
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str], buffer_size: int = 1 << 20):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.rows = 0
+        self._file = open(self.path, "w", newline="", encoding="utf-8", buffering=buffer_size)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def __enter__(self) -> "CSVRowWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        columns = self.columns
+        for row in rows:
+            self._writer.writerow([_csv_cell(row.get(column)) for column in columns])
+            self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+
+class XLSXRowWriter:
+    """Appends rows to a one-sheet .xlsx workbook (openpyxl write-only mode) with a header of `columns`"""
+
+    def __init__(self, path: Union[str, Path], columns: Sequence[str], sheet_name: str = "Sheet1"):
+        from openpyxl import Workbook
+
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.rows = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(sheet_name)
+        self._sheet.append(self.columns)
+
+    def __enter__(self) -> "XLSXRowWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]):
+        columns = self.columns
+        for row in rows:
+            self._sheet.append([_xlsx_cell(row.get(column)) for column in columns])
+            self.rows += 1
+
+    def close(self):
+        """Write the workbook to `path`"""
+        if self._workbook is not None:
+            self._workbook.save(self.path)
+            self._workbook = None
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None or isinstance(value, str) and value in _MISSING:
+        return ""
+    if isinstance(value, datetime) and value.time() == datetime.min.time() and value.tzinfo is None:
+        # Dates parsed into datetimes, written the way to_csv writes a column of them
+        return value.date()
+    return value
+
+
+def _xlsx_cell(value: Any) -> Any:
+    if value is None or isinstance(value, str) and value in _MISSING:
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        # Excel has no time zones
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return value
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+def open_writer(path: Union[str, Path], columns: Sequence[str]) -> Union[CSVRowWriter, XLSXRowWriter]:
+    """Row writer for `path` by its suffix (.csv or .xlsx)"""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return CSVRowWriter(path, columns)
+    if suffix == ".xlsx":
+        return XLSXRowWriter(path, columns)
+    raise ValueError(f"Unsupported export format: {suffix or path} (expected .csv or .xlsx)")
+
+
+def write_rows(rows: Iterable[Dict[str, Any]], path: Union[str, Path], columns: Sequence[str],
+               batch_size: int = BATCH_SIZE, queue_depth: int = QUEUE_DEPTH) -> int:
+    """
+    Write `rows` to `path` (.csv or .xlsx) while they are produced; returns the number of rows written
+
+    `rows` is consumed in a producer thread and its batches are written here, through a
+    queue of at most `queue_depth` batches, so a slow source and a slow disk overlap and
+    memory stays at a few batches. An exception raised by `rows` is re-raised here after
+    the rows before it are written; when writing fails the producer is stopped.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=max(1, queue_depth))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        batch: List[Dict[str, Any]] = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch:
+                put(batch)
+        except Exception as e:
+            if batch:
+                put(batch)
+            put(e)
+        finally:
+            put(_END_OF_ROWS)
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="export-producer", daemon=True)
+    with open_writer(path, columns) as writer:
+        producer.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is _END_OF_ROWS:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                writer.write_rows(item)
+        finally:
+            stop.set()
+            producer.join()
+    logger.info(f"Wrote {writer.rows} rows to {writer.path}")
+    return writer.rows
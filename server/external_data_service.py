@@ -12,18 +12,22 @@ import os
 import json
 import time
 import logging
+import threading
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import pandas as pd
+from json_backend import decode_response, write_json
+from metrics import InstrumentedRetry, RATE_LIMITED, stage_timer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class EnrichmentStopped(Exception):
+    """Raised when a stop request ends a rate-limit wait, so no partial enrichment is saved"""
+
 @dataclass
 class WalkScoreData:
     """Walk Score API response data"""
@@ -94,11 +98,16 @@ class EnrichedPropertyData:
 class ExternalDataService:
     """Main service for integrating external APIs"""
     
-    def __init__(self):
+    def __init__(self, block_on_rate_limit: bool = False, stop_event: Optional[threading.Event] = None):
         self.api_keys = self._load_api_keys()
         self.session = self._create_session()
         self.cache = {}
         self.rate_limits = {}
+        # When set, calls over budget wait for a free slot instead of being dropped
+        self.block_on_rate_limit = block_on_rate_limit
+        # Setting it ends rate-limit waits; the waiting calls raise EnrichmentStopped
+        self.stop_event = stop_event or threading.Event()
+        self._rate_limit_lock = threading.Lock()
         
     def _load_api_keys(self) -> Dict[str, str]:
         """Load API keys from environment variables"""
@@ -113,7 +122,7 @@ class ExternalDataService:
     def _create_session(self) -> requests.Session:
         """Create HTTP session with retry strategy"""
         session = requests.Session()
-        retry_strategy = Retry(
+        retry_strategy = InstrumentedRetry(
             total=3,
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
@@ -125,33 +134,49 @@ class ExternalDataService:
     
     def _check_rate_limit(self, api_name: str, limit_per_minute: int = 60) -> bool:
         """Check if API call is within rate limits"""
-        now = datetime.now()
-        if api_name not in self.rate_limits:
-            self.rate_limits[api_name] = []
-        
-        # Remove calls older than 1 minute
-        self.rate_limits[api_name] = [
-            call_time for call_time in self.rate_limits[api_name]
-            if now - call_time < timedelta(minutes=1)
-        ]
-        
-        if len(self.rate_limits[api_name]) >= limit_per_minute:
-            return False
-        
-        self.rate_limits[api_name].append(now)
+        with self._rate_limit_lock:
+            now = datetime.now()
+            if api_name not in self.rate_limits:
+                self.rate_limits[api_name] = []
+            
+            # Remove calls older than 1 minute
+            self.rate_limits[api_name] = [
+                call_time for call_time in self.rate_limits[api_name]
+                if now - call_time < timedelta(minutes=1)
+            ]
+            
+            if len(self.rate_limits[api_name]) >= limit_per_minute:
+                return False
+            
+            self.rate_limits[api_name].append(now)
+            return True
+    
+    def _wait_for_rate_limit(self, api_name: str, limit_per_minute: int = 60) -> bool:
+        """Block until a call slot is free within the rate limit window; False when stopped first"""
+        while not self._check_rate_limit(api_name, limit_per_minute):
+            with self._rate_limit_lock:
+                oldest_call = min(self.rate_limits[api_name], default=datetime.now())
+            wait_seconds = (oldest_call + timedelta(minutes=1) - datetime.now()).total_seconds()
+            if self.stop_event.wait(max(wait_seconds, 0.05)):
+                return False
         return True
     
     def _make_api_call(self, url: str, params: Dict, api_name: str, 
                       rate_limit: int = 60) -> Optional[Dict]:
         """Make API call with rate limiting and error handling"""
-        if not self._check_rate_limit(api_name, rate_limit):
+        if self.block_on_rate_limit:
+            if not self._wait_for_rate_limit(api_name, rate_limit):
+                raise EnrichmentStopped(f"Stop requested while waiting for the {api_name} rate limit")
+        elif not self._check_rate_limit(api_name, rate_limit):
             logger.warning(f"Rate limit exceeded for {api_name}")
+            RATE_LIMITED.labels(source=api_name, kind="local_budget").inc()
             return None
         
         try:
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            with stage_timer(f"enrichment.{api_name}", in_flight=True):
+                response = self.session.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                return decode_response(response)
         except requests.exceptions.RequestException as e:
             logger.error(f"API call failed for {api_name}: {e}")
             return None
@@ -406,8 +431,7 @@ class ExternalDataService:
             if prop_data.get('walk_score_data', {}).get('updated'):
                 prop_data['walk_score_data']['updated'] = prop_data['walk_score_data']['updated'].isoformat()
         
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(output_file, data)
         
         logger.info(f"Saved enriched data to {output_file}")
         return output_file
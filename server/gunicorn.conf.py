@@ -0,0 +1,50 @@
+"""
+Production gunicorn profile for the realtor_api Flask app
+
+    gunicorn -c gunicorn.conf.py realtor_api:app
+
+    # ASGI variant (realtor_asgi.py); THREADS does not apply
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker realtor_asgi:app
+
+Requests spend nearly all their time waiting on realtor.com, so each worker
+process runs a pool of threads (gthread) sharing the module-level
+DreameryPropertyScraper: one connection pool and one access token per
+process. Processes add CPU parallelism for parsing and serialization.
+
+Every setting can be overridden from the environment:
+  DREAMERY_BIND          address to listen on (default 0.0.0.0:5001)
+  DREAMERY_WORKERS       worker processes (default: CPU count, at most 8)
+  DREAMERY_THREADS       threads per worker (default 8)
+  DREAMERY_TIMEOUT       seconds before a silent worker is restarted (default 120;
+                         comps/radius searches page through many sub-queries)
+  DREAMERY_KEEPALIVE     seconds to hold idle keep-alive connections (default 5)
+  DREAMERY_MAX_REQUESTS  requests before a worker is recycled (default 2000, 0 disables)
+  DREAMERY_ACCESS_LOG    access log path (default stdout, empty disables)
+
+Size WORKERS x THREADS with benchmarks/load_test.py against the stand-in.
+Metrics (GET /metrics) are kept per worker process.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("DREAMERY_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("DREAMERY_WORKERS", min(multiprocessing.cpu_count(), 8)))
+worker_class = "gthread"
+threads = int(os.getenv("DREAMERY_THREADS", 8))
+
+# Import the app (pydantic models, compiled queries) once in the master and fork;
+# the scraper opens no connections at import, so workers never share sockets
+preload_app = True
+
+timeout = int(os.getenv("DREAMERY_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = int(os.getenv("DREAMERY_KEEPALIVE", 5))
+
+# Recycle workers now and then to bound memory growth from large result sets
+max_requests = int(os.getenv("DREAMERY_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("DREAMERY_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("DREAMERY_LOG_LEVEL", "info")
@@ -0,0 +1,391 @@
+"""
+Pluggable JSON encode/decode backend
+
+Uses orjson, then msgspec, when installed and falls back to the standard
+library `json`. DREAMERY_JSON_BACKEND=orjson|msgspec|json forces a backend.
+Every backend encodes datetimes, enums, UUIDs, pydantic models and URL types
+itself, so callers can hand over `model_dump()` output (python mode) and skip
+pydantic's slower `mode='json'` conversion pass. Output matches that of
+`model_dump(mode='json')` followed by `json.dumps`.
+
+`decode_response_stream` decodes a large array inside a response (the homes
+of a `home_search` page) one item at a time while the body downloads.
+"""
+
+import codecs
+import datetime
+import decimal
+import enum
+import importlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+BACKEND_PREFERENCE = ("orjson", "msgspec", "json")
+
+
+def _select_backend(requested: Optional[str] = None) -> str:
+    """First importable backend, or the requested one when available"""
+    requested = requested or os.getenv("DREAMERY_JSON_BACKEND")
+    if requested and requested not in BACKEND_PREFERENCE:
+        logger.warning(f"Unknown JSON backend {requested!r}, choosing automatically")
+        requested = None
+
+    for name in ((requested,) if requested else BACKEND_PREFERENCE):
+        if name == "json":
+            return name
+        try:
+            importlib.import_module(name)
+            return name
+        except ImportError:
+            if requested:
+                logger.warning(f"JSON backend {requested!r} is not installed, falling back to json")
+    return "json"
+
+
+def _default(obj: Any) -> Any:
+    """Encode types the native encoders leave to a hook (and everything for stdlib json)"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        value = obj.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "item") and callable(obj.item):  # numpy scalars
+        return obj.item()
+    if hasattr(obj, "tolist") and callable(obj.tolist):  # numpy arrays
+        return obj.tolist()
+    # pydantic URL types, UUIDs, paths and anything else
+    return str(obj)
+
+
+class _StdlibBackend:
+    name = "json"
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        if indent:
+            return json.dumps(obj, default=_default, indent=2).encode("utf-8")
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class _OrjsonBackend:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        options = self._options | self._orjson.OPT_INDENT_2 if indent else self._options
+        return self._orjson.dumps(obj, default=_default, option=options)
+
+
+class _MsgspecBackend:
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder(enc_hook=_default, decimal_format="number")
+        self._decoder = msgspec.json.Decoder()
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> bytes:
+        encoded = self._encoder.encode(obj)
+        return self._msgspec.json.format(encoded, indent=2) if indent else encoded
+
+
+_BACKENDS = {"json": _StdlibBackend, "orjson": _OrjsonBackend, "msgspec": _MsgspecBackend}
+
+
+def get_backend(name: Optional[str] = None):
+    """Backend instance by name (None picks the preferred installed one)"""
+    return _BACKENDS[_select_backend(name)]()
+
+
+_backend = get_backend()
+BACKEND = _backend.name
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Decode JSON text or bytes"""
+    return _backend.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode to UTF-8 JSON bytes"""
+    return _backend.dumps(obj, indent)
+
+
+def dumps_str(obj: Any, indent: bool = False) -> str:
+    """Encode to a JSON string"""
+    return _backend.dumps(obj, indent).decode("utf-8")
+
+
+def decode_response(response) -> Any:
+    """
+    Decode a `requests` response body (replaces `response.json()`)
+
+    A body that is not JSON raises requests.exceptions.JSONDecodeError, as
+    `response.json()` does, so callers catching RequestException still do.
+    """
+    try:
+        return _backend.loads(response.content)
+    except ValueError as e:
+        from requests.exceptions import JSONDecodeError
+
+        if isinstance(e, json.JSONDecodeError):
+            raise JSONDecodeError(e.msg, e.doc, e.pos) from e
+        raise JSONDecodeError(str(e), response.text, 0) from e
+
+
+# Bytes read from a streamed response body at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JSONArrayStream:
+    """
+    Push decoder for the items of the array at `path` (object keys) in a JSON document
+
+    `feed()` takes the document in arbitrary byte chunks and returns the items
+    completed so far; only the unfinished item is buffered. Everything outside
+    the array is collected into `document` (with the array left empty), e.g.
+    `total` and `errors` of a GraphQL response. Items are decoded by the
+    stdlib decoder's C scanner whatever the backend, since orjson and msgspec
+    cannot decode a prefix.
+
+        stream = JSONArrayStream(("data", "home_search", "results"))
+        for chunk in chunks:
+            for home in stream.feed(chunk):
+                ...
+        stream.close()
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self.document: Dict[str, Any] = {}
+        # The array's opening bracket has been read
+        self.reached = False
+        # The whole document has been read
+        self.finished = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._scan = json.JSONDecoder().raw_decode
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._items: List[Any] = []
+        self._steps = self._parse()
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Items completed by `chunk`, in order"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        return self._run()
+
+    def close(self) -> List[Any]:
+        """Remaining items; raises ValueError when the document is incomplete"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        self._eof = True
+        items = self._run()
+        if not self.finished:
+            raise ValueError("Incomplete JSON document")
+        return items
+
+    def _run(self) -> List[Any]:
+        if not self.finished:
+            try:
+                next(self._steps)
+            except StopIteration:
+                self.finished = True
+        items, self._items = self._items, []
+        return items
+
+    # Parsing steps are generators that yield when they need more input
+
+    def _char(self):
+        """Next non-whitespace character (not consumed)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                raise ValueError("Incomplete JSON document")
+            yield
+
+    def _expect(self, char: str):
+        if (yield from self._char()) != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos} of the buffered JSON")
+        self._pos += 1
+
+    def _value(self):
+        """Next complete JSON value"""
+        yield from self._char()
+        while True:
+            try:
+                value, end = self._scan(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                yield
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof:
+                yield
+                continue
+            self._pos = end
+            return value
+
+    def _parse(self):
+        yield from self._object(self.document, 0)
+
+    def _object(self, target: Dict[str, Any], depth: int):
+        yield from self._expect("{")
+        if (yield from self._char()) == "}":
+            self._pos += 1
+            return
+        while True:
+            key = yield from self._value()
+            yield from self._expect(":")
+            on_path = depth < len(self.path) and key == self.path[depth]
+            char = (yield from self._char()) if on_path else None
+            if on_path and depth == len(self.path) - 1 and char == "[":
+                target[key] = []
+                yield from self._array()
+            elif on_path and depth < len(self.path) - 1 and char == "{":
+                target[key] = {}
+                yield from self._object(target[key], depth + 1)
+            else:
+                target[key] = yield from self._value()
+            char = yield from self._char()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self._pos - 1} of the buffered JSON")
+
+    def _array(self):
+        yield from self._expect("[")
+        self.reached = True
+        if (yield from self._char()) == "]":
+            self._pos += 1
+            return
+        while True:
+            item = yield from self._value()
+            self._items.append(item)
+            char = yield from self._char()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {self._pos - 1} of the buffered JSON")
+
+
+class StreamedJSON:
+    """
+    A JSON body decoded while it downloads; iterating yields the items of the array at `path`
+
+    `document` holds everything before the array once `start()` has returned
+    and the whole document (array left empty) once iteration is done. The
+    body is closed when iteration ends or the iterator is dropped.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], path: Sequence[str], close: Optional[Callable[[], None]] = None):
+        self._chunks = iter(chunks)
+        self._stream = JSONArrayStream(path)
+        self._pending: List[Any] = []
+        self._close = close
+
+    @property
+    def document(self) -> Dict[str, Any]:
+        return self._stream.document
+
+    def start(self) -> "StreamedJSON":
+        """Read up to the array (or to the end when the document has none)"""
+        while not self._stream.reached and not self._stream.finished:
+            if not self._read():
+                break
+        if self._stream.finished:
+            self.close()
+        return self
+
+    def _read(self) -> bool:
+        """Feed one more chunk; False at the end of the body"""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._pending += self._stream.close()
+            return False
+        self._pending += self._stream.feed(chunk)
+        return True
+
+    def close(self):
+        """Release the body (done automatically when iteration ends)"""
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            while True:
+                pending, self._pending = self._pending, []
+                yield from pending
+                if self._stream.finished or not self._read():
+                    if self._pending:
+                        continue
+                    return
+        finally:
+            self.close()
+
+
+def decode_response_stream(response, path: Sequence[str]) -> StreamedJSON:
+    """Decode a `requests` response sent with stream=True as it downloads (see StreamedJSON)"""
+    return StreamedJSON(response.iter_content(STREAM_CHUNK_SIZE), path, close=response.close).start()
+
+
+def write_json(path: Union[str, Path], obj: Any, indent: bool = True) -> None:
+    """Write `obj` to `path` as JSON"""
+    with open(path, "wb") as f:
+        f.write(_backend.dumps(obj, indent))
+
+
+def install_flask_json(app):
+    """Serve `jsonify` responses and parse request bodies with the selected backend"""
+    from flask.json.provider import DefaultJSONProvider
+
+    class FastJSONProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by json_backend"""
+
+        def dumps(self, obj: Any, **kwargs: Any) -> str:
+            return dumps_str(obj, indent=bool(kwargs.get("indent")))
+
+        def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+            return loads(s)
+
+        def response(self, *args: Any, **kwargs: Any):
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = self.compact is False or (self.compact is None and self._app.debug)
+            return self._app.response_class(dumps(obj, indent=indent), mimetype=self.mimetype)
+
+    app.json = FastJSONProvider(app)
+    return app
@@ -0,0 +1,352 @@
+"""
+In-process metrics for the scraper, parsers, serializers and enrichment
+
+Histograms, counters and gauges are kept in memory and rendered in the
+Prometheus text exposition format by `render_prometheus()`, which both Flask
+apps serve at `/metrics` (see `install_flask_metrics`). Each labelled child
+holds its own lock and an observation is a bisect plus two additions, so the
+instrumentation is cheap enough to stay on in production.
+
+    with stage_timer("scraper.autocomplete", in_flight=True):
+        response = session.get(...)
+
+    @timed_stage("parse.process_property")
+    def process_property(...): ...
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from urllib3.util.retry import Retry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond parsing up to slow upstream pages
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def collect(self) -> List["_Metric"]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for labelled metrics; `labels()` returns the child that records values"""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(zip(self.labelnames, key))} {_format_value(child.value)}"
+            for key, child in self._items()
+        ]
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class Gauge(Counter):
+    """Value that can go up and down (e.g. operations in flight)"""
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[MetricsRegistry] = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in self._items():
+            pairs = list(zip(self.labelnames, key))
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "dreamery_stage_duration_seconds",
+    "Time spent in each scrape, parse, serialize and enrichment stage",
+    ["stage"],
+)
+STAGE_ERRORS = Counter(
+    "dreamery_stage_errors_total",
+    "Stage executions that raised",
+    ["stage"],
+)
+IN_FLIGHT = Gauge(
+    "dreamery_in_flight",
+    "Operations currently in progress",
+    ["stage"],
+)
+HTTP_RETRIES = Counter(
+    "dreamery_http_retries_total",
+    "Upstream HTTP retries by host and trigger (status code or exception)",
+    ["host", "reason"],
+)
+RATE_LIMITED = Counter(
+    "dreamery_rate_limited_total",
+    "Rate limited calls: upstream 429 responses and calls dropped by the local budget",
+    ["source", "kind"],
+)
+CACHE_LOOKUPS = Counter(
+    "dreamery_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+RAW_FILTER_REJECTIONS = Counter(
+    "dreamery_raw_filter_rejections_total",
+    "Raw homes dropped by raw_filters.RawFilter before parsing, by failed predicate",
+    ["reason"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "dreamery_http_request_duration_seconds",
+    "Flask request latency",
+    ["app", "endpoint", "method", "status"],
+)
+
+
+@contextmanager
+def stage_timer(stage: str, in_flight: bool = False):
+    """Time the enclosed block into STAGE_SECONDS; optionally count it in IN_FLIGHT"""
+    gauge = IN_FLIGHT.labels(stage=stage) if in_flight else None
+    if gauge is not None:
+        gauge.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(stage=stage).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+        if gauge is not None:
+            gauge.dec()
+
+
+def timed_stage(stage: str, in_flight: bool = False):
+    """Decorator form of `stage_timer`"""
+    def decorator(func):
+        histogram = STAGE_SECONDS.labels(stage=stage)
+        errors = STAGE_ERRORS.labels(stage=stage)
+        gauge = IN_FLIGHT.labels(stage=stage) if in_flight else None
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if gauge is not None:
+                gauge.inc()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start)
+                if gauge is not None:
+                    gauge.dec()
+
+        return wrapper
+    return decorator
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count one lookup against `cache`"""
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class InstrumentedRetry(Retry):
+    """urllib3 Retry that counts every retry (and every upstream 429) it handles"""
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        host = getattr(_pool, "host", None) or "unknown"
+        if response is not None and response.status:
+            reason = str(response.status)
+            if response.status == 429:
+                RATE_LIMITED.labels(source=host, kind="upstream_429").inc()
+        else:
+            reason = type(error).__name__ if error is not None else "unknown"
+        HTTP_RETRIES.labels(host=host, reason=reason).inc()
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+def render_prometheus(registry: MetricsRegistry = REGISTRY) -> str:
+    """Render every metric in `registry` in the Prometheus text format"""
+    return "\n".join(metric.render() for metric in registry.collect()) + "\n"
+
+
+def install_flask_metrics(app, app_name: str):
+    """Time every request and `jsonify` call of `app`, track in-flight requests and serve GET /metrics"""
+    from flask import Response, g, request
+
+    in_flight = IN_FLIGHT.labels(stage=f"http.{app_name}")
+
+    class TimedJSONProvider(type(app.json)):
+        """The app's JSON provider with `jsonify` timed as serialize.jsonify"""
+
+        def response(self, *args, **kwargs):
+            with stage_timer("serialize.jsonify"):
+                return super().response(*args, **kwargs)
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+        in_flight.inc()
+
+    @app.teardown_request
+    def _finish_request(exc=None):
+        if getattr(g, "_metrics_start", None) is not None:
+            g._metrics_start = None
+            in_flight.dec()
+
+    @app.after_request
+    def _record_request(response):
+        start = getattr(g, "_metrics_start", None)
+        if start is not None and request.endpoint != "metrics":
+            HTTP_REQUEST_SECONDS.labels(
+                app=app_name,
+                endpoint=request.endpoint or "unknown",
+                method=request.method,
+                status=response.status_code,
+            ).observe(time.perf_counter() - start)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return Response(render_prometheus(), mimetype=CONTENT_TYPE)
+
+    return app
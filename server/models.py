@@ -8,13 +8,16 @@ from enum import Enum
 from typing import Optional, Union, Union, Any, List, Dict, Dict
 from datetime import datetime
 from dataclasses import dataclass
-from pydantic import BaseModel, computed_field, HttpUrl, Field
+from functools import cached_property
+from pydantic import BaseModel, ConfigDict, computed_field, HttpUrl, Field, TypeAdapter, model_validator
 
 
 class ReturnType(Enum):
     pydantic = "pydantic"
     pandas = "pandas"
     raw = "raw"
+    arrow = "arrow"
+    polars = "polars"
 
 
 class SiteName(Enum):
@@ -75,7 +78,13 @@ class PropertyType(Enum):
     OTHER = "OTHER"
 
 
-class Address(BaseModel):
+class _Model(BaseModel):
+    """Base of the models below; validators are built on first use instead of at import"""
+
+    model_config = ConfigDict(defer_build=True)
+
+
+class Address(_Model):
     full_line: Union[str, None] = None
     street: Union[str, None] = None
     unit: Union[str, None] = None
@@ -114,9 +123,18 @@ class Address(BaseModel):
 
 
 
-class Description(BaseModel):
+def webp_photo_url(href: str) -> str:
+    """Large webp rendition of a realtor.com photo href"""
+    return href.replace("s.jpg", "od-w480_h360_x2.webp?w=1080&q=75")
+
+
+_PHOTO_URLS = TypeAdapter(List[HttpUrl], config=ConfigDict(defer_build=True))
+
+
+class Description(_Model):
     primary_photo: Union[HttpUrl, None] = None
-    alt_photos: List[HttpUrl] | None = None
+    # Raw photo hrefs as returned by the API; rewritten and validated only when `alt_photos` is read
+    alt_photo_hrefs: Union[List[str], None] = Field(None, exclude=True, repr=False)
     style: Union[PropertyType, None] = None
     beds: Union[int, None] = Field(None, description="Total number of bedrooms")
     baths_full: Union[int, None] = Field(None, description="Total number of full bathrooms (4 parts: Sink, Shower, Bathtub and Toilet)")
@@ -133,15 +151,38 @@ class Description(BaseModel):
     name: Union[str, None] = None
     type: Union[str, None] = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def _accept_alt_photos(cls, data: Any) -> Any:
+        """Keep accepting `alt_photos` (e.g. from a previous dump) as the raw photo list"""
+        if isinstance(data, dict) and "alt_photos" in data and "alt_photo_hrefs" not in data:
+            data = dict(data)
+            photos = data.pop("alt_photos")
+            data["alt_photo_hrefs"] = [str(photo) for photo in photos] if photos is not None else None
+        return data
+
+    def alt_photo_urls(self) -> Union[List[str], None]:
+        """Alternate photo URLs as plain strings, without URL validation"""
+        if not self.alt_photo_hrefs:
+            return None
+        return [webp_photo_url(href) for href in self.alt_photo_hrefs]
+
+    @computed_field
+    @cached_property
+    def alt_photos(self) -> List[HttpUrl] | None:
+        """Alternate photo URLs, rewritten and validated on first access"""
+        urls = self.alt_photo_urls()
+        return _PHOTO_URLS.validate_python(urls) if urls else None
+
 
-class AgentPhone(BaseModel):
+class AgentPhone(_Model):
     number: Union[str, None] = None
     type: Union[str, None] = None
     primary: Union[bool, None] = None
     ext: Union[str, None] = None
 
 
-class Entity(BaseModel):
+class Entity(_Model):
     name: Union[str, None] = None  # Make name optional since it can be None
     uuid: Union[str, None] = None
 
@@ -170,14 +211,14 @@ class Builder(Entity):
     pass
 
 
-class Advertisers(BaseModel):
+class Advertisers(_Model):
     agent: Union[Agent, None] = None
     broker: Union[Broker, None] = None
     builder: Union[Builder, None] = None
     office: Union[Office, None] = None
 
 
-class Property(BaseModel):
+class Property(_Model):
     property_url: HttpUrl
     property_id: str = Field(..., description="Unique Home identifier also known as property id")
     #: allows_cats: bool
@@ -242,31 +283,31 @@ class Property(BaseModel):
 
 # Specialized models for GraphQL types
 
-class HomeMonthlyFee(BaseModel):
+class HomeMonthlyFee(_Model):
     description: Union[str, None] = None
     display_amount: Union[str, None] = None
 
 
-class HomeOneTimeFee(BaseModel):
+class HomeOneTimeFee(_Model):
     description: Union[str, None] = None
     display_amount: Union[str, None] = None
 
 
-class HomeParkingDetails(BaseModel):
+class HomeParkingDetails(_Model):
     unassigned_space_rent: Union[int, None] = None
     assigned_spaces_available: Union[int, None] = None
     description: Union[str, None] = Field(None, description="Parking information. Currently only some rental data will have it.")
     assigned_space_rent: Union[int, None] = None
 
 
-class PetPolicy(BaseModel):
+class PetPolicy(_Model):
     cats: Union[bool, None] = Field(None, description="Search for homes which allow cats")
     dogs: Union[bool, None] = Field(None, description="Search for homes which allow dogs")
     dogs_small: Union[bool, None] = Field(None, description="Search for homes with allow small dogs")
     dogs_large: Union[bool, None] = Field(None, description="Search for homes which allow large dogs")
 
 
-class OpenHouse(BaseModel):
+class OpenHouse(_Model):
     start_date: Union[datetime, None] = None
     end_date: Union[datetime, None] = None
     description: Union[str, None] = None
@@ -276,7 +317,7 @@ class OpenHouse(BaseModel):
     methods: Union[List[str], None] = None
 
 
-class HomeFlags(BaseModel):
+class HomeFlags(_Model):
     is_pending: Union[bool, None] = None
     is_contingent: Union[bool, None] = None
     is_new_construction: Union[bool, None] = None
@@ -286,7 +327,7 @@ class HomeFlags(BaseModel):
     is_foreclosure: Union[bool, None] = None
 
 
-class PopularityPeriod(BaseModel):
+class PopularityPeriod(_Model):
     clicks_total: Union[int, None] = None
     views_total: Union[int, None] = None
     dwell_time_mean: Union[float, None] = None
@@ -297,17 +338,17 @@ class PopularityPeriod(BaseModel):
     last_n_days: Union[int, None] = None
 
 
-class Popularity(BaseModel):
+class Popularity(_Model):
     periods: List[PopularityPeriod] | None = None
 
 
-class Assessment(BaseModel):
+class Assessment(_Model):
     building: Union[int, None] = None
     land: Union[int, None] = None
     total: Union[int, None] = None
 
 
-class TaxHistory(BaseModel):
+class TaxHistory(_Model):
     assessment: Union[Assessment, None] = None
     market: Union[Assessment, None] = Field(None, description="Market values as provided by the county or local taxing/assessment authority")
     appraisal: Union[Assessment, None] = Field(None, description="Appraised value given by taxing authority")
@@ -317,7 +358,7 @@ class TaxHistory(BaseModel):
     assessed_year: Union[int, None] = Field(None, description="Assessment year for which taxes were billed")
 
 
-class TaxRecord(BaseModel):
+class TaxRecord(_Model):
     cl_id: Union[str, None] = None
     public_record_id: Union[str, None] = None
     last_update_date: Union[datetime, None] = None
@@ -325,12 +366,12 @@ class TaxRecord(BaseModel):
     tax_parcel_id: Union[str, None] = None
 
 
-class EstimateSource(BaseModel):
+class EstimateSource(_Model):
     type: Union[str, None] = Field(None, description="Type of the avm vendor, list of values: corelogic, collateral, quantarium")
     name: Union[str, None] = Field(None, description="Name of the avm vendor")
 
 
-class PropertyEstimate(BaseModel):
+class PropertyEstimate(_Model):
     estimate: Union[int, None] = Field(None, description="Estimated value of a property")
     estimate_high: Union[int, None] = Field(None, description="Estimated high value of a property")
     estimate_low: Union[int, None] = Field(None, description="Estimated low value of a property")
@@ -339,34 +380,34 @@ class PropertyEstimate(BaseModel):
     source: Union[EstimateSource, None] = Field(None, description="Source of the latest estimate value")
 
 
-class HomeEstimates(BaseModel):
+class HomeEstimates(_Model):
     current_values: List[PropertyEstimate] | None = Field(None, description="Current valuation and best value for home from multiple AVM vendors")
 
 
-class PropertyDetails(BaseModel):
+class PropertyDetails(_Model):
     category: Union[str, None] = None
     text: Union[List[str], None] = None
     parent_category: Union[str, None] = None
 
 
-class HomeDetails(BaseModel):
+class HomeDetails(_Model):
     category: Union[str, None] = None
     text: Union[List[str], None] = None
     parent_category: Union[str, None] = None
 
 
-class UnitDescription(BaseModel):
+class UnitDescription(_Model):
     baths_consolidated: Union[str, None] = None
     baths: Union[float, None] = None  # Changed to float to handle values like 2.5
     beds: Union[int, None] = None
     sqft: Union[int, None] = None
 
 
-class UnitAvailability(BaseModel):
+class UnitAvailability(_Model):
     date: Union[datetime, None] = None
 
 
-class Unit(BaseModel):
+class Unit(_Model):
     availability: Union[UnitAvailability, None] = None
     description: Union[UnitDescription, None] = None
     photos: Union[List[dict], None] = None  # Keep as dict for photo structure
@@ -0,0 +1,168 @@
+"""
+Process-pool parse stage for large result sets
+
+Turning raw GraphQL homes into `Property` models (and DataFrame rows) is
+CPU-bound Python, so in one process it runs on one core no matter how many
+network threads fetched the pages. `ParsePool` splits the raw homes into
+chunks and parses them in worker processes:
+
+  - homes go to the workers as orjson-encoded chunks (cheaper to encode and
+    decode than pickling the nested dicts)
+  - `parse()` workers run `process_property` and return each chunk as a
+    compact.PropertyTable, i.e. a handful of NumPy buffers instead of
+    thousands of pickled Pydantic objects; the chunks are concatenated in
+    order
+  - `parse_frame()` workers also run `utils.process_result` and return one
+    DataFrame per chunk (the scrape_property pandas path)
+
+Small inputs are parsed in-process: below `min_homes` the pickling and
+scheduling cost more than they save.
+
+    with ParsePool(workers=4) as pool:
+        table = scraper.search_properties_advanced(location="Dallas, TX", limit=10_000,
+                                                   compact=True, parse_pool=pool)
+"""
+
+import logging
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import json_backend
+from compact import PropertyTable
+from metrics import stage_timer
+from models import ListingType
+from processors import get_key, process_extra_property_details, process_property
+from utils import process_result
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_homes(homes: Iterable[Dict[str, Any]], options: Dict[str, Any]) -> Iterator[Any]:
+    """`Property` models of `homes`; unparseable and filtered-out homes are dropped"""
+    for home in homes:
+        try:
+            prop = process_property(home, get_key_func=get_key,
+                                    process_extra_property_details_func=process_extra_property_details, **options)
+        except Exception as e:
+            logger.error(f"Error processing property with processors: {e}")
+            continue
+        if prop:
+            yield prop
+
+
+def _table_chunk(homes: Iterable[Dict[str, Any]], options: Dict[str, Any]) -> PropertyTable:
+    """One chunk of `ParsePool.parse`"""
+    return PropertyTable.from_properties(_parse_homes(homes, options), keep_details=True)
+
+
+def _frame_chunk(homes: Iterable[Dict[str, Any]], options: Dict[str, Any]) -> "pd.DataFrame":
+    """One chunk of `ParsePool.parse_frame`"""
+    return _concat_frames([process_result(prop) for prop in _parse_homes(homes, options)])
+
+
+def _run_chunk(function: Callable, payload: bytes, options: Dict[str, Any]) -> Any:
+    """Worker entry point: `function` over an orjson-encoded chunk of homes"""
+    return function(json_backend.loads(payload), options)
+
+
+def _concat_frames(frames: List["pd.DataFrame"]) -> "pd.DataFrame":
+    import pandas as pd
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=FutureWarning)
+        return pd.concat(frames, ignore_index=True, axis=0)
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _default_context():
+    # The scraper runs thread pools; forking a threaded parent can copy held locks into the workers
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class ParsePool:
+    """Parses raw homes in worker processes; reusable across searches, close it (or use `with`) when done"""
+
+    # Homes per worker task
+    CHUNK_SIZE = 500
+    # Below this many homes parsing stays in the calling process
+    MIN_HOMES = 1_000
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 min_homes: Optional[int] = None, mp_context=None):
+        """
+        :param workers: Worker processes (default: the CPUs this process may run on)
+        :param mp_context: multiprocessing context (default: forkserver where available, else spawn)
+        """
+        self.workers = workers or _available_cpus()
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.min_homes = self.MIN_HOMES if min_homes is None else min_homes
+        self._mp_context = mp_context or _default_context()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker processes, started on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._mp_context)
+        return self._executor
+
+    def close(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _map(self, function: Callable, homes: Iterable[Dict[str, Any]], options: Dict[str, Any]) -> List[Any]:
+        """`function` over chunks of `homes` in the workers, results in chunk order"""
+        homes = homes if isinstance(homes, Sequence) else list(homes)
+        if len(homes) < self.min_homes or self.workers < 2:
+            return [function(homes, options)]
+        # At least a few chunks per worker so one slow chunk does not idle the others
+        chunk_size = max(1, min(self.chunk_size, -(-len(homes) // (self.workers * 4))))
+        payloads = (json_backend.dumps(list(homes[start:start + chunk_size]))
+                    for start in range(0, len(homes), chunk_size))
+        return list(self.executor.map(_run_chunk, repeat(function), payloads, repeat(options)))
+
+    @staticmethod
+    def _options(mls_only: bool, extra_property_data: bool, exclude_pending: bool,
+                 listing_type: ListingType, alt_photos: bool) -> Dict[str, Any]:
+        return {"mls_only": mls_only, "extra_property_data": extra_property_data, "exclude_pending": exclude_pending,
+                "listing_type": listing_type, "alt_photos": alt_photos}
+
+    def parse(self, homes: Iterable[Dict[str, Any]], mls_only: bool = False, extra_property_data: bool = False,
+              exclude_pending: bool = False, listing_type: ListingType = ListingType.FOR_SALE,
+              alt_photos: bool = True) -> PropertyTable:
+        """`process_property` over `homes` as one PropertyTable (with details), in input order"""
+        options = self._options(mls_only, extra_property_data, exclude_pending, listing_type, alt_photos)
+        with stage_timer("parse.parallel"):
+            return PropertyTable.concat(self._map(_table_chunk, homes, options))
+
+    def parse_frame(self, homes: Iterable[Dict[str, Any]], mls_only: bool = False,
+                    extra_property_data: bool = False, exclude_pending: bool = False,
+                    listing_type: ListingType = ListingType.FOR_SALE, alt_photos: bool = True) -> "pd.DataFrame":
+        """`process_property` + `process_result` over `homes` as one DataFrame, in input order"""
+        options = self._options(mls_only, extra_property_data, exclude_pending, listing_type, alt_photos)
+        with stage_timer("parse.parallel"):
+            return _concat_frames(self._map(_frame_chunk, homes, options))
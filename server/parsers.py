@@ -4,7 +4,7 @@ Parsers for realtor.com data processing
 
 from datetime import datetime
 from typing import Optional, Union, List, Dict, Dict
-from models import Address, Description, PropertyType
+from models import Address, Description, PropertyType, webp_photo_url
 
 
 def parse_open_houses(open_houses_data: Union[List[dict], None]) -> Union[List[dict], None]:
@@ -152,7 +152,7 @@ def parse_estimates(estimates_data: Union[dict, None]) -> Union[dict, None]:
 def parse_neighborhoods(result: dict) -> Optional[str]:
     """Parse neighborhoods from location data"""
     neighborhoods_list = []
-    neighborhoods = result["location"].get("neighborhoods", [])
+    neighborhoods = (result.get("location") or {}).get("neighborhoods", [])
 
     if neighborhoods:
         for neighborhood in neighborhoods:
@@ -170,12 +170,15 @@ def handle_none_safely(address_part):
     return address_part
 
 
-def parse_address(result: dict, search_type: str) -> Address:
-    """Parse address data from result"""
+def parse_address(result: dict, search_type: str) -> Optional[Address]:
+    """Parse address data from result (None when the location fields were not requested)"""
     if search_type == "general_search":
-        address = result["location"]["address"]
+        address = (result.get("location") or {}).get("address")
     else:
-        address = result["address"]
+        address = result.get("address")
+
+    if not address:
+        return None
 
     return Address(
         full_line=address.get("line"),
@@ -189,10 +192,10 @@ def parse_address(result: dict, search_type: str) -> Address:
             ]
             if part is not None
         ).strip(),
-        unit=address["unit"],
-        city=address["city"],
-        state=address["state_code"],
-        zip=address["postal_code"],
+        unit=address.get("unit"),
+        city=address.get("city"),
+        state=address.get("state_code"),
+        zip=address.get("postal_code"),
         
         # Additional address fields
         street_direction=address.get("street_direction"),
@@ -202,8 +205,12 @@ def parse_address(result: dict, search_type: str) -> Address:
     )
 
 
-def parse_description(result: dict) -> Union[Description, None]:
-    """Parse description data from result"""
+def parse_description(result: dict, alt_photos: bool = True) -> Union[Description, None]:
+    """Parse description data from result
+
+    Alternate photos are kept as the raw hrefs and only rewritten/validated when
+    `Description.alt_photos` is read; alt_photos=False drops them.
+    """
     if not result:
         return None
 
@@ -220,11 +227,11 @@ def parse_description(result: dict) -> Union[Description, None]:
     if (primary_photo_info := result.get("primary_photo")) and (
         primary_photo_href := primary_photo_info.get("href")
     ):
-        primary_photo = primary_photo_href.replace("s.jpg", "od-w480_h360_x2.webp?w=1080&q=75")
+        primary_photo = webp_photo_url(primary_photo_href)
 
     return Description(
         primary_photo=primary_photo,
-        alt_photos=process_alt_photos(result.get("photos", [])),
+        alt_photo_hrefs=raw_alt_photo_hrefs(result.get("photos")) if alt_photos else None,
         style=(PropertyType.__getitem__(style) if style and style in PropertyType.__members__ else None),
         beds=description_data.get("beds"),
         baths_full=description_data.get("baths_full"),
@@ -233,7 +240,7 @@ def parse_description(result: dict) -> Union[Description, None]:
         lot_sqft=description_data.get("lot_sqft"),
         sold_price=(
             result.get("last_sold_price") or description_data.get("sold_price")
-            if result.get("last_sold_date") or result["list_price"] != description_data.get("sold_price")
+            if result.get("last_sold_date") or result.get("list_price") != description_data.get("sold_price")
             else None
         ),  #: has a sold date or list and sold price are different
         year_built=description_data.get("year_built"),
@@ -256,24 +263,26 @@ def calculate_days_on_mls(result: dict) -> Optional[int]:
     today = datetime.now()
 
     if list_date:
-        if result["status"] == "sold":
+        if result.get("status") == "sold":
             if last_sold_date:
                 days = (last_sold_date - list_date).days
                 if days >= 0:
                     return days
-        elif result["status"] in ("for_sale", "for_rent"):
+        elif result.get("status") in ("for_sale", "for_rent"):
             days = (today - list_date).days
             if days >= 0:
                 return days
 
 
-def process_alt_photos(photos_info: List[dict]) -> Union[List[str], None]:
-    """Process alternative photos from photos info"""
+def raw_alt_photo_hrefs(photos_info: Optional[List[dict]]) -> Union[List[str], None]:
+    """Photo hrefs as returned by the API"""
     if not photos_info:
         return None
 
-    return [
-        photo_info["href"].replace("s.jpg", "od-w480_h360_x2.webp?w=1080&q=75")
-        for photo_info in photos_info
-        if photo_info.get("href")
-    ]
+    return [photo_info["href"] for photo_info in photos_info if photo_info.get("href")] or None
+
+
+def process_alt_photos(photos_info: List[dict]) -> Union[List[str], None]:
+    """Process alternative photos from photos info"""
+    hrefs = raw_alt_photo_hrefs(photos_info)
+    return [webp_photo_url(href) for href in hrefs] if hrefs else None
@@ -4,6 +4,8 @@ Processors for realtor.com property data processing
 
 from datetime import datetime
 from typing import Optional, Union, Union, List, Dict
+from metrics import timed_stage
+from raw_filters import home_status
 from models import (
     Property,
     ListingType,
@@ -76,10 +78,12 @@ def process_advertisers(advertisers: Union[List[dict], None]) -> Union[Advertise
     return processed_advertisers
 
 
+@timed_stage("parse.process_property")
 def process_property(result: dict, mls_only: bool = False, extra_property_data: bool = False, 
                     exclude_pending: bool = False, listing_type: ListingType = ListingType.FOR_SALE,
-                    get_key_func=None, process_extra_property_details_func=None) -> Union[Property, None]:
-    """Process property data from GraphQL response"""
+                    get_key_func=None, process_extra_property_details_func=None,
+                    alt_photos: bool = True) -> Union[Property, None]:
+    """Process property data from GraphQL response (alt_photos=False drops the alternate photos)"""
     mls = result["source"].get("id") if "source" in result and isinstance(result["source"], dict) else None
 
     if not mls and mls_only:
@@ -92,8 +96,13 @@ def process_property(result: dict, mls_only: bool = False, extra_property_data:
         and result["location"]["address"].get("coordinate")
     )
 
-    is_pending = result["flags"].get("is_pending")
-    is_contingent = result["flags"].get("is_contingent")
+    # Optional field groups (see queries.SEARCH_FIELD_GROUPS) may be absent
+    flags = result.get("flags") or {}
+    location = result.get("location") or {}
+    county = location.get("county")
+
+    is_pending = flags.get("is_pending")
+    is_contingent = flags.get("is_contingent")
 
     if (is_pending or is_contingent) and (exclude_pending and listing_type != ListingType.PENDING):
         return None
@@ -117,7 +126,7 @@ def process_property(result: dict, mls_only: bool = False, extra_property_data:
         property_id=property_id,
         listing_id=result.get("listing_id"),
         permalink=result.get("permalink"),
-        status=("PENDING" if is_pending else "CONTINGENT" if is_contingent else result["status"].upper()),
+        status=home_status(result),
         list_price=result["list_price"],
         list_price_min=result["list_price_min"],
         list_price_max=result["list_price_max"],
@@ -125,15 +134,15 @@ def process_property(result: dict, mls_only: bool = False, extra_property_data:
         prc_sqft=result.get("price_per_sqft"),
         last_sold_date=(datetime.fromisoformat(result["last_sold_date"]) if result.get("last_sold_date") else None),
         pending_date=(datetime.fromisoformat(result["pending_date"].split("T")[0]) if result.get("pending_date") else None),
-        new_construction=result["flags"].get("is_new_construction") is True,
+        new_construction=flags.get("is_new_construction") is True,
         hoa_fee=(result["hoa"]["fee"] if result.get("hoa") and isinstance(result["hoa"], dict) else None),
         latitude=(result["location"]["address"]["coordinate"].get("lat") if able_to_get_lat_long else None),
         longitude=(result["location"]["address"]["coordinate"].get("lon") if able_to_get_lat_long else None),
         address=parse_address(result, search_type="general_search"),
-        description=parse_description(result),
+        description=parse_description(result, alt_photos=alt_photos),
         neighborhoods=parse_neighborhoods(result),
-        county=(result["location"]["county"].get("name") if result["location"]["county"] else None),
-        fips_code=(result["location"]["county"].get("fips_code") if result["location"]["county"] else None),
+        county=(county.get("name") if county else None),
+        fips_code=(county.get("fips_code") if county else None),
         days_on_mls=calculate_days_on_mls(result),
         nearby_schools=prop_details.get("schools"),
         assessed_value=prop_details.get("assessed_value"),
@@ -156,7 +165,7 @@ def process_property(result: dict, mls_only: bool = False, extra_property_data:
         terms=result.get("terms"),
         popularity=result.get("popularity"),
         tax_record=parse_tax_record(result.get("tax_record")),
-        parcel_info=result.get("location", {}).get("parcel"),
+        parcel_info=location.get("parcel"),
         current_estimates=parse_current_estimates(result.get("current_estimates")),
         estimates=parse_estimates(result.get("estimates")),
         photos=result.get("photos"),
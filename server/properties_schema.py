@@ -0,0 +1,125 @@
+"""
+Schema and migrations for the `properties` table used by the enrichment pipeline
+
+The enrichment pipeline repeatedly selects rows with coordinates whose
+enrichment is missing or stale. `ENRICHMENT_DATE_INDEX` turns that selection
+into an index range scan: it is partial on non-null coordinates where the
+database supports partial indexes (SQLite, PostgreSQL) and a plain index on
+`enrichment_date` elsewhere.
+"""
+
+import logging
+from functools import lru_cache
+from typing import List
+
+from sqlalchemy import (
+    Column, DateTime, Float, Index, Integer, MetaData, String, Table, Text,
+    bindparam, inspect, text
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# Only rows with coordinates are ever enriched
+_HAS_COORDINATES = text("latitude IS NOT NULL AND longitude IS NOT NULL")
+
+properties_table = Table(
+    "properties",
+    metadata,
+    Column("property_id", String(64), primary_key=True),
+    Column("address", Text),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Column("list_price", Integer),
+    Column("description", Text),
+    Column("walk_score", Integer),
+    Column("bike_score", Integer),
+    Column("transit_score", Integer),
+    Column("amenities", Text),
+    Column("transit_data", Text),
+    Column("demographics", Text),
+    Column("schools", Text),
+    Column("enrichment_date", DateTime),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+ENRICHMENT_DATE_INDEX = Index(
+    "ix_properties_enrichment_date_with_coordinates",
+    properties_table.c.enrichment_date,
+    sqlite_where=_HAS_COORDINATES,
+    postgresql_where=_HAS_COORDINATES,
+)
+
+INDEXES: List[Index] = [ENRICHMENT_DATE_INDEX]
+
+_ENRICHMENT_CANDIDATES_SELECT = """
+SELECT
+    property_id,
+    address,
+    latitude,
+    longitude,
+    list_price,
+    description,
+    enrichment_date,
+    created_at
+FROM properties
+WHERE latitude IS NOT NULL
+AND longitude IS NOT NULL
+"""
+
+
+@lru_cache(maxsize=None)
+def enrichment_candidates_query(with_cutoff: bool, with_limit: bool) -> TextClause:
+    """
+    Build the enrichment selection with bound `:cutoff` / `:limit` parameters.
+
+    Values are never formatted into the SQL, so each of the four variants has
+    a single statement text that the driver and the database can reuse.
+
+    `enrichment_date IS NULL OR enrichment_date < :cutoff` is written as a
+    UNION ALL of the two branches: planners (SQLite in particular) fall back
+    to a full scan for the OR form but use one index range per branch here.
+    """
+    query = _ENRICHMENT_CANDIDATES_SELECT
+    params = []
+
+    if with_cutoff:
+        query = (
+            f"{query}AND enrichment_date IS NULL\n"
+            "UNION ALL\n"
+            f"{query}AND enrichment_date < :cutoff\n"
+        )
+        params.append(bindparam("cutoff", type_=DateTime))
+
+    if with_limit:
+        query += "LIMIT :limit\n"
+        params.append(bindparam("limit", type_=Integer))
+
+    return text(query).bindparams(*params)
+
+
+def apply_migrations(engine: Engine) -> List[str]:
+    """Create the properties table and its indexes if missing. Returns what was created."""
+    created = []
+    existing_tables = inspect(engine).get_table_names()
+
+    if properties_table.name not in existing_tables:
+        properties_table.create(engine)
+        created.append(properties_table.name)
+        # Table.create also creates the indexes attached to it
+        created.extend(index.name for index in INDEXES)
+        logger.info(f"Created table {properties_table.name}")
+        return created
+
+    existing_indexes = {index["name"] for index in inspect(engine).get_indexes(properties_table.name)}
+    for index in INDEXES:
+        if index.name not in existing_indexes:
+            index.create(engine)
+            created.append(index.name)
+            logger.info(f"Created index {index.name}")
+
+    return created
@@ -0,0 +1,319 @@
+"""
+Local store of scraped properties, so repeat searches skip realtor.com
+
+Every scrape_property call used to go to realtor.com, even for an area that
+was fetched minutes earlier. `PropertyStore` keeps what was scraped in a
+SQLite file (or any SQLAlchemy database):
+
+  - `stored_properties`: one row per property_id with the columns searches
+    filter on, taken from the Property (location, status, price, beds, baths,
+    sqft, dates, coordinates), and the full Property as JSON. Indexed on
+    location (state/city/zip_code/fips_code), list_price, beds, status and
+    list_date for `query`. state and city are stored lower-cased.
+  - `stored_searches` / `stored_search_results`: each search's arguments,
+    when it was fetched, its limit and its property ids in result order, so
+    the same search within `max_age` seconds is answered from the store
+    (`fresh_search`) without a request.
+
+    store = PropertyStore("sqlite:///property_store.db")
+    df = scrape_property("Dallas, TX", store=store, max_age=3600)
+    homes = store.query(state="TX", city="Dallas", min_beds=3, max_price=400_000)
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import (
+    Column, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    create_engine, delete, event, insert, select
+)
+from sqlalchemy.sql import Select
+
+from metrics import record_cache_lookup, stage_timer
+from models import Property
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+stored_properties = Table(
+    "stored_properties",
+    metadata,
+    Column("property_id", String(64), primary_key=True),
+    Column("listing_id", String(64)),
+    Column("mls_id", String(64)),
+    Column("status", String(32)),
+    Column("street", Text),
+    Column("unit", String(64)),
+    Column("city", String(128)),
+    Column("state", String(32)),
+    Column("zip_code", String(16)),
+    Column("county", String(128)),
+    Column("fips_code", String(16)),
+    Column("latitude", Float),
+    Column("longitude", Float),
+    Column("style", String(64)),
+    Column("beds", Integer),
+    Column("full_baths", Integer),
+    Column("half_baths", Integer),
+    Column("sqft", Integer),
+    Column("lot_sqft", Integer),
+    Column("year_built", Integer),
+    Column("list_price", Integer),
+    Column("sold_price", Integer),
+    Column("list_date", DateTime),
+    Column("pending_date", DateTime),
+    Column("last_sold_date", DateTime),
+    Column("days_on_mls", Integer),
+    Column("data", Text, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+Index("ix_stored_properties_location", stored_properties.c.state, stored_properties.c.city,
+      stored_properties.c.zip_code)
+Index("ix_stored_properties_zip_code", stored_properties.c.zip_code)
+Index("ix_stored_properties_fips_code", stored_properties.c.fips_code)
+Index("ix_stored_properties_list_price", stored_properties.c.list_price)
+Index("ix_stored_properties_beds", stored_properties.c.beds)
+Index("ix_stored_properties_status_list_date", stored_properties.c.status, stored_properties.c.list_date)
+Index("ix_stored_properties_list_date", stored_properties.c.list_date)
+
+stored_searches = Table(
+    "stored_searches",
+    metadata,
+    Column("search_key", String(64), primary_key=True),
+    Column("params", Text, nullable=False),
+    Column("search_limit", Integer, nullable=False),
+    Column("result_count", Integer, nullable=False),
+    Column("fetched_at", DateTime, nullable=False),
+)
+
+stored_search_results = Table(
+    "stored_search_results",
+    metadata,
+    Column("search_key", String(64), ForeignKey("stored_searches.search_key"), primary_key=True),
+    Column("position", Integer, primary_key=True),
+    Column("property_id", String(64), nullable=False),
+)
+
+# Rows per DELETE ... IN / executemany batch
+_BATCH_SIZE = 500
+
+
+def _enable_sqlite_wal(dbapi_connection, connection_record):
+    """Let API threads read while a scrape is being written (SQLite only)"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
+def search_key(params: Dict[str, Any]) -> str:
+    """Stable key of a search's arguments"""
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    return value.lower() if value else None
+
+
+def _property_row(prop: Property, updated_at: datetime) -> Dict[str, Any]:
+    """`stored_properties` row of `prop`"""
+    address = prop.address
+    description = prop.description
+    return {
+        "property_id": prop.property_id,
+        "listing_id": prop.listing_id,
+        "mls_id": prop.mls_id,
+        "status": prop.status,
+        "street": address.street if address else None,
+        "unit": address.unit if address else None,
+        "city": _lower(address.city) if address else None,
+        "state": _lower(address.state) if address else None,
+        "zip_code": address.zip if address else None,
+        "county": prop.county,
+        "fips_code": prop.fips_code,
+        "latitude": prop.latitude,
+        "longitude": prop.longitude,
+        "style": getattr(description.style, "value", description.style) if description else None,
+        "beds": description.beds if description else None,
+        "full_baths": description.baths_full if description else None,
+        "half_baths": description.baths_half if description else None,
+        "sqft": description.sqft if description else None,
+        "lot_sqft": description.lot_sqft if description else None,
+        "year_built": description.year_built if description else None,
+        "list_price": prop.list_price,
+        "sold_price": description.sold_price if description else None,
+        "list_date": prop.list_date,
+        "pending_date": prop.pending_date,
+        "last_sold_date": prop.last_sold_date,
+        "days_on_mls": prop.days_on_mls,
+        "data": prop.model_dump_json(),
+        "updated_at": updated_at,
+    }
+
+
+def query_statement(state: Optional[str] = None,
+                    city: Optional[str] = None,
+                    zip_code: Optional[str] = None,
+                    fips_code: Optional[str] = None,
+                    status: Optional[str] = None,
+                    min_price: Optional[int] = None,
+                    max_price: Optional[int] = None,
+                    min_beds: Optional[int] = None,
+                    listed_after: Union[datetime, str, None] = None,
+                    max_age: Optional[float] = None,
+                    limit: int = 1000) -> Select:
+    """SELECT of the stored Property JSON matching every given filter, newest listing first"""
+    table = stored_properties
+    conditions = []
+    if state:
+        conditions.append(table.c.state == state.lower())
+    if city:
+        conditions.append(table.c.city == city.lower())
+    if zip_code:
+        conditions.append(table.c.zip_code == zip_code)
+    if fips_code:
+        conditions.append(table.c.fips_code == fips_code)
+    if status:
+        conditions.append(table.c.status == status)
+    if min_price is not None:
+        conditions.append(table.c.list_price >= min_price)
+    if max_price is not None:
+        conditions.append(table.c.list_price <= max_price)
+    if min_beds is not None:
+        conditions.append(table.c.beds >= min_beds)
+    if listed_after:
+        if isinstance(listed_after, str):
+            listed_after = datetime.fromisoformat(listed_after)
+        conditions.append(table.c.list_date >= listed_after)
+    if max_age is not None:
+        conditions.append(table.c.updated_at >= datetime.now() - timedelta(seconds=max_age))
+    return select(table.c.data).where(*conditions).order_by(table.c.list_date.desc()).limit(limit)
+
+
+def _batches(items: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(items), _BATCH_SIZE):
+        yield items[start:start + _BATCH_SIZE]
+
+
+class PropertyStore:
+    """Scraped properties and searches in a SQLAlchemy database (SQLite file by default)"""
+
+    def __init__(self, db_url: str = None):
+        self.db_url = db_url or os.getenv('DREAMERY_PROPERTY_STORE_URL', 'sqlite:///property_store.db')
+        self.engine = create_engine(self.db_url)
+        if self.engine.dialect.name == 'sqlite':
+            event.listen(self.engine, 'connect', _enable_sqlite_wal)
+        # Creates the tables and their indexes when missing
+        metadata.create_all(self.engine)
+        # No pooled connection may cross a fork of the preloaded app into gunicorn workers
+        self.engine.dispose()
+
+    def save_properties(self, properties: Iterable[Property]) -> List[str]:
+        """Insert or replace `properties`; returns their property ids in order"""
+        with self.engine.begin() as conn:
+            return self._save_properties(conn, properties, datetime.now())
+
+    def _save_properties(self, conn, properties: Iterable[Property], updated_at: datetime) -> List[str]:
+        rows = {}
+        ids = []
+        for prop in properties:
+            if not prop.property_id:
+                continue
+            # A property repeated within one save keeps its last version
+            rows[prop.property_id] = _property_row(prop, updated_at)
+            ids.append(prop.property_id)
+        unique_ids = list(rows)
+        for batch in _batches(unique_ids):
+            conn.execute(delete(stored_properties).where(stored_properties.c.property_id.in_(batch)))
+        for batch in _batches(list(rows.values())):
+            conn.execute(insert(stored_properties), batch)
+        return ids
+
+    def save_search(self, params: Dict[str, Any], properties: Iterable[Property], limit: int) -> int:
+        """Store the results of the search with arguments `params` and `limit`; returns the number stored"""
+        key = search_key(params)
+        fetched_at = datetime.now()
+        with stage_timer("store.write"), self.engine.begin() as conn:
+            ids = self._save_properties(conn, properties, fetched_at)
+            conn.execute(delete(stored_search_results).where(stored_search_results.c.search_key == key))
+            conn.execute(delete(stored_searches).where(stored_searches.c.search_key == key))
+            conn.execute(insert(stored_searches), {
+                "search_key": key,
+                "params": json.dumps(params, sort_keys=True, default=str),
+                "search_limit": limit,
+                "result_count": len(ids),
+                "fetched_at": fetched_at,
+            })
+            results = [{"search_key": key, "position": position, "property_id": property_id}
+                       for position, property_id in enumerate(ids)]
+            for batch in _batches(results):
+                conn.execute(insert(stored_search_results), batch)
+        logger.info(f"Stored {len(ids)} properties for search {key[:12]}")
+        return len(ids)
+
+    def fresh_search(self, params: Dict[str, Any], limit: int, max_age: float) -> Optional[List[Property]]:
+        """
+        The stored results of the search with arguments `params`, or None unless it was
+        fetched at most `max_age` seconds ago with a limit that covers `limit`.
+
+        A search stored with a smaller limit still answers when it came back with fewer
+        results than its limit, since then it already holds everything there was.
+        """
+        key = search_key(params)
+        with stage_timer("store.read"), self.engine.connect() as conn:
+            search = conn.execute(
+                select(stored_searches.c.search_limit, stored_searches.c.result_count, stored_searches.c.fetched_at)
+                .where(stored_searches.c.search_key == key)
+            ).first()
+            fresh = (
+                search is not None
+                and search.fetched_at >= datetime.now() - timedelta(seconds=max_age)
+                and (search.search_limit >= limit or search.result_count < search.search_limit)
+            )
+            record_cache_lookup("property_store", fresh)
+            if not fresh:
+                return None
+            rows = conn.execute(
+                select(stored_properties.c.data)
+                .join(stored_search_results, stored_search_results.c.property_id == stored_properties.c.property_id)
+                .where(stored_search_results.c.search_key == key)
+                .order_by(stored_search_results.c.position)
+                .limit(limit)
+            ).scalars().all()
+        return [Property.model_validate_json(data) for data in rows]
+
+    def get_properties(self, property_ids: Sequence[str]) -> List[Property]:
+        """The stored properties with `property_ids`, in that order; unknown ids are skipped"""
+        data = {}
+        with stage_timer("store.read"), self.engine.connect() as conn:
+            for batch in _batches(list(property_ids)):
+                data.update(conn.execute(
+                    select(stored_properties.c.property_id, stored_properties.c.data)
+                    .where(stored_properties.c.property_id.in_(batch))
+                ).all())
+        return [Property.model_validate_json(data[property_id]) for property_id in property_ids
+                if property_id in data]
+
+    def coordinates(self) -> Tuple[List[str], List[float], List[float], List[Optional[int]]]:
+        """(property ids, latitudes, longitudes, list prices) of the stored properties that have coordinates"""
+        table = stored_properties
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.property_id, table.c.latitude, table.c.longitude, table.c.list_price)
+                .where(table.c.latitude.is_not(None), table.c.longitude.is_not(None))
+            ).all()
+        if not rows:
+            return [], [], [], []
+        property_ids, latitudes, longitudes, list_prices = zip(*rows)
+        return list(property_ids), list(latitudes), list(longitudes), list(list_prices)
+
+    def query(self, **filters) -> List[Property]:
+        """Stored properties matching every filter of `query_statement`, newest listing first"""
+        with stage_timer("store.query"), self.engine.connect() as conn:
+            rows = conn.execute(query_statement(**filters)).scalars().all()
+        return [Property.model_validate_json(data) for data in rows]
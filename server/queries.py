@@ -2,7 +2,19 @@
 GraphQL query templates for Realtor.com data processing
 """
 
-_SEARCH_HOMES_DATA_BASE = """{
+from functools import lru_cache
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from models import SearchPropertyType
+
+# Named groups of `home_search` result fields. A search selects only the groups
+# its caller uses; "core" (ids, status, price, beds/baths and the primary photo)
+# is always included because every parser keys off it.
+SEARCH_FIELD_GROUPS: Dict[str, str] = {
+    "core": """
     pending_date
     listing_id
     property_id
@@ -18,49 +30,6 @@ _SEARCH_HOMES_DATA_BASE = """{
     list_price_min
     price_per_sqft
     tags
-    open_houses {
-        start_date
-        end_date
-        description
-        time_zone
-        dst
-        href
-        methods
-    }
-    details {
-        category
-        text
-        parent_category
-    }
-    pet_policy {
-        cats
-        dogs
-        dogs_small
-        dogs_large
-        __typename
-    }
-    units {
-        availability {
-          date
-          __typename
-        }
-        description {
-          baths_consolidated
-          baths
-          beds
-          sqft
-          __typename
-        }
-        photos(https: true) {
-            title
-            href
-            tags {
-                label
-            }
-        }
-        list_price
-        __typename
-    }
     flags {
         is_contingent
         is_pending
@@ -87,6 +56,10 @@ _SEARCH_HOMES_DATA_BASE = """{
     hoa {
         fee
     }
+    primary_photo(https: true) {
+        href
+    }""",
+    "location": """
     location {
         address {
             street_direction
@@ -110,24 +83,69 @@ _SEARCH_HOMES_DATA_BASE = """{
         neighborhoods {
             name
         }
-    }
-    tax_record {
-        cl_id
-        public_record_id
-        last_update_date
-        apn
-        tax_parcel_id
-    }
-    primary_photo(https: true) {
-        href
-    }
+    }""",
+    "media": """
     photos(https: true) {
         title
         href
         tags {
             label
         }
+    }""",
+    "listing_details": """
+    open_houses {
+        start_date
+        end_date
+        description
+        time_zone
+        dst
+        href
+        methods
+    }
+    details {
+        category
+        text
+        parent_category
+    }""",
+    "rental": """
+    pet_policy {
+        cats
+        dogs
+        dogs_small
+        dogs_large
+        __typename
     }
+    units {
+        availability {
+          date
+          __typename
+        }
+        description {
+          baths_consolidated
+          baths
+          beds
+          sqft
+          __typename
+        }
+        photos(https: true) {
+            title
+            href
+            tags {
+                label
+            }
+        }
+        list_price
+        __typename
+    }""",
+    "tax": """
+    tax_record {
+        cl_id
+        public_record_id
+        last_update_date
+        apn
+        tax_parcel_id
+    }""",
+    "advertisers": """
     advertisers {
         email
         broker {
@@ -178,8 +196,71 @@ _SEARCH_HOMES_DATA_BASE = """{
             href
             fulfillment_id
         }
-    }
-    """
+    }""",
+    "estimates": """
+    current_estimates {
+        __typename
+        source {
+            __typename
+            type
+            name
+        }
+        estimate
+        estimateHigh: estimate_high
+        estimateLow: estimate_low
+        date
+        isBestHomeValue: isbest_homevalue
+    }""",
+}
+
+ALL_FIELD_GROUPS: Tuple[str, ...] = tuple(SEARCH_FIELD_GROUPS)
+
+# Named selections for common callers
+FIELD_GROUP_PRESETS: Dict[str, Tuple[str, ...]] = {
+    "full": ALL_FIELD_GROUPS,
+    "map": ("core", "location"),
+    "list": ("core", "location", "media"),
+}
+
+
+def normalize_field_groups(field_groups: Union[str, Iterable[str], None] = None) -> Tuple[str, ...]:
+    """Resolve a preset name or group list to a canonical tuple (always with "core")"""
+    if field_groups is None:
+        return ALL_FIELD_GROUPS
+    if isinstance(field_groups, str):
+        if field_groups in FIELD_GROUP_PRESETS:
+            return FIELD_GROUP_PRESETS[field_groups]
+        field_groups = [field_groups]
+
+    requested = set(field_groups) | {"core"}
+    unknown = requested - set(SEARCH_FIELD_GROUPS)
+    if unknown:
+        raise ValueError(
+            f"Unknown field group(s) {sorted(unknown)}; expected one of {list(ALL_FIELD_GROUPS)} "
+            f"or a preset {list(FIELD_GROUP_PRESETS)}"
+        )
+    return tuple(group for group in ALL_FIELD_GROUPS if group in requested)
+
+
+@lru_cache(maxsize=None)
+def _compose_selection(field_groups: Tuple[str, ...]) -> str:
+    return "{%s\n}" % "".join(SEARCH_FIELD_GROUPS[group] for group in field_groups)
+
+
+def build_search_homes_data(field_groups: Union[str, Iterable[str], None] = None) -> str:
+    """Build the `results { ... }` selection for `home_search` from the requested field groups"""
+    return _compose_selection(normalize_field_groups(field_groups))
+
+
+@lru_cache(maxsize=None)
+def field_group_keys(group: str) -> Tuple[str, ...]:
+    """Top-level result keys selected by a field group"""
+    return tuple(re.findall(r"^ {4}(\w+)", SEARCH_FIELD_GROUPS[group], re.MULTILINE))
+
+
+_SEARCH_HOMES_DATA_BASE = "{%s\n" % "".join(
+    SEARCH_FIELD_GROUPS[group] for group in ALL_FIELD_GROUPS if group != "estimates"
+)
 
 
 HOME_FRAGMENT = """
@@ -286,24 +367,210 @@ HOMES_DATA = """%s
                 }
 }""" % _SEARCH_HOMES_DATA_BASE
 
-SEARCH_HOMES_DATA = """%s
-current_estimates {
-    __typename
-    source {
-        __typename
-        type
-        name
-    }
-    estimate
-    estimateHigh: estimate_high
-    estimateLow: estimate_low
-    date
-    isBestHomeValue: isbest_homevalue
-}
-}""" % _SEARCH_HOMES_DATA_BASE
+SEARCH_HOMES_DATA = build_search_homes_data(ALL_FIELD_GROUPS)
 
 GENERAL_RESULTS_QUERY = """{
                             count
                             total
                             results %s
                         }""" % SEARCH_HOMES_DATA
+
+
+# `home_search` date filter field for each listing type (bounded by $date_min/$date_max)
+DATE_FILTER_FIELDS: Dict[str, str] = {
+    "sold": "sold_date",
+    "pending": "pending_date",
+    "for_sale": "list_date",
+    "for_rent": "list_date",
+}
+
+# `home_search` status arguments for each listing type; pending homes are for_sale
+# homes flagged pending or contingent
+STATUS_FILTERS: Dict[str, str] = {
+    "for_sale": "status: for_sale",
+    "for_rent": "status: for_rent",
+    "sold": "status: sold",
+    "pending": "status: for_sale or_filters: { contingent: true pending: true }",
+}
+
+# `home_search` range filters and their GraphQL bound type; a search bounds a field
+# with the variables $<field>_min and/or $<field>_max
+RANGE_FILTER_FIELDS: Dict[str, str] = {
+    "list_price": "Int",
+    "beds": "Int",
+    "baths": "Float",
+    "sqft": "Int",
+}
+
+PROPERTY_TYPES = tuple(property_type.value for property_type in SearchPropertyType)
+
+# Full GraphQL documents. `%(results)s` is filled with the projected results selection,
+# `%(filter_variables)s` and `%(filters)s` with the status, property type, range and
+# date filters of the search.
+SEARCH_QUERY_TEMPLATES: Dict[str, Tuple[str, str]] = {
+    "comps": ("Property_search", """
+query Property_search($coordinates: [Float]!, $radius: String!, $offset: Int!%(filter_variables)s) {
+    home_search(
+        query: {
+            nearby: {
+                coordinates: $coordinates
+                radius: $radius
+            }
+            %(filters)s
+        }
+        limit: 200
+        offset: $offset
+    ) {
+        total
+        results %(results)s
+    }
+}
+"""),
+    "area": ("Home_search", """
+query Home_search($city: String, $county: [String], $state_code: String,
+                $postal_code: String, $offset: Int%(filter_variables)s) {
+    home_search(
+        query: {
+            city: $city
+            county: $county
+            postal_code: $postal_code
+            state_code: $state_code
+            %(filters)s
+        }
+        limit: 200
+        offset: $offset
+    ) {
+        total
+        results %(results)s
+    }
+}
+"""),
+}
+
+HOME_QUERY_TEMPLATE = """
+query Home($property_id: ID!) {
+    home(property_id: $property_id) %(results)s
+}
+"""
+
+
+def minify_query(document: str) -> str:
+    """Collapse whitespace runs; the only string literals (property types) contain no whitespace, so this is lossless"""
+    return " ".join(document.split())
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    """A final GraphQL document with its persisted-query hash"""
+    operation_name: str
+    document: str
+    sha256: str
+
+    @property
+    def persisted_query_extension(self) -> Dict[str, Any]:
+        """`extensions` entry for Apollo-style automatic persisted queries"""
+        return {"persistedQuery": {"version": 1, "sha256Hash": self.sha256}}
+
+
+def _compile(operation_name: str, document: str) -> CompiledQuery:
+    document = minify_query(document)
+    return CompiledQuery(operation_name, document, hashlib.sha256(document.encode("utf-8")).hexdigest())
+
+
+def normalize_property_types(property_types: Union[str, Iterable[str], None] = None) -> Tuple[str, ...]:
+    """Validated, de-duplicated and sorted property type filter; empty means every type"""
+    if property_types is None:
+        return ()
+    if isinstance(property_types, str):
+        property_types = [property_types]
+    values = {getattr(property_type, "value", property_type) for property_type in property_types}
+    unknown = sorted(str(value) for value in values if value not in PROPERTY_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown property type(s) {unknown}; expected some of {list(PROPERTY_TYPES)}")
+    return tuple(sorted(values))
+
+
+def range_filter_variables(**bounds: Optional[float]) -> Dict[str, float]:
+    """`$<field>_min`/`$<field>_max` variables for the given bounds, leaving out unset ones
+
+        range_filter_variables(list_price_max=500_000, beds_min=3)
+    """
+    variables = {}
+    for name, value in bounds.items():
+        field, _, bound = name.rpartition("_")
+        if field not in RANGE_FILTER_FIELDS or bound not in ("min", "max"):
+            raise ValueError(f"Unknown range filter bound {name!r}")
+        if value is not None:
+            variables[name] = value
+    return variables
+
+
+def range_filters_in(variables: Dict[str, Any]) -> Tuple[str, ...]:
+    """Range filter fields bounded by `variables`"""
+    return tuple(
+        field for field in RANGE_FILTER_FIELDS
+        if f"{field}_min" in variables or f"{field}_max" in variables
+    )
+
+
+def date_bounded(variables: Dict[str, Any]) -> bool:
+    """True when `variables` bound the date filter field (either end may be open)"""
+    return "date_min" in variables or "date_max" in variables
+
+
+@lru_cache(maxsize=1024)
+def _compile_search_query(search_type: str, field_groups: Tuple[str, ...], date_field: Optional[str],
+                          listing_type: str, property_types: Tuple[str, ...],
+                          range_filters: Tuple[str, ...]) -> CompiledQuery:
+    operation_name, template = SEARCH_QUERY_TEMPLATES[search_type]
+    filter_variables = []
+    filters = [STATUS_FILTERS[listing_type]]
+    if property_types:
+        filters.append("type: [%s]" % ", ".join(f'"{property_type}"' for property_type in property_types))
+    for field in range_filters:
+        graphql_type = RANGE_FILTER_FIELDS[field]
+        filter_variables.append(f"${field}_min: {graphql_type}, ${field}_max: {graphql_type}")
+        filters.append(f"{field}: {{ min: ${field}_min max: ${field}_max }}")
+    if date_field:
+        filter_variables.append("$date_min: String, $date_max: String")
+        filters.append(f"{date_field}: {{ min: $date_min max: $date_max }}")
+    return _compile(operation_name, template % {
+        "results": _compose_selection(field_groups),
+        "filter_variables": "".join(f", {declaration}" for declaration in filter_variables),
+        "filters": "\n            ".join(filters),
+    })
+
+
+def compile_search_query(search_type: str,
+                         field_groups: Union[str, Iterable[str], None] = None,
+                         date_field: Optional[str] = None,
+                         listing_type: str = "for_sale",
+                         property_types: Union[str, Iterable[str], None] = None,
+                         range_filters: Iterable[str] = ()) -> CompiledQuery:
+    """Compiled `home_search` document for a search type ("area" or "comps") and field projection.
+
+    The query is filtered upstream by `listing_type` (one of STATUS_FILTERS) and
+    `property_types` (see normalize_property_types), both inlined. Each field in
+    `range_filters` (RANGE_FILTER_FIELDS) is bounded by the $<field>_min and
+    $<field>_max variables; with `date_field` (one of DATE_FILTER_FIELDS) the
+    query takes $date_min and $date_max (ISO dates, either may be left out)
+    bounding that field. Each combination is built and hashed once per
+    process. Search types other than "comps" use the area query.
+    """
+    search_type = "comps" if search_type == "comps" else "area"
+    if date_field is not None and date_field not in DATE_FILTER_FIELDS.values():
+        raise ValueError(f"Unknown date filter field {date_field!r}")
+    if listing_type not in STATUS_FILTERS:
+        raise ValueError(f"Unknown listing type {listing_type!r}; expected one of {list(STATUS_FILTERS)}")
+    unknown = [field for field in range_filters if field not in RANGE_FILTER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown range filter field(s) {unknown}")
+    range_filters = tuple(field for field in RANGE_FILTER_FIELDS if field in set(range_filters))
+    return _compile_search_query(search_type, normalize_field_groups(field_groups), date_field,
+                                 listing_type, normalize_property_types(property_types), range_filters)
+
+
+@lru_cache(maxsize=None)
+def compile_home_query() -> CompiledQuery:
+    """Compiled `home` (property details) document"""
+    return _compile("Home", HOME_QUERY_TEMPLATE % {"results": HOMES_DATA})
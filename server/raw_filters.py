@@ -0,0 +1,172 @@
+"""
+Predicate pushdown on raw GraphQL homes
+
+`RawFilter` evaluates cheap predicates (MLS presence, pending/contingent
+flags, status, price/beds/baths/sqft ranges, a lat/lon bounding box)
+directly on the `home_search` result dicts, so homes that would be thrown
+away are never parsed into `Property` models or DataFrame rows. Only the
+predicates that are set are evaluated, cheapest first, and every rejection
+is counted by reason on the filter (`rejected`) and in the
+`dreamery_raw_filter_rejections_total` metric.
+
+    raw_filter = RawFilter(mls_only=True, max_price=750_000, bbox=(32.6, -97.0, 33.0, -96.6))
+    survivors = raw_filter.filter(homes)
+"""
+
+from collections import Counter as CounterDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from metrics import RAW_FILTER_REJECTIONS
+from search_planner import home_coordinates
+
+# (south, west, north, east)
+BoundingBox = Tuple[float, float, float, float]
+
+
+def home_status(home: Dict[str, Any]) -> str:
+    """Status of a raw home as `Property.status` reports it (pending/contingent flags win)"""
+    flags = home.get("flags") or {}
+    if flags.get("is_pending"):
+        return "PENDING"
+    if flags.get("is_contingent"):
+        return "CONTINGENT"
+    return (home.get("status") or "").upper()
+
+
+def _description(home: Dict[str, Any]) -> Dict[str, Any]:
+    return home.get("description") or {}
+
+
+def _baths(home: Dict[str, Any]) -> Optional[float]:
+    """Full baths plus half of the half baths"""
+    description = _description(home)
+    full, half = description.get("baths_full"), description.get("baths_half")
+    if full is None and half is None:
+        return None
+    return (full or 0) + 0.5 * (half or 0)
+
+
+# Range filter name -> (raw value getter); a home without a value fails a set bound
+_RANGE_GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "list_price": lambda home: home.get("list_price"),
+    "beds": lambda home: _description(home).get("beds"),
+    "baths": _baths,
+    "sqft": lambda home: _description(home).get("sqft"),
+}
+
+
+@dataclass
+class RawFilter:
+    """Predicates on raw homes; unset fields do not filter"""
+    mls_only: bool = False
+    exclude_pending: bool = False
+    # Listing type of the search; pending searches keep pending homes even with exclude_pending
+    listing_type: str = "for_sale"
+    # Allowed `home_status` values, e.g. {"FOR_SALE", "PENDING"}
+    statuses: Optional[Iterable[str]] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    beds_min: Optional[float] = None
+    beds_max: Optional[float] = None
+    baths_min: Optional[float] = None
+    baths_max: Optional[float] = None
+    sqft_min: Optional[float] = None
+    sqft_max: Optional[float] = None
+    bbox: Optional[BoundingBox] = None
+    rejected: CounterDict = field(default_factory=CounterDict, compare=False, repr=False)
+
+    @classmethod
+    def coerce(cls, value: Union["RawFilter", Dict[str, Any], None]) -> "RawFilter":
+        """A RawFilter from a RawFilter, a dict of its fields (e.g. a JSON request body) or None"""
+        if value is None:
+            return cls()
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            unknown = set(value) - {name for name in cls.__dataclass_fields__ if name != "rejected"}
+            if unknown:
+                raise ValueError(f"Unknown raw filter field(s) {sorted(unknown)}")
+            return cls(**value)
+        raise ValueError(f"Expected a RawFilter or dict, got {type(value).__name__}")
+
+    def with_options(self, mls_only: bool = False, exclude_pending: bool = False,
+                     listing_type: Any = None) -> "RawFilter":
+        """Copy with the search's mls_only/exclude_pending/listing_type folded in"""
+        listing_type = getattr(listing_type, "value", listing_type)
+        return replace(
+            self,
+            mls_only=self.mls_only or mls_only,
+            exclude_pending=self.exclude_pending or exclude_pending,
+            listing_type=str(listing_type).lower() if listing_type else self.listing_type,
+            rejected=self.rejected,
+        )
+
+    def _predicates(self) -> List[Tuple[str, Callable[[Dict[str, Any]], bool]]]:
+        """(reason, predicate) for every set filter, cheapest first"""
+        predicates = []
+        if self.mls_only:
+            predicates.append(("mls", lambda home: bool((home.get("source") or {}).get("id"))))
+        if self.exclude_pending and self.listing_type != "pending":
+            predicates.append(("pending", lambda home: not (
+                (home.get("flags") or {}).get("is_pending") or (home.get("flags") or {}).get("is_contingent")
+            )))
+        if self.statuses is not None:
+            statuses = frozenset(status.upper() for status in self.statuses)
+            predicates.append(("status", lambda home: home_status(home) in statuses))
+
+        bounds = {
+            "list_price": (self.min_price, self.max_price),
+            "beds": (self.beds_min, self.beds_max),
+            "baths": (self.baths_min, self.baths_max),
+            "sqft": (self.sqft_min, self.sqft_max),
+        }
+        for name, (low, high) in bounds.items():
+            if low is None and high is None:
+                continue
+            predicates.append((name, _range_predicate(_RANGE_GETTERS[name], low, high)))
+
+        if self.bbox is not None:
+            south, west, north, east = self.bbox
+
+            def in_bbox(home: Dict[str, Any]) -> bool:
+                coordinates = home_coordinates(home)
+                return coordinates is not None and south <= coordinates[0] <= north and west <= coordinates[1] <= east
+
+            predicates.append(("bbox", in_bbox))
+        return predicates
+
+    def rejection(self, home: Dict[str, Any]) -> Optional[str]:
+        """The first predicate `home` fails, or None when it passes"""
+        for reason, predicate in self._predicates():
+            if not predicate(home):
+                return reason
+        return None
+
+    def filter(self, homes: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """The homes passing every predicate, in order; rejections are counted by reason"""
+        predicates = self._predicates()
+        if not predicates:
+            yield from homes
+            return
+
+        rejected = self.rejected
+        counters = {reason: RAW_FILTER_REJECTIONS.labels(reason=reason) for reason, _ in predicates}
+        for home in homes:
+            for reason, predicate in predicates:
+                if not predicate(home):
+                    rejected[reason] += 1
+                    counters[reason].inc()
+                    break
+            else:
+                yield home
+
+
+def _range_predicate(getter: Callable[[Dict[str, Any]], Any], low: Optional[float],
+                     high: Optional[float]) -> Callable[[Dict[str, Any]], bool]:
+    def predicate(home: Dict[str, Any]) -> bool:
+        value = getter(home)
+        if value is None:
+            return False
+        return (low is None or value >= low) and (high is None or value <= high)
+    return predicate
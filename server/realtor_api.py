@@ -10,12 +10,14 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
 import logging
-from typing import Dict, Any, List
+import os
+from typing import Dict, Any, List, Mapping
 from dreamery_property_scraper import DreameryPropertyScraper
-from models import PropertyData, Property, ListingType, SearchPropertyType, ReturnType, HomeFlags, PetPolicy, OpenHouse, Unit, HomeMonthlyFee, HomeOneTimeFee, HomeParkingDetails, PropertyDetails, Popularity, TaxRecord, PropertyEstimate, HomeEstimates
-from parsers import parse_address, parse_description, parse_open_houses, parse_units, parse_tax_record, parse_estimates
+from models import PropertyData, Property, ReturnType
 from enhanced_scraper import ScraperInput
 from scraper_api import scrape_property
+from metrics import install_flask_metrics, timed_stage
+from json_backend import install_flask_json
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -23,9 +25,48 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
+install_flask_json(app)  # orjson/msgspec responses when installed
+install_flask_metrics(app, "realtor_api")  # Request timing and GET /metrics
 
-# Initialize the scraper
+# One scraper shared by every request thread (per-thread sessions over one connection pool)
 scraper = DreameryPropertyScraper()
+# Worker processes for parsing large /api/realtor/scrape results (unset: parse in the request thread)
+PARSE_WORKERS = int(os.getenv('DREAMERY_PARSE_WORKERS', '0')) or None
+# Local property store /api/realtor/scrape saves to and answers repeat searches from (unset: always scrape)
+PROPERTY_STORE_URL = os.getenv('DREAMERY_PROPERTY_STORE_URL')
+# Seconds a stored search answers repeats; a request's "max_age" overrides it, 0 always scrapes
+STORE_MAX_AGE = float(os.getenv('DREAMERY_STORE_MAX_AGE', '3600'))
+
+# Seconds before the spatial index of the store is rebuilt to pick up newly stored properties
+SPATIAL_INDEX_MAX_AGE = float(os.getenv('DREAMERY_SPATIAL_INDEX_MAX_AGE', '60'))
+# Most properties one bbox/radius query returns
+MAX_SPATIAL_RESULTS = 5000
+
+def _open_property_store():
+    if not PROPERTY_STORE_URL:
+        return None
+    from property_store import PropertyStore
+
+    return PropertyStore(PROPERTY_STORE_URL)
+
+def _open_spatial_index():
+    if property_store is None:
+        return None
+    from spatial_index import StoreSpatialIndex
+
+    return StoreSpatialIndex(property_store, SPATIAL_INDEX_MAX_AGE)
+
+def _open_map_clusterer():
+    if spatial_index is None:
+        return None
+    from map_clusters import MapClusterer
+
+    return MapClusterer(spatial_index.points)
+
+property_store = _open_property_store()
+# Built from the store on the first bbox/radius/clusters query
+spatial_index = _open_spatial_index()
+map_clusterer = _open_map_clusterer()
 
 @app.route('/api/realtor/search', methods=['POST'])
 def search_properties():
@@ -41,8 +82,16 @@ def search_properties():
                 'total': 0
             }), 400
 
-        # Search properties using the scraper
-        properties = scraper.search_properties(**search_params)
+        # Search properties using the scraper ("field_groups" narrows the requested fields, e.g. "map")
+        try:
+            properties = scraper.search_properties(**search_params)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'properties': [],
+                'total': 0
+            }), 400
         
         # Convert Property objects to dictionaries for JSON serialization
         serialized_properties = []
@@ -345,55 +394,9 @@ def scrape_properties_api():
                 'data': None
             }), 400
 
-        listing_type = search_params.get('listing_type', 'for_sale')
         return_type = search_params.get('return_type', 'pandas')
-        property_type = search_params.get('property_type')
-        radius = search_params.get('radius')
-        mls_only = search_params.get('mls_only', False)
-        past_days = search_params.get('past_days')
-        proxy = search_params.get('proxy')
-        date_from = search_params.get('date_from')
-        date_to = search_params.get('date_to')
-        foreclosure = search_params.get('foreclosure')
-        extra_property_data = search_params.get('extra_property_data', True)
-        exclude_pending = search_params.get('exclude_pending', False)
-        limit = search_params.get('limit', 10000)
-
-        # Call the high-level scraping API
-        results = scrape_property(
-            location=location,
-            listing_type=listing_type,
-            return_type=return_type,
-            property_type=property_type,
-            radius=radius,
-            mls_only=mls_only,
-            past_days=past_days,
-            proxy=proxy,
-            date_from=date_from,
-            date_to=date_to,
-            foreclosure=foreclosure,
-            extra_property_data=extra_property_data,
-            exclude_pending=exclude_pending,
-            limit=limit
-        )
-
-        # Handle different return types
-        if return_type == 'pandas':
-            # Convert pandas DataFrame to JSON
-            if hasattr(results, 'to_dict'):
-                data = results.to_dict('records')
-            else:
-                data = results
-        elif return_type == 'pydantic':
-            # Convert Pydantic models to dictionaries
-            data = []
-            for result in results:
-                if hasattr(result, 'model_dump'):
-                    data.append(result.model_dump())
-                else:
-                    data.append(result)
-        else:  # raw
-            data = results
+        results = scrape_property(**scrape_arguments(search_params))
+        data = scrape_response_data(results, return_type)
 
         return jsonify({
             'success': True,
@@ -417,6 +420,165 @@ def scrape_properties_api():
             'data': None
         }), 500
 
+def scrape_arguments(search_params: Dict[str, Any]) -> Dict[str, Any]:
+    """`scrape_property` keyword arguments from a /api/realtor/scrape request body"""
+    return {
+        'location': search_params.get('location'),
+        'listing_type': search_params.get('listing_type', 'for_sale'),
+        'return_type': search_params.get('return_type', 'pandas'),
+        'property_type': search_params.get('property_type'),
+        'radius': search_params.get('radius'),
+        'mls_only': search_params.get('mls_only', False),
+        'past_days': search_params.get('past_days'),
+        'proxy': search_params.get('proxy'),
+        'date_from': search_params.get('date_from'),
+        'date_to': search_params.get('date_to'),
+        'foreclosure': search_params.get('foreclosure'),
+        'extra_property_data': search_params.get('extra_property_data', True),
+        'exclude_pending': search_params.get('exclude_pending', False),
+        'limit': search_params.get('limit', 10000),
+        'parse_workers': PARSE_WORKERS,
+        'store': property_store,
+        'max_age': search_params.get('max_age', STORE_MAX_AGE),
+    }
+
+def store_query_arguments(args: Mapping[str, str]) -> Dict[str, Any]:
+    """`PropertyStore.query` keyword arguments from /api/realtor/store/properties query parameters"""
+    arguments: Dict[str, Any] = {
+        name: args[name] for name in ('state', 'city', 'zip_code', 'fips_code', 'status', 'listed_after')
+        if args.get(name)
+    }
+    for name in ('min_price', 'max_price', 'min_beds', 'limit'):
+        if args.get(name):
+            arguments[name] = int(args[name])
+    if args.get('max_age'):
+        arguments['max_age'] = float(args['max_age'])
+    return arguments
+
+def _number_arg(args: Mapping[str, str], name: str) -> float:
+    value = args.get(name)
+    if value in (None, ''):
+        raise ValueError(f"{name} is required")
+    return float(value)
+
+def _limit_arg(args: Mapping[str, str]) -> int:
+    return max(0, min(int(args.get('limit') or 500), MAX_SPATIAL_RESULTS))
+
+def bbox_arguments(args: Mapping[str, str]) -> Dict[str, Any]:
+    """`StoreSpatialIndex.bbox` keyword arguments from /api/realtor/search/bbox query parameters"""
+    arguments = {name: _number_arg(args, name) for name in ('south', 'west', 'north', 'east')}
+    arguments['limit'] = _limit_arg(args)
+    return arguments
+
+def radius_arguments(args: Mapping[str, str]) -> Dict[str, Any]:
+    """`StoreSpatialIndex.radius` keyword arguments from /api/realtor/search/radius query parameters"""
+    return {
+        'lat': _number_arg(args, 'lat'),
+        'lon': _number_arg(args, 'lon'),
+        'radius_miles': _number_arg(args, 'radius'),
+        'limit': _limit_arg(args),
+    }
+
+def cluster_arguments(args: Mapping[str, str]) -> Dict[str, Any]:
+    """`MapClusterer.clusters` keyword arguments from /api/realtor/search/clusters query parameters"""
+    arguments: Dict[str, Any] = {name: _number_arg(args, name) for name in ('south', 'west', 'north', 'east')}
+    arguments['zoom'] = int(_number_arg(args, 'zoom'))
+    return arguments
+
+def radius_response_properties(matches) -> List[Dict[str, Any]]:
+    """Serialized (property, miles) radius matches, each with its `distance_miles`"""
+    return [{**property_to_dict(prop), 'distance_miles': round(miles, 4)} for prop, miles in matches]
+
+NO_STORE_ERROR = 'Property store is not configured (DREAMERY_PROPERTY_STORE_URL)'
+
+@app.route('/api/realtor/search/bbox', methods=['GET'])
+def search_properties_bbox():
+    """Stored properties inside a map viewport (south, west, north, east), from the spatial index"""
+    if spatial_index is None:
+        return jsonify({'success': False, 'error': NO_STORE_ERROR, 'properties': [], 'total': 0}), 503
+    try:
+        properties = spatial_index.bbox(**bbox_arguments(request.args))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e), 'properties': [], 'total': 0}), 400
+    except Exception as e:
+        logger.error(f"Bounding box search failed: {e}")
+        return jsonify({'success': False, 'error': str(e), 'properties': [], 'total': 0}), 500
+
+    return jsonify({
+        'success': True,
+        'properties': [property_to_dict(prop) for prop in properties],
+        'total': len(properties)
+    })
+
+@app.route('/api/realtor/search/radius', methods=['GET'])
+def search_properties_radius():
+    """Stored properties within `radius` miles of (lat, lon), nearest first, from the spatial index"""
+    if spatial_index is None:
+        return jsonify({'success': False, 'error': NO_STORE_ERROR, 'properties': [], 'total': 0}), 503
+    try:
+        matches = spatial_index.radius(**radius_arguments(request.args))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e), 'properties': [], 'total': 0}), 400
+    except Exception as e:
+        logger.error(f"Radius search failed: {e}")
+        return jsonify({'success': False, 'error': str(e), 'properties': [], 'total': 0}), 500
+
+    return jsonify({
+        'success': True,
+        'properties': radius_response_properties(matches),
+        'total': len(matches)
+    })
+
+@app.route('/api/realtor/search/clusters', methods=['GET'])
+def search_property_clusters():
+    """Map clusters (count, centroid, median price) and sparse individual points for a viewport and zoom"""
+    if map_clusterer is None:
+        return jsonify({'success': False, 'error': NO_STORE_ERROR, 'clusters': [], 'points': [], 'total': 0}), 503
+    try:
+        result = map_clusterer.clusters(**cluster_arguments(request.args))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e), 'clusters': [], 'points': [], 'total': 0}), 400
+    except Exception as e:
+        logger.error(f"Cluster search failed: {e}")
+        return jsonify({'success': False, 'error': str(e), 'clusters': [], 'points': [], 'total': 0}), 500
+
+    return jsonify({'success': True, **result})
+
+@app.route('/api/realtor/store/properties', methods=['GET'])
+def query_property_store():
+    """Stored properties by location, status, price, beds and listing date, without scraping"""
+    if property_store is None:
+        return jsonify({'success': False, 'error': NO_STORE_ERROR, 'properties': [], 'total': 0}), 503
+    try:
+        properties = property_store.query(**store_query_arguments(request.args))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e), 'properties': [], 'total': 0}), 400
+    except Exception as e:
+        logger.error(f"Property store query failed: {e}")
+        return jsonify({'success': False, 'error': str(e), 'properties': [], 'total': 0}), 500
+
+    return jsonify({
+        'success': True,
+        'properties': [property_to_dict(prop) for prop in properties],
+        'total': len(properties)
+    })
+
+def scrape_response_data(results: Any, return_type: str) -> Any:
+    """JSON-ready `data` of a /api/realtor/scrape response for each return type"""
+    if return_type == 'pandas':
+        # Convert pandas DataFrame to JSON
+        if hasattr(results, 'to_dict'):
+            return results.to_dict('records')
+        return results
+    if return_type == 'pydantic':
+        # Convert Pydantic models to dictionaries
+        return [result.model_dump() if hasattr(result, 'model_dump') else result for result in results]
+    if return_type == 'arrow':
+        return results.to_pylist()
+    if return_type == 'polars':
+        return results.to_dicts()
+    return results  # raw
+
 @app.route('/api/realtor/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -514,11 +676,16 @@ def property_data_to_dict(property_data: PropertyData) -> Dict[str, Any]:
 
     return result
 
-def property_to_dict(property_obj: Property) -> Dict[str, Any]:
-    """Convert Property object to dictionary for JSON serialization"""
-    # Use Pydantic's model_dump with mode='json' to handle HttpUrl serialization
+@timed_stage("serialize.property_to_dict")
+def property_to_dict(property_obj: Property, json_safe: bool = False) -> Dict[str, Any]:
+    """Convert Property object to dictionary for JSON serialization
+
+    The app's JSON provider (json_backend) encodes datetimes and URLs itself, so
+    the default python-mode dump skips pydantic's `mode='json'` pass. Pass
+    json_safe=True when the result goes to another encoder.
+    """
     if hasattr(property_obj, 'model_dump'):
-        return property_obj.model_dump(mode='json')
+        return property_obj.model_dump(mode='json') if json_safe else property_obj.model_dump()
     
     # Fallback for legacy objects
     result = {
@@ -589,7 +756,7 @@ def property_to_dict(property_obj: Property) -> Dict[str, Any]:
     if property_obj.description:
         result['description'] = {
             'primary_photo': str(property_obj.description.primary_photo) if property_obj.description.primary_photo else None,
-            'alt_photos': [str(photo) for photo in property_obj.description.alt_photos] if property_obj.description.alt_photos else None,
+            'alt_photos': property_obj.description.alt_photo_urls(),
             'style': property_obj.description.style.value if property_obj.description.style else None,
             'beds': property_obj.description.beds,
             'baths_full': property_obj.description.baths_full,
@@ -646,4 +813,5 @@ def property_to_dict(property_obj: Property) -> Dict[str, Any]:
     return result
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    # Development server; production runs `gunicorn -c gunicorn.conf.py realtor_api:app`
+    app.run(debug=os.getenv('FLASK_DEBUG', '1') == '1', host='0.0.0.0', port=5001, threaded=True)
@@ -0,0 +1,322 @@
+"""
+ASGI variant of the realtor_api search API
+
+Serves the same routes and JSON bodies as the Flask app in realtor_api.py
+(the TypeScript frontend cannot tell them apart), but each request awaits
+its upstream calls on AsyncPropertyScraper instead of holding a worker
+thread, so one process keeps many slow scrapes in flight at once.
+/api/realtor/scrape wraps the synchronous scrape_property pipeline and runs it
+in a worker thread.
+
+The app is a plain ASGI callable with no framework dependency. Run it under any
+ASGI server:
+
+    uvicorn realtor_asgi:app --host 0.0.0.0 --port 5001
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker realtor_asgi:app
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from async_scraper import AsyncPropertyScraper
+from json_backend import dumps, loads
+from metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, IN_FLIGHT, render_prometheus, stage_timer
+from models import Property, PropertyData
+from realtor_api import (
+    NO_STORE_ERROR, bbox_arguments, cluster_arguments, map_clusterer, property_data_to_dict, property_store,
+    property_to_dict, radius_arguments, radius_response_properties, scrape_arguments, scrape_response_data,
+    spatial_index, store_query_arguments
+)
+from scraper_api import scrape_property
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "realtor_asgi"
+
+
+class Request:
+    """The parts of an HTTP request the handlers read"""
+
+    def __init__(self, method: str, path: str, query_string: bytes, headers: Dict[str, str],
+                 body: bytes, path_params: Dict[str, str]):
+        self.method = method
+        self.path = path
+        self.args = {key: values[0] for key, values in parse_qs(query_string.decode("latin-1")).items()}
+        self.headers = headers
+        self.body = body
+        self.path_params = path_params
+
+    def get_json(self) -> Any:
+        """Decoded JSON body, or None when the body is empty"""
+        return loads(self.body) if self.body.strip() else None
+
+
+Handler = Callable[[Request], Awaitable[Tuple[int, Any]]]
+_ROUTES: List[Tuple[str, "re.Pattern", Handler]] = []
+
+
+def route(path: str, method: str = "GET"):
+    """Register a handler for `path`; `<name>` segments become path_params"""
+    pattern = re.compile("^" + re.sub(r"<(\w+)>", r"(?P<\1>[^/]+)", path) + "$")
+
+    def decorator(handler: Handler) -> Handler:
+        _ROUTES.append((method, pattern, handler))
+        return handler
+    return decorator
+
+
+def _serialize_property(prop: Any) -> Any:
+    if isinstance(prop, Property):
+        return property_to_dict(prop)
+    if isinstance(prop, PropertyData):
+        return property_data_to_dict(prop)
+    # Legacy format
+    return prop
+
+
+scraper = AsyncPropertyScraper()
+
+
+@route("/api/realtor/search", "POST")
+async def search_properties(request: Request) -> Tuple[int, Any]:
+    """Search for properties using the integrated parsers"""
+    try:
+        search_params = request.get_json()
+        if not search_params:
+            return 400, {'success': False, 'error': 'No search parameters provided', 'properties': [], 'total': 0}
+
+        try:
+            properties = await scraper.search_properties(**search_params)
+        except ValueError as e:
+            return 400, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+
+        serialized_properties = [_serialize_property(prop) for prop in properties]
+        return 200, {'success': True, 'properties': serialized_properties, 'total': len(serialized_properties)}
+
+    except Exception as e:
+        logger.error(f"Property search failed: {e}")
+        return 500, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+
+
+@route("/api/realtor/property/<property_id>")
+async def get_property_details(request: Request) -> Tuple[int, Any]:
+    """Get detailed information for a specific property"""
+    try:
+        properties = await scraper.get_property_details(request.path_params["property_id"])
+        if not properties:
+            return 404, {'success': False, 'error': 'Property not found', 'property': None}
+        return 200, {'success': True, 'property': _serialize_property(properties[0])}
+
+    except Exception as e:
+        logger.error(f"Failed to get property details: {e}")
+        return 500, {'success': False, 'error': str(e), 'property': None}
+
+
+@route("/api/realtor/suggestions")
+async def get_property_suggestions(request: Request) -> Tuple[int, Any]:
+    """Get property suggestions for autocomplete"""
+    try:
+        query = request.args.get('q', '')
+        limit = int(request.args.get('limit', 10))
+        if not query:
+            return 200, {'success': True, 'suggestions': []}
+
+        location_info = await scraper.handle_location(query)
+        suggestions = [location_info.get('display_name', query)] if location_info else []
+        return 200, {'success': True, 'suggestions': suggestions[:limit]}
+
+    except Exception as e:
+        logger.error(f"Failed to get suggestions: {e}")
+        return 500, {'success': False, 'error': str(e), 'suggestions': []}
+
+
+@route("/api/realtor/scrape", "POST")
+async def scrape_properties_api(request: Request) -> Tuple[int, Any]:
+    """High-level property scraping API with comprehensive validation"""
+    try:
+        search_params = request.get_json()
+        if not search_params:
+            return 400, {'success': False, 'error': 'No search parameters provided', 'data': None}
+        if not search_params.get('location'):
+            return 400, {'success': False, 'error': 'Location is required', 'data': None}
+
+        return_type = search_params.get('return_type', 'pandas')
+        # The full scrape → DataFrame pipeline is synchronous; keep it off the event loop
+        results = await asyncio.to_thread(scrape_property, **scrape_arguments(search_params))
+        data = scrape_response_data(results, return_type)
+        return 200, {
+            'success': True,
+            'data': data,
+            'return_type': return_type,
+            'count': len(data) if isinstance(data, list) else len(data) if hasattr(data, '__len__') else 1
+        }
+
+    except ValueError as e:
+        logger.error(f"Validation error in scrape API: {e}")
+        return 400, {'success': False, 'error': f'Validation error: {str(e)}', 'data': None}
+    except Exception as e:
+        logger.error(f"Scrape API failed: {e}")
+        return 500, {'success': False, 'error': str(e), 'data': None}
+
+
+@route("/api/realtor/search/bbox")
+async def search_properties_bbox(request: Request) -> Tuple[int, Any]:
+    """Stored properties inside a map viewport (south, west, north, east), from the spatial index"""
+    if spatial_index is None:
+        return 503, {'success': False, 'error': NO_STORE_ERROR, 'properties': [], 'total': 0}
+    try:
+        properties = await asyncio.to_thread(spatial_index.bbox, **bbox_arguments(request.args))
+    except ValueError as e:
+        return 400, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+    except Exception as e:
+        logger.error(f"Bounding box search failed: {e}")
+        return 500, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+
+    return 200, {'success': True, 'properties': [property_to_dict(prop) for prop in properties],
+                 'total': len(properties)}
+
+
+@route("/api/realtor/search/radius")
+async def search_properties_radius(request: Request) -> Tuple[int, Any]:
+    """Stored properties within `radius` miles of (lat, lon), nearest first, from the spatial index"""
+    if spatial_index is None:
+        return 503, {'success': False, 'error': NO_STORE_ERROR, 'properties': [], 'total': 0}
+    try:
+        matches = await asyncio.to_thread(spatial_index.radius, **radius_arguments(request.args))
+    except ValueError as e:
+        return 400, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+    except Exception as e:
+        logger.error(f"Radius search failed: {e}")
+        return 500, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+
+    return 200, {'success': True, 'properties': radius_response_properties(matches), 'total': len(matches)}
+
+
+@route("/api/realtor/search/clusters")
+async def search_property_clusters(request: Request) -> Tuple[int, Any]:
+    """Map clusters (count, centroid, median price) and sparse individual points for a viewport and zoom"""
+    if map_clusterer is None:
+        return 503, {'success': False, 'error': NO_STORE_ERROR, 'clusters': [], 'points': [], 'total': 0}
+    try:
+        result = await asyncio.to_thread(map_clusterer.clusters, **cluster_arguments(request.args))
+    except ValueError as e:
+        return 400, {'success': False, 'error': str(e), 'clusters': [], 'points': [], 'total': 0}
+    except Exception as e:
+        logger.error(f"Cluster search failed: {e}")
+        return 500, {'success': False, 'error': str(e), 'clusters': [], 'points': [], 'total': 0}
+
+    return 200, {'success': True, **result}
+
+
+@route("/api/realtor/store/properties")
+async def query_property_store(request: Request) -> Tuple[int, Any]:
+    """Stored properties by location, status, price, beds and listing date, without scraping"""
+    if property_store is None:
+        return 503, {'success': False, 'error': NO_STORE_ERROR, 'properties': [], 'total': 0}
+    try:
+        properties = await asyncio.to_thread(property_store.query, **store_query_arguments(request.args))
+    except ValueError as e:
+        return 400, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+    except Exception as e:
+        logger.error(f"Property store query failed: {e}")
+        return 500, {'success': False, 'error': str(e), 'properties': [], 'total': 0}
+
+    return 200, {'success': True, 'properties': [property_to_dict(prop) for prop in properties],
+                 'total': len(properties)}
+
+
+@route("/api/realtor/health")
+async def health_check(request: Request) -> Tuple[int, Any]:
+    """Health check endpoint"""
+    return 200, {'success': True, 'status': 'healthy', 'message': 'Realtor API is running'}
+
+
+def _match(method: str, path: str) -> Tuple[Optional[Handler], Dict[str, str], bool]:
+    """(handler, path params, whether the path exists for some method)"""
+    path_exists = False
+    for route_method, pattern, handler in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            path_exists = True
+            if route_method == method:
+                return handler, match.groupdict(), True
+    return None, {}, path_exists
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send(send, status: int, body: bytes, content_type: str = "application/json",
+                extra_headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    headers = [
+        (b"content-type", content_type.encode("latin-1")),
+        (b"content-length", str(len(body)).encode("latin-1")),
+        # Same as flask_cors' defaults on the Flask app
+        (b"access-control-allow-origin", b"*"),
+    ]
+    await send({"type": "http.response.start", "status": status, "headers": headers + (extra_headers or [])})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await scraper.close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"]
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+
+    if method == "OPTIONS":
+        # CORS preflight
+        allow_headers = headers.get("access-control-request-headers", "")
+        return await _send(send, 200, b"", "text/html; charset=utf-8", [
+            (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+            (b"access-control-allow-headers", allow_headers.encode("latin-1")),
+        ])
+    if method == "GET" and path == "/metrics":
+        return await _send(send, 200, render_prometheus().encode("utf-8"), CONTENT_TYPE)
+
+    handler, path_params, path_exists = _match(method, path)
+    if handler is None:
+        status = 405 if path_exists else 404
+        error = "Method not allowed" if path_exists else "Not found"
+        return await _send(send, status, dumps({'success': False, 'error': error}))
+
+    in_flight = IN_FLIGHT.labels(stage=f"http.{APP_NAME}")
+    in_flight.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        request = Request(method, path, scope.get("query_string", b""), headers, await _read_body(receive), path_params)
+        status, payload = await handler(request)
+        with stage_timer("serialize.jsonify"):
+            body = dumps(payload)
+        await _send(send, status, body)
+    finally:
+        in_flight.dec()
+        HTTP_REQUEST_SECONDS.labels(
+            app=APP_NAME, endpoint=handler.__name__, method=method, status=status
+        ).observe(time.perf_counter() - start)
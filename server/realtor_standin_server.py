@@ -0,0 +1,380 @@
+"""
+Local stand-in for the realtor.com endpoints used by DreameryPropertyScraper
+
+Serves synthetic `home_search`, `home`, autocomplete and `/auth/token`
+responses (built by `synthetic_data.py`) with tunable latency, page size,
+`total` count, injected 429/403 rates and failed home_search requests, so
+scraper throughput and the retry/backoff behaviour can be measured without
+touching realtor.com.
+GraphQL requests may use Apollo-style persisted queries (hash only, falling
+back to the full document); --no-persisted-queries simulates a server
+without them. The `total` homes have fixed coordinates and list dates, so
+`nearby` (coordinates + radius) searches, $date_min/$date_max ranges,
+list_price/beds/baths/sqft ranges and `type` filters return only the
+matching homes. Every date filter field (sold_date, pending_date,
+list_date) is answered from the synthetic list_date.
+
+Point the scraper at it with `DreameryPropertyScraper(base_url=...)` or the
+REALTOR_BASE_URL environment variable:
+
+    python realtor_standin_server.py --port 5055 --latency-ms 150 --rate-429 0.05
+    REALTOR_BASE_URL=http://127.0.0.1:5055 python cli.py "Dallas, TX" -o csv
+"""
+
+import argparse
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+from queries import SEARCH_FIELD_GROUPS
+from search_planner import haversine_miles
+from synthetic_data import (
+    DEFAULT_CENTER, autocomplete_response, home_detail_response, home_search_response, project_home,
+    requested_field_groups, synthesize_home
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 5055
+
+_BOOL_STRINGS = {"true": True, "1": True, "false": False, "0": False}
+
+_LIMIT_PATTERN = re.compile(r"\blimit:\s*(\d+)")
+_OFFSET_PATTERN = re.compile(r"\boffset:\s*(\d+)")
+_STATUS_PATTERN = re.compile(r"\bstatus:\s*(\w+)")
+_DATE_FILTER_PATTERN = re.compile(r"\b(\w+_date):\s*{\s*min:\s*\$date_min")
+_RANGE_FILTER_PATTERN = re.compile(r"\b(list_price|beds|baths|sqft):\s*{\s*min:")
+_TYPE_FILTER_PATTERN = re.compile(r"\btype:\s*\[([^\]]*)\]")
+
+
+@dataclass
+class StandinConfig:
+    """Tunables for the stand-in server; all can be changed at runtime via POST /_standin/config"""
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    page_size: int = 200
+    total: int = 1000
+    rate_429: float = 0.0
+    rate_403: float = 0.0
+    retry_after: Optional[int] = None
+    # home_search requests still to be answered with a 500 before serving normally
+    fail_home_search: int = 0
+    persisted_queries: bool = True
+    seed: int = 0
+
+    def update(self, values: Dict[str, Any]):
+        """Apply known fields from `values`, coercing to each field's current type; all or nothing on ValueError"""
+        updates = {}
+        for field in fields(self):
+            if field.name in values:
+                value = values[field.name]
+                current = getattr(self, field.name)
+                if value is not None and current is not None:
+                    value = _coerce(field.name, value, type(current))
+                updates[field.name] = value
+        for name, value in updates.items():
+            setattr(self, name, value)
+
+
+def _coerce(name: str, value: Any, kind: type) -> Any:
+    """Convert a config value to `kind`, parsing booleans explicitly so "false" stays False"""
+    if kind is bool:
+        if isinstance(value, str) and value.strip().lower() in _BOOL_STRINGS:
+            return _BOOL_STRINGS[value.strip().lower()]
+        if isinstance(value, (bool, int)) and value in (0, 1):
+            return bool(value)
+        raise ValueError(f"{name} must be a boolean, got {value!r}")
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be {kind.__name__}, got {value!r}") from None
+
+
+class StandinStats:
+    """Thread-safe request/response counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, endpoint: str, status: int):
+        with self._lock:
+            self._counts[f"{endpoint}.requests"] += 1
+            self._counts[f"{endpoint}.{status}"] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+def _home(config: StandinConfig, index: int, status: Optional[str] = None) -> Dict[str, Any]:
+    """Home N of the stand-in's listings; identical across requests"""
+    return synthesize_home(index, random.Random(config.seed + index), center=DEFAULT_CENTER, status=status)
+
+
+class _WorldHome(NamedTuple):
+    lat: float
+    lon: float
+    list_date: str
+    list_price: int
+    beds: int
+    baths: float
+    sqft: int
+    type: str
+
+
+@lru_cache(maxsize=8)
+def _world(seed: int, total: int) -> List[_WorldHome]:
+    """Filterable attributes of every home"""
+    config = StandinConfig(seed=seed)
+    world = []
+    for index in range(total):
+        home = _home(config, index)
+        coordinate = home["location"]["address"]["coordinate"]
+        description = home["description"]
+        world.append(_WorldHome(
+            coordinate["lat"], coordinate["lon"], home["list_date"][:10], home["list_price"],
+            description["beds"], description["baths_full"] + 0.5 * (description.get("baths_half") or 0),
+            description["sqft"], description["type"],
+        ))
+    return world
+
+
+def _in_range(value: float, low: Optional[float], high: Optional[float]) -> bool:
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _matching_indexes(config: StandinConfig, variables: Dict[str, Any],
+                      query: str = "") -> Optional[List[int]]:
+    """Indexes of homes matching the search's `nearby` circle and filters, or None when it has none"""
+    nearby = bool(variables.get("coordinates") and variables.get("radius"))
+    if query:
+        dated = bool(_DATE_FILTER_PATTERN.search(query))
+        ranges = set(_RANGE_FILTER_PATTERN.findall(query))
+        type_match = _TYPE_FILTER_PATTERN.search(query)
+        types = set(re.findall(r"\w+", type_match.group(1))) if type_match else None
+    else:
+        dated = "date_min" in variables or "date_max" in variables
+        ranges = {field for field in ("list_price", "beds", "baths", "sqft")
+                  if f"{field}_min" in variables or f"{field}_max" in variables}
+        types = set(variables["type"]) if variables.get("type") else None
+    if not nearby and not dated and not ranges and not types:
+        return None
+
+    if nearby:
+        lon, lat = variables["coordinates"][:2]
+        radius = float(str(variables["radius"]).rstrip("mi"))
+    date_min = (variables.get("date_min") or "0000-00-00")[:10] if dated else None
+    date_max = (variables.get("date_max") or "9999-99-99")[:10] if dated else None
+    bounds = [(field, variables.get(f"{field}_min"), variables.get(f"{field}_max")) for field in sorted(ranges)]
+
+    return [
+        index for index, home in enumerate(_world(config.seed, config.total))
+        if (not nearby or haversine_miles(lat, lon, home.lat, home.lon) <= radius)
+        and (not dated or date_min <= home.list_date <= date_max)
+        and (not types or home.type in types)
+        and all(_in_range(getattr(home, field), low, high) for field, low, high in bounds)
+    ]
+
+
+def _search_page(config: StandinConfig, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Synthesize the requested `home_search` page; home N is identical across requests"""
+    limit_match = _LIMIT_PATTERN.search(query)
+    limit = int(variables.get("limit") or (limit_match.group(1) if limit_match else config.page_size))
+
+    offset_match = _OFFSET_PATTERN.search(query)
+    offset = int(variables.get("offset") or (offset_match.group(1) if offset_match else 0))
+
+    status_match = _STATUS_PATTERN.search(query)
+    status = status_match.group(1) if status_match else None
+
+    indexes = _matching_indexes(config, variables, query)
+    total = config.total if indexes is None else len(indexes)
+    count = max(0, min(limit, config.page_size, total - offset))
+    page = range(offset, offset + count) if indexes is None else indexes[offset:offset + count]
+    homes = [_home(config, index, status) for index in page]
+
+    # Answer with only the requested field groups when the query selects a subset
+    field_groups = requested_field_groups(query)
+    if field_groups and len(field_groups) < len(SEARCH_FIELD_GROUPS):
+        homes = [project_home(home, field_groups) for home in homes]
+    return home_search_response(homes, total=total)
+
+
+def create_app(config: Optional[StandinConfig] = None) -> Flask:
+    """Build the stand-in Flask app"""
+    config = config or StandinConfig()
+    stats = StandinStats()
+    fault_rng = random.Random(config.seed)
+    fault_lock = threading.Lock()
+    # Persisted-query documents by sha256, registered by full-text requests
+    persisted_documents: Dict[str, str] = {}
+
+    app = Flask(__name__)
+    app.config["STANDIN_CONFIG"] = config
+    app.config["STANDIN_STATS"] = stats
+
+    def simulate(endpoint: str) -> Optional[Tuple[Any, int, Dict[str, str]]]:
+        """Sleep for the configured latency and maybe return an injected error"""
+        delay_ms = config.latency_ms
+        with fault_lock:
+            if config.latency_jitter_ms:
+                delay_ms += fault_rng.uniform(0, config.latency_jitter_ms)
+            roll = fault_rng.random()
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        if roll < config.rate_429:
+            stats.record(endpoint, 429)
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else {}
+            return jsonify({"error": "Too Many Requests"}), 429, headers
+        if roll < config.rate_429 + config.rate_403:
+            stats.record(endpoint, 403)
+            return jsonify({"error": "Forbidden"}), 403, {}
+        return None
+
+    @app.route("/suggest", methods=["GET"])
+    def suggest():
+        if (fault := simulate("suggest")) is not None:
+            return fault
+        stats.record("suggest", 200)
+        return jsonify(autocomplete_response(request.args.get("input", "")))
+
+    @app.route("/auth/token", methods=["POST"])
+    def auth_token():
+        if (fault := simulate("auth_token")) is not None:
+            return fault
+        stats.record("auth_token", 200)
+        return jsonify({"access_token": f"standin-{uuid.uuid4()}", "token_type": "Bearer", "expires_in": 3600})
+
+    @app.route("/graphql", methods=["POST"])
+    @app.route("/api/v1/rdc_search_srp", methods=["POST"])
+    def graphql():
+        payload = request.get_json(silent=True) or {}
+        query = payload.get("query") or ""
+        variables = payload.get("variables") or {}
+
+        query_hash = ((payload.get("extensions") or {}).get("persistedQuery") or {}).get("sha256Hash")
+        if query_hash:
+            if not config.persisted_queries:
+                stats.record("persisted_query", "unsupported")
+                return jsonify({"errors": [{"message": "PersistedQueryNotSupported"}]})
+            if query:
+                if hashlib.sha256(query.encode("utf-8")).hexdigest() != query_hash:
+                    stats.record("persisted_query", 400)
+                    return jsonify({"errors": [{"message": "provided sha does not match query"}]}), 400
+                persisted_documents[query_hash] = query
+                stats.record("persisted_query", "registered")
+            elif query_hash in persisted_documents:
+                query = persisted_documents[query_hash]
+                stats.record("persisted_query", "hit")
+            else:
+                stats.record("persisted_query", "miss")
+                return jsonify({"errors": [{
+                    "message": "PersistedQueryNotFound",
+                    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+                }]})
+
+        endpoint = "home_search" if "home_search" in query else "home"
+        if (fault := simulate(endpoint)) is not None:
+            return fault
+        if endpoint == "home_search":
+            with fault_lock:
+                fail = config.fail_home_search > 0
+                if fail:
+                    config.fail_home_search -= 1
+            if fail:
+                stats.record(endpoint, 500)
+                return jsonify({"error": "Internal Server Error"}), 500
+
+        if endpoint == "home_search":
+            body = _search_page(config, query, variables)
+        elif "home(" in query:
+            body = home_detail_response(variables.get("property_id"))
+        else:
+            stats.record(endpoint, 400)
+            return jsonify({"errors": [{"message": "Unsupported query"}]}), 400
+
+        stats.record(endpoint, 200)
+        return jsonify(body)
+
+    @app.route("/_standin/stats", methods=["GET", "DELETE"])
+    def standin_stats():
+        if request.method == "DELETE":
+            stats.reset()
+        return jsonify(stats.snapshot())
+
+    @app.route("/_standin/config", methods=["GET", "POST"])
+    def standin_config():
+        if request.method == "POST":
+            try:
+                config.update(request.get_json(silent=True) or {})
+            except ValueError as exc:
+                return jsonify({"error": str(exc)}), 400
+        return jsonify(asdict(config))
+
+    return app
+
+
+def serve_in_thread(config: Optional[StandinConfig] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> Tuple[Any, str]:
+    """Start the stand-in on a background thread. Returns (server, base_url); call server.shutdown() to stop."""
+    app = create_app(config)
+    server = make_server(host, port, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="realtor-standin", daemon=True)
+    thread.start()
+    server.app = app
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Local realtor.com stand-in for load and throughput testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base latency added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random latency added on top")
+    parser.add_argument("--page-size", type=int, default=200, help="Maximum homes per home_search page")
+    parser.add_argument("--total", type=int, default=1000, help="`total` reported by home_search")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-403", type=float, default=0.0, help="Fraction of requests answered with 403")
+    parser.add_argument("--retry-after", type=int, help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--no-persisted-queries", action="store_true",
+                        help="Answer hash-only requests with PersistedQueryNotSupported")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    config = StandinConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        page_size=args.page_size,
+        total=args.total,
+        rate_429=args.rate_429,
+        rate_403=args.rate_403,
+        retry_after=args.retry_after,
+        persisted_queries=not args.no_persisted_queries,
+        seed=args.seed,
+    )
+    logger.info(f"Serving realtor.com stand-in at http://{args.host}:{args.port} with {config}")
+    create_app(config).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
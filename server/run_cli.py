@@ -12,8 +12,6 @@ from pathlib import Path
 # Add the server directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from scraper_api import scrape_property
-
 
 def main():
     parser = argparse.ArgumentParser(description="Dreamery Property Scraper CLI")
@@ -140,6 +138,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help and usage errors skip the scraper's start-up cost
+    from scraper_api import scrape_property
+
     try:
         print(f"Scraping properties in {args.location}...")
         print(f"Listing type: {args.listing_type}")
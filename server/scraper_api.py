@@ -3,13 +3,20 @@ High-level property scraping API with comprehensive validation
 """
 
 import warnings
-import pandas as pd
-from typing import Union, Optional, List, Dict
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Union, Optional, List, Dict
 from enhanced_scraper import ScraperInput
 from models import ListingType, SearchPropertyType, ReturnType, Property
 from dreamery_property_scraper import DreameryPropertyScraper
+from queries import normalize_property_types
+from raw_filters import RawFilter
 from utils import process_result, ordered_properties, validate_input, validate_dates, validate_limit
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import polars as pl
+    import pyarrow as pa
+    from property_store import PropertyStore
+
 
 
 
@@ -27,14 +34,18 @@ def scrape_property(
     foreclosure: bool = None,
     extra_property_data: bool = True,
     exclude_pending: bool = False,
-    limit: int = 10000
-) -> Union[pd.DataFrame, List[dict], List[Property]]:
+    limit: int = 10000,
+    parse_workers: Optional[int] = None,
+    store: Optional["PropertyStore"] = None,
+    max_age: Optional[float] = None
+) -> Union["pd.DataFrame", List[dict], List[Property], "pa.Table", "pl.DataFrame"]:
     """
     Scrape properties from Realtor.com based on a given location and listing type.
     
     :param location: Location to search (e.g. "Dallas, TX", "85281", "2530 Al Lipscomb Way")
     :param listing_type: Listing Type (for_sale, for_rent, sold, pending)
-    :param return_type: Return type (pandas, pydantic, raw)
+    :param return_type: Return type (pandas, pydantic, raw, arrow, polars). arrow and polars return a
+        pyarrow Table / polars DataFrame built straight from the parsed properties (see columnar).
     :param property_type: Property Type (single_family, multi_family, condos, condo_townhome_rowhome_coop, condo_townhome, townhomes, duplex_triplex, farm, land, mobile)
     :param radius: Get properties within _ (e.g. 1.0) miles. Only applicable for individual addresses.
     :param mls_only: If set, fetches only listings with MLS IDs.
@@ -48,38 +59,45 @@ def scrape_property(
     :param extra_property_data: Increases requests by O(n). If set, this fetches additional property data (e.g. agent, broker, property evaluations etc.)
     :param exclude_pending: If true, this excludes pending or contingent properties from the results, unless listing type is pending.
     :param limit: Limit the number of results returned. Maximum is 10,000.
+    :param parse_workers: For return_type pandas, arrow or polars, parse results of more than
+        ParsePool.MIN_HOMES homes in this many worker processes (see parallel_parse).
+    :param store: property_store.PropertyStore the scraped properties are saved to (not for return_type raw).
+    :param max_age: With `store`, answer from the store without scraping when the same search was
+        stored at most this many seconds ago (unset or 0: always scrape, then store).
     """
-    validate_input(listing_type)
-    validate_dates(date_from, date_to)
-    validate_limit(limit)
-
-    scraper_input = ScraperInput(
-        location=location,
-        listing_type=ListingType(listing_type.upper()),
-        return_type=ReturnType(return_type.lower()),
-        property_type=[SearchPropertyType[prop.upper()] for prop in property_type] if property_type else None,
-        proxy=proxy,
-        radius=radius,
-        mls_only=mls_only,
-        last_x_days=past_days,
-        date_from=date_from,
-        date_to=date_to,
-        foreclosure=foreclosure,
-        extra_property_data=extra_property_data,
-        exclude_pending=exclude_pending,
-        limit=limit,
-    )
+    scraper_input = _scraper_input(location, listing_type, return_type, property_type, radius, mls_only, past_days,
+                                   proxy, date_from, date_to, foreclosure, extra_property_data, exclude_pending, limit)
+    if store is not None and scraper_input.return_type != ReturnType.raw:
+        return _stored_result(scraper_input, parse_workers, store, max_age)
 
     scraper = DreameryPropertyScraper.from_scraper_input(scraper_input)
+
+    if scraper_input.return_type in (ReturnType.arrow, ReturnType.polars):
+        return _columnar_result(scraper, scraper_input, parse_workers)
     
     # Use appropriate search method based on return type
-    if scraper_input.return_type == ReturnType.pandas:
+    if scraper_input.return_type == ReturnType.pandas and parse_workers:
+        listing_type = scraper_input.listing_type.value.lower()
+        homes = _raw_homes(scraper, scraper_input) or []
+        from parallel_parse import ParsePool
+
+        with ParsePool(workers=parse_workers) as pool:
+            results = [pool.parse_frame(
+                homes,
+                mls_only=scraper_input.mls_only,
+                extra_property_data=scraper_input.extra_property_data,
+                exclude_pending=scraper_input.exclude_pending,
+                listing_type=scraper.LISTING_TYPES.get(listing_type, ListingType.FOR_SALE)
+            )]
+    elif scraper_input.return_type == ReturnType.pandas:
         results = scraper.search_properties_comprehensive(
             location=scraper_input.location,
             listing_type=scraper_input.listing_type.value.lower(),
             property_types=[pt.value for pt in scraper_input.property_type] if scraper_input.property_type else None,
             radius=scraper_input.radius,
             past_days=scraper_input.last_x_days,
+            date_from=scraper_input.date_from,
+            date_to=scraper_input.date_to,
             limit=scraper_input.limit,
             mls_only=scraper_input.mls_only,
             extra_property_data=scraper_input.extra_property_data,
@@ -92,6 +110,8 @@ def scrape_property(
             property_types=[pt.value for pt in scraper_input.property_type] if scraper_input.property_type else None,
             radius=scraper_input.radius,
             past_days=scraper_input.last_x_days,
+            date_from=scraper_input.date_from,
+            date_to=scraper_input.date_to,
             limit=scraper_input.limit,
             mls_only=scraper_input.mls_only,
             extra_property_data=scraper_input.extra_property_data,
@@ -100,14 +120,170 @@ def scrape_property(
 
     if scraper_input.return_type != ReturnType.pandas:
         return results
+    return _properties_frame(results)
 
-    properties_dfs = [df for result in results if not (df := process_result(result)).empty]
+
+def _properties_frame(results: Iterable[Union[Property, "pd.DataFrame"]]) -> "pd.DataFrame":
+    """The return_type pandas DataFrame of parsed properties (or frames of them)"""
+    import pandas as pd
+
+    properties_dfs = [
+        df for result in results
+        if not (df := result if isinstance(result, pd.DataFrame) else process_result(result)).empty
+    ]
     if not properties_dfs:
         return pd.DataFrame()
 
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", category=FutureWarning)
 
-        return pd.concat(properties_dfs, ignore_index=True, axis=0)[ordered_properties()].replace(
+        return pd.concat(properties_dfs, ignore_index=True, axis=0)[ordered_properties].replace(
             {"None": pd.NA, None: pd.NA, "": pd.NA}
         )
+
+
+def iter_properties(
+    location: str,
+    listing_type: str = "for_sale",
+    property_type: Optional[List[str]] = None,
+    radius: float = None,
+    mls_only: bool = False,
+    past_days: int = None,
+    proxy: str = None,
+    date_from: str = None,
+    date_to: str = None,
+    foreclosure: bool = None,
+    extra_property_data: bool = True,
+    exclude_pending: bool = False,
+    limit: int = 10000
+) -> Iterator[Property]:
+    """
+    The properties of scrape_property(return_type="pydantic"), yielded as their pages arrive.
+
+    Pages are decoded and parsed while later ones download, so nothing holds the whole
+    result; see scrape_property for the parameters. Arguments are validated on the call,
+    the search starts on the first `next()`.
+    """
+    scraper_input = _scraper_input(location, listing_type, "pydantic", property_type, radius, mls_only, past_days,
+                                   proxy, date_from, date_to, foreclosure, extra_property_data, exclude_pending, limit)
+    return _iter_properties(DreameryPropertyScraper.from_scraper_input(scraper_input), scraper_input)
+
+
+def _iter_properties(scraper: DreameryPropertyScraper, scraper_input: ScraperInput) -> Iterator[Property]:
+    listing_type = scraper.LISTING_TYPES.get(scraper_input.listing_type.value.lower(), ListingType.FOR_SALE)
+    for home in _raw_homes(scraper, scraper_input, stream=True) or []:
+        prop = scraper._process_property_with_processors(
+            home,
+            mls_only=scraper_input.mls_only,
+            extra_property_data=scraper_input.extra_property_data,
+            exclude_pending=scraper_input.exclude_pending,
+            listing_type=listing_type
+        )
+        if prop:
+            yield prop
+
+
+def _columnar_result(scraper: DreameryPropertyScraper, scraper_input: ScraperInput,
+                     parse_workers: Optional[int]) -> Union["pa.Table", "pl.DataFrame"]:
+    """The search as a pyarrow Table or polars DataFrame, with no pandas in between"""
+    import columnar
+
+    return_type = scraper_input.return_type.value
+    # Fail before scraping when the library is missing
+    columnar.require(return_type)
+    return columnar.to_columnar(_parsed_properties(scraper, scraper_input, parse_workers), return_type)
+
+
+def _parsed_properties(scraper: DreameryPropertyScraper, scraper_input: ScraperInput,
+                       parse_workers: Optional[int]) -> Iterable[Property]:
+    """The search's properties: streamed, or parsed in `parse_workers` processes into a PropertyTable"""
+    if not parse_workers:
+        return _iter_properties(scraper, scraper_input)
+
+    from parallel_parse import ParsePool
+
+    with ParsePool(workers=parse_workers) as pool:
+        return pool.parse(
+            _raw_homes(scraper, scraper_input) or [],
+            mls_only=scraper_input.mls_only,
+            extra_property_data=scraper_input.extra_property_data,
+            exclude_pending=scraper_input.exclude_pending,
+            listing_type=scraper.LISTING_TYPES.get(scraper_input.listing_type.value.lower(), ListingType.FOR_SALE)
+        )
+
+
+def _stored_result(scraper_input: ScraperInput, parse_workers: Optional[int], store: "PropertyStore",
+                   max_age: Optional[float]) -> Union["pd.DataFrame", List[Property], "pa.Table", "pl.DataFrame"]:
+    """The search from `store` when fresh enough, otherwise scraped and saved to `store`"""
+    return_type = scraper_input.return_type
+    if return_type in (ReturnType.arrow, ReturnType.polars):
+        import columnar
+
+        columnar.require(return_type.value)
+
+    params = _search_params(scraper_input)
+    properties = store.fresh_search(params, scraper_input.limit, max_age) if max_age else None
+    if properties is None:
+        scraper = DreameryPropertyScraper.from_scraper_input(scraper_input)
+        properties = list(_parsed_properties(scraper, scraper_input, parse_workers))
+        store.save_search(params, properties, scraper_input.limit)
+
+    if return_type == ReturnType.pandas:
+        return _properties_frame(properties)
+    if return_type in (ReturnType.arrow, ReturnType.polars):
+        import columnar
+
+        return columnar.to_columnar(properties, return_type.value)
+    return properties
+
+
+def _search_params(scraper_input: ScraperInput) -> Dict[str, Any]:
+    """The arguments that decide a search's results, as stored with it (see property_store)"""
+    return scraper_input.model_dump(mode="json", exclude={"return_type", "proxy", "limit"})
+
+
+def _scraper_input(location: str, listing_type: str, return_type: str, property_type: Optional[List[str]],
+                   radius: Optional[float], mls_only: bool, past_days: Optional[int], proxy: Optional[str],
+                   date_from: Optional[str], date_to: Optional[str], foreclosure: Optional[bool],
+                   extra_property_data: bool, exclude_pending: bool, limit: int) -> ScraperInput:
+    """Validated ScraperInput for the scrape_property arguments"""
+    validate_input(listing_type)
+    validate_dates(date_from, date_to)
+    validate_limit(limit)
+
+    return ScraperInput(
+        location=location,
+        listing_type=ListingType(listing_type.upper()),
+        return_type=ReturnType(return_type.lower()),
+        property_type=[SearchPropertyType[prop.upper()] for prop in property_type] if property_type else None,
+        proxy=proxy,
+        radius=radius,
+        mls_only=mls_only,
+        last_x_days=past_days,
+        date_from=date_from,
+        date_to=date_to,
+        foreclosure=foreclosure,
+        extra_property_data=extra_property_data,
+        exclude_pending=exclude_pending,
+        limit=limit,
+    )
+
+
+def _raw_homes(scraper: DreameryPropertyScraper, scraper_input: ScraperInput,
+               stream: bool = False) -> Optional[Iterable[Dict]]:
+    """Raw homes of the search, with the MLS and pending filters applied before parsing"""
+    listing_type = scraper_input.listing_type.value.lower()
+    return scraper.search_raw_homes(
+        location=scraper_input.location,
+        listing_type=listing_type,
+        property_types=normalize_property_types(
+            [pt.value for pt in scraper_input.property_type] if scraper_input.property_type else None
+        ),
+        radius=scraper_input.radius,
+        past_days=scraper_input.last_x_days,
+        date_from=scraper_input.date_from,
+        date_to=scraper_input.date_to,
+        limit=scraper_input.limit,
+        raw_filter=RawFilter().with_options(scraper_input.mls_only, scraper_input.exclude_pending, listing_type),
+        stream=stream
+    )
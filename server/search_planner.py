@@ -0,0 +1,374 @@
+"""
+Search planners that split one large home_search into sub-queries
+
+A single home_search query returns at most one page (200 homes on
+realtor.com), so dense radius searches lose everything past the first page.
+`SpatialTilePlanner` covers the search area with a quadtree of tiles, each
+queried as the `nearby` circle circumscribing it. Tiles whose `total` still
+exceeds what one page returned are subdivided (and past `max_depth`, paged through
+by offset). Tiles run concurrently, and results are clipped to their tile
+and the search region and then deduplicated by `property_id`.
+
+`DateWindowPlanner` does the same along time: a long `sold_date` /
+`list_date` / `pending_date` range is cut into windows whose `total` fits
+one page, fetched in parallel and merged.
+
+With stream=True either planner yields homes as their pages arrive instead
+of returning the merged list. A `select` stage (a raw filter, a job-wide
+deduplicator) runs on each page's new homes, and only the homes it passes
+count towards `limit`, so selective searches still fill it. Sub-queries are started only a few pages ahead
+of the consumer, so a slow consumer bounds the pages held in memory.
+
+A failed sub-query is retried (`max_attempts` in all, with a growing pause);
+one that still fails leaves the result incomplete, which is logged as a
+warning with the home count and recorded in `last_stats`.
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+# fetch(variables) -> (homes on the page, total matching homes)
+FetchPage = Callable[[Dict[str, Any]], Tuple[List[Dict[str, Any]], int]]
+# select(homes) -> the homes to keep, e.g. RawFilter.filter
+SelectHomes = Callable[[Iterable[Dict[str, Any]]], Iterable[Dict[str, Any]]]
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in miles"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+def home_coordinates(home: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a raw GraphQL home, if present"""
+    coordinate = ((home.get("location") or {}).get("address") or {}).get("coordinate") or {}
+    lat, lon = coordinate.get("lat"), coordinate.get("lon")
+    return (lat, lon) if lat is not None and lon is not None else None
+
+
+@dataclass(frozen=True)
+class Tile:
+    """Lat/lon box; contains points with south <= lat < north and west <= lon < east"""
+    south: float
+    west: float
+    north: float
+    east: float
+    depth: int = 0
+
+    @classmethod
+    def around(cls, lat: float, lon: float, radius_miles: float) -> "Tile":
+        """Smallest box containing the circle of `radius_miles` around (lat, lon)"""
+        dlat = radius_miles / MILES_PER_DEGREE_LAT
+        dlon = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        return cls(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    @property
+    def circumradius_miles(self) -> float:
+        """Radius of the circle through the corners; the tile's `nearby` query radius"""
+        lat, lon = self.center
+        return max(
+            haversine_miles(lat, lon, corner_lat, corner_lon)
+            for corner_lat in (self.south, self.north)
+            for corner_lon in (self.west, self.east)
+        )
+
+    def contains(self, lat: float, lon: float) -> bool:
+        return self.south <= lat < self.north and self.west <= lon < self.east
+
+    def split(self) -> List["Tile"]:
+        """The four quadrants"""
+        lat, lon = self.center
+        depth = self.depth + 1
+        return [
+            Tile(self.south, self.west, lat, lon, depth),
+            Tile(self.south, lon, lat, self.east, depth),
+            Tile(lat, self.west, self.north, lon, depth),
+            Tile(lat, lon, self.north, self.east, depth),
+        ]
+
+
+@dataclass(frozen=True)
+class DateWindow:
+    """Inclusive range of calendar days"""
+    start: date
+    end: date
+    depth: int = 0
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    def split(self, parts: int) -> List["DateWindow"]:
+        """`parts` consecutive, non-overlapping windows covering this one"""
+        parts = max(1, min(parts, self.days))
+        bounds = [self.start + timedelta(days=self.days * index // parts) for index in range(parts + 1)]
+        return [
+            DateWindow(bounds[index], bounds[index + 1] - timedelta(days=1), self.depth + 1)
+            for index in range(parts)
+        ]
+
+
+@dataclass
+class PlanStats:
+    """What a planner run did"""
+    requests: int = 0
+    parts: int = 0
+    subdivided: int = 0
+    paged: int = 0
+    max_depth: int = 0
+    retries: int = 0
+    failures: int = 0
+    truncated: bool = False
+    duplicates: int = 0
+
+    @property
+    def complete(self) -> bool:
+        """False when a sub-query still failed after its retries, so homes may be missing"""
+        return not self.failures
+
+
+@dataclass
+class _Merged:
+    seen: Set[str] = field(default_factory=set)
+    stats: PlanStats = field(default_factory=PlanStats)
+
+    def add(self, home: Dict[str, Any]) -> bool:
+        """True when `home` is the first with its property_id"""
+        property_id = home.get("property_id")
+        if property_id is None:
+            return False
+        if property_id in self.seen:
+            self.stats.duplicates += 1
+            return False
+        self.seen.add(property_id)
+        return True
+
+
+class _SubqueryPlanner:
+    """Runs a search as concurrent sub-queries, splitting any whose `total` exceeds one page
+
+    Subclasses define how a part (tile, date window) becomes query variables,
+    which returned homes it owns, and how it splits.
+    """
+
+    def __init__(self, fetch_page: FetchPage, max_workers: int = 8, max_pages_per_part: int = 50,
+                 max_attempts: int = 3, retry_backoff: float = 0.5):
+        self.fetch_page = fetch_page
+        self.max_workers = max_workers
+        self.max_pages_per_part = max_pages_per_part
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.last_stats = PlanStats()
+
+    def _variables(self, part, offset: int, base_variables: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _keep(self, part, homes: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        return iter(homes)
+
+    def _split(self, part, total: int, page_size: int) -> List[Any]:
+        """Sub-parts to query instead; empty when `part` cannot be split further"""
+        raise NotImplementedError
+
+    def _fetch(self, variables: Dict[str, Any], attempt: int) -> Tuple[List[Dict[str, Any]], int]:
+        if attempt:
+            # Runs on a worker thread, so the pause holds back only this sub-query
+            time.sleep(self.retry_backoff * attempt)
+        return self.fetch_page(variables)
+
+    def _execute(self, root, base_variables: Optional[Dict[str, Any]], limit: Optional[int],
+                 stream: bool = False,
+                 select: Optional[SelectHomes] = None) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        homes = self._iterate(root, base_variables, limit, select)
+        return homes if stream else list(homes)
+
+    def _iterate(self, root, base_variables: Optional[Dict[str, Any]], limit: Optional[int],
+                 select: Optional[SelectHomes] = None) -> Iterator[Dict[str, Any]]:
+        """New homes as each sub-query's page arrives, deduplicated by property_id and passed
+        through `select`, at most `limit`"""
+        merged = _Merged()
+        # Homes yielded; the ones `select` dropped do not count towards `limit`
+        yielded = 0
+        stats = merged.stats
+        base_variables = base_variables or {}
+        # (part, offset, attempt) of each sub-query in flight
+        pending: Dict[Any, Tuple[Any, int, int]] = {}
+        # Sub-queries waiting for a worker. At most 2 * max_workers pages are in flight or
+        # fetched but not yet taken, so a slow consumer holds back the fetching.
+        queued: Deque[Tuple[Any, int, int]] = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(part, offset: int = 0, attempt: int = 0):
+                queued.append((part, offset, attempt))
+
+            def start_queued():
+                while queued and len(pending) < 2 * self.max_workers:
+                    part, offset, attempt = queued.popleft()
+                    stats.requests += 1
+                    future = executor.submit(self._fetch, self._variables(part, offset, base_variables), attempt)
+                    pending[future] = (part, offset, attempt)
+
+            try:
+                submit(root)
+                stats.parts += 1
+                start_queued()
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        part, offset, attempt = pending.pop(future)
+                        try:
+                            homes, total = future.result()
+                        except Exception as e:
+                            if attempt + 1 < self.max_attempts:
+                                stats.retries += 1
+                                logger.warning(f"Sub-query failed for {part} at offset {offset}, retrying: {e}")
+                                submit(part, offset, attempt + 1)
+                            else:
+                                stats.failures += 1
+                                logger.error(f"Sub-query failed for {part} at offset {offset} "
+                                             f"after {self.max_attempts} attempts: {e}")
+                            start_queued()
+                            continue
+
+                        # Queue the follow-up queries before handing out this page
+                        if not offset and total > len(homes):
+                            children = self._split(part, total, len(homes))
+                            if children:
+                                stats.subdivided += 1
+                                for child in children:
+                                    stats.parts += 1
+                                    stats.max_depth = max(stats.max_depth, child.depth)
+                                    submit(child)
+                            else:
+                                # Cannot split further: page through the part
+                                stats.paged += 1
+                                page_size = max(len(homes), 1)
+                                pages = min(math.ceil(total / page_size), self.max_pages_per_part)
+                                for page in range(1, pages):
+                                    submit(part, page * page_size)
+
+                        start_queued()
+                        new_homes = (home for home in self._keep(part, homes) if merged.add(home))
+                        for home in (select(new_homes) if select is not None else new_homes):
+                            yield home
+                            yielded += 1
+                            if limit is not None and yielded >= limit:
+                                stats.truncated = bool(pending or queued)
+                                return
+            finally:
+                # Also reached when the caller stops iterating early
+                for future in pending:
+                    future.cancel()
+                self.last_stats = stats
+                if stats.complete:
+                    logger.info(f"{type(self).__name__}: {yielded} homes from {stats}")
+                else:
+                    logger.warning(f"{type(self).__name__}: INCOMPLETE, {yielded} homes with "
+                                   f"{stats.failures} failed sub-queries; {stats}")
+
+
+class SpatialTilePlanner(_SubqueryPlanner):
+    """Quadtree tiling for radius and bounding-box searches"""
+
+    def __init__(self, fetch_page: FetchPage, max_depth: int = 6, max_workers: int = 8,
+                 max_pages_per_part: int = 50, max_attempts: int = 3, retry_backoff: float = 0.5):
+        super().__init__(fetch_page, max_workers, max_pages_per_part, max_attempts, retry_backoff)
+        self.max_depth = max_depth
+        self._in_region: Callable[[float, float], bool] = lambda lat, lon: True
+
+    def search_radius(self, lat: float, lon: float, radius_miles: float,
+                      base_variables: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                      stream: bool = False,
+                      select: Optional[SelectHomes] = None) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """All homes within `radius_miles` of (lat, lon); with stream=True yielded as their tiles arrive"""
+        self._in_region = lambda home_lat, home_lon: haversine_miles(lat, lon, home_lat, home_lon) <= radius_miles
+        return self._execute(Tile.around(lat, lon, radius_miles), base_variables, limit, stream, select)
+
+    def search_bbox(self, south: float, west: float, north: float, east: float,
+                    base_variables: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                    stream: bool = False,
+                    select: Optional[SelectHomes] = None) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """All homes inside a lat/lon bounding box; with stream=True yielded as their tiles arrive"""
+        self._in_region = lambda home_lat, home_lon: True
+        return self._execute(Tile(south, west, north, east), base_variables, limit, stream, select)
+
+    def _variables(self, tile: Tile, offset: int, base_variables: Dict[str, Any]) -> Dict[str, Any]:
+        lat, lon = tile.center
+        variables = dict(base_variables)
+        variables.update({
+            "coordinates": [lon, lat],
+            "radius": f"{tile.circumradius_miles:.4f}mi",
+            "offset": offset,
+        })
+        for key in ("city", "county", "state_code", "postal_code", "property_id"):
+            variables.pop(key, None)
+        return variables
+
+    def _keep(self, tile: Tile, homes: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for home in homes:
+            coordinates = home_coordinates(home)
+            if coordinates is None:
+                # Cannot be placed in a tile; only the root query keeps it
+                if tile.depth == 0:
+                    yield home
+            elif tile.contains(*coordinates) and self._in_region(*coordinates):
+                yield home
+
+    def _split(self, tile: Tile, total: int, page_size: int) -> List[Tile]:
+        return tile.split() if tile.depth < self.max_depth else []
+
+
+class DateWindowPlanner(_SubqueryPlanner):
+    """Date-range sharding for searches bounded by $date_min/$date_max
+
+    A window whose `total` exceeds one page is cut into enough equal windows
+    for each to fit (with some headroom), and those are split again if they
+    still do not. Single-day windows are paged by offset.
+    """
+
+    def __init__(self, fetch_page: FetchPage, max_workers: int = 8, max_pages_per_part: int = 50,
+                 headroom: float = 1.25, max_attempts: int = 3, retry_backoff: float = 0.5):
+        super().__init__(fetch_page, max_workers, max_pages_per_part, max_attempts, retry_backoff)
+        self.headroom = headroom
+
+    def search(self, date_min: date, date_max: date, base_variables: Optional[Dict[str, Any]] = None,
+               limit: Optional[int] = None, stream: bool = False,
+               select: Optional[SelectHomes] = None) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """All homes whose date field falls between `date_min` and `date_max` (inclusive);
+        with stream=True yielded as their windows arrive"""
+        if date_max < date_min:
+            raise ValueError(f"date_max {date_max} is before date_min {date_min}")
+        return self._execute(DateWindow(date_min, date_max), base_variables, limit, stream, select)
+
+    def _variables(self, window: DateWindow, offset: int, base_variables: Dict[str, Any]) -> Dict[str, Any]:
+        variables = dict(base_variables)
+        variables.update({
+            "date_min": window.start.isoformat(),
+            "date_max": window.end.isoformat(),
+            "offset": offset,
+        })
+        return variables
+
+    def _split(self, window: DateWindow, total: int, page_size: int) -> List[DateWindow]:
+        if window.days <= 1:
+            return []
+        return window.split(max(2, math.ceil(total * self.headroom / max(page_size, 1))))
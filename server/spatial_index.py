@@ -0,0 +1,205 @@
+"""
+In-process spatial index over locally held properties
+
+Map viewports ("homes in this box") and comps ("within 0.5 mi of X") used to
+need another upstream query. `SpatialIndex` answers both from coordinates
+already held in memory:
+
+  - points are bucketed into a lat/lon grid of `cell_degrees` cells and
+    sorted by cell, so every grid row of a query box is one contiguous slice
+    found with `np.searchsorted`; only the sorted cell keys are kept, so
+    empty cells cost nothing
+  - the slices' points are filtered exactly with vectorized comparisons
+    (boxes) or a vectorized haversine distance (radius queries, whose box is
+    `Tile.around` the circle)
+
+`StoreSpatialIndex` keeps a SpatialIndex over the coordinates in a
+property_store.PropertyStore (as `IndexedPoints`, with the id and list price
+of every point), rebuilt when older than `max_age` seconds, and returns the
+matching Property objects; it backs /api/realtor/search/bbox and
+/api/realtor/search/radius, and map_clusters clusters its points.
+
+    index = SpatialIndex(latitudes, longitudes)
+    positions = index.bbox(32.7, -96.9, 32.9, -96.7)
+    positions, miles = index.radius(32.78, -96.80, 0.5)
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import Property
+from search_planner import EARTH_RADIUS_MILES, Tile
+
+if TYPE_CHECKING:
+    from property_store import PropertyStore
+
+logger = logging.getLogger(__name__)
+
+# ~0.7 miles of latitude; a city viewport spans a few dozen grid rows
+DEFAULT_CELL_DEGREES = 0.01
+
+
+def haversine_miles_array(lat: float, lon: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distances in miles from (lat, lon) to each point"""
+    phi1 = math.radians(lat)
+    phi2 = np.radians(latitudes)
+    dphi = phi2 - phi1
+    dlambda = np.radians(longitudes - lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(phi2) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    """Grid index of points; queries return positions into the arrays it was built from"""
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float],
+                 cell_degrees: float = DEFAULT_CELL_DEGREES):
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if latitudes.shape != longitudes.shape or latitudes.ndim != 1:
+            raise ValueError("latitudes and longitudes must be 1-D arrays of the same length")
+        if cell_degrees <= 0:
+            raise ValueError("cell_degrees must be positive")
+        self.cell_degrees = cell_degrees
+        self._lat_origin = float(latitudes.min()) if len(latitudes) else 0.0
+        self._lon_origin = float(longitudes.min()) if len(longitudes) else 0.0
+        self._rows = self._cell(latitudes.max(), self._lat_origin) + 1 if len(latitudes) else 0
+        self._cols = self._cell(longitudes.max(), self._lon_origin) + 1 if len(longitudes) else 0
+
+        keys = self._cells(latitudes, self._lat_origin) * self._cols + self._cells(longitudes, self._lon_origin)
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        self._latitudes = latitudes[self._order]
+        self._longitudes = longitudes[self._order]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the index arrays"""
+        return self._order.nbytes + self._keys.nbytes + self._latitudes.nbytes + self._longitudes.nbytes
+
+    def _cell(self, value: float, origin: float) -> int:
+        return int((value - origin) // self.cell_degrees)
+
+    def _cells(self, values: np.ndarray, origin: float) -> np.ndarray:
+        return ((values - origin) // self.cell_degrees).astype(np.int64)
+
+    def _candidates(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Sorted-array positions of the points in the grid cells overlapping the box"""
+        row_min = max(self._cell(south, self._lat_origin), 0)
+        row_max = min(self._cell(north, self._lat_origin), self._rows - 1)
+        col_min = max(self._cell(west, self._lon_origin), 0)
+        col_max = min(self._cell(east, self._lon_origin), self._cols - 1)
+        if row_min > row_max or col_min > col_max:
+            return np.empty(0, dtype=np.int64)
+
+        row_keys = np.arange(row_min, row_max + 1, dtype=np.int64) * self._cols
+        starts = np.searchsorted(self._keys, row_keys + col_min, side="left")
+        ends = np.searchsorted(self._keys, row_keys + col_max, side="right")
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        # Concatenated ranges starts[i]:ends[i] without a Python loop
+        offsets = np.cumsum(lengths) - lengths
+        return np.arange(total, dtype=np.int64) + np.repeat(starts - offsets, lengths)
+
+    def bbox(self, south: float, west: float, north: float, east: float,
+             limit: Optional[int] = None) -> np.ndarray:
+        """Positions of the points with south <= lat <= north and west <= lon <= east"""
+        if south > north or west > east:
+            # Boxes across the antimeridian are not supported
+            raise ValueError("bbox needs south <= north and west <= east")
+        candidates = self._candidates(south, west, north, east)
+        latitudes = self._latitudes[candidates]
+        longitudes = self._longitudes[candidates]
+        inside = (latitudes >= south) & (latitudes <= north) & (longitudes >= west) & (longitudes <= east)
+        positions = self._order[candidates[inside]]
+        return positions[:limit] if limit is not None else positions
+
+    def radius(self, lat: float, lon: float, radius_miles: float,
+               limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, miles) of the points within `radius_miles` of (lat, lon), nearest first"""
+        if radius_miles < 0:
+            raise ValueError("radius_miles must not be negative")
+        box = Tile.around(lat, lon, radius_miles)
+        candidates = self._candidates(box.south, box.west, box.north, box.east)
+        miles = haversine_miles_array(lat, lon, self._latitudes[candidates], self._longitudes[candidates])
+        inside = miles <= radius_miles
+        candidates, miles = candidates[inside], miles[inside]
+        if limit is not None and limit < len(miles):
+            nearest = np.argpartition(miles, limit)[:limit]
+            candidates, miles = candidates[nearest], miles[nearest]
+        nearest_first = np.argsort(miles, kind="stable")
+        return self._order[candidates[nearest_first]], miles[nearest_first]
+
+
+@dataclass(frozen=True, eq=False)
+class IndexedPoints:
+    """A SpatialIndex with the property id, coordinates and list price at each of its positions"""
+    index: SpatialIndex
+    property_ids: List[str]
+    latitudes: np.ndarray
+    longitudes: np.ndarray
+    # NaN where the list price is unknown
+    list_prices: np.ndarray
+
+    @classmethod
+    def build(cls, property_ids: List[str], latitudes: Sequence[float], longitudes: Sequence[float],
+              list_prices: Optional[Sequence[Optional[float]]] = None,
+              cell_degrees: float = DEFAULT_CELL_DEGREES) -> "IndexedPoints":
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        if list_prices is None:
+            prices = np.full(len(latitudes), np.nan)
+        else:
+            prices = np.array([np.nan if price is None else price for price in list_prices], dtype=np.float64)
+        return cls(SpatialIndex(latitudes, longitudes, cell_degrees), list(property_ids), latitudes, longitudes,
+                   prices)
+
+
+class StoreSpatialIndex:
+    """SpatialIndex over the coordinates of a PropertyStore, rebuilt when older than `max_age` seconds"""
+
+    def __init__(self, store: "PropertyStore", max_age: float = 60.0, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.store = store
+        self.max_age = max_age
+        self.cell_degrees = cell_degrees
+        self._points: Optional[IndexedPoints] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def points(self) -> IndexedPoints:
+        """The current index of the stored points; a new object after every rebuild"""
+        with self._lock:
+            if self._points is None or time.monotonic() - self._built_at > self.max_age:
+                start = time.perf_counter()
+                self._points = IndexedPoints.build(*self.store.coordinates(), cell_degrees=self.cell_degrees)
+                self._built_at = time.monotonic()
+                logger.info(f"Built spatial index of {len(self._points.property_ids)} properties "
+                            f"in {time.perf_counter() - start:.2f}s")
+            return self._points
+
+    def bbox(self, south: float, west: float, north: float, east: float, limit: int = 500) -> List[Property]:
+        """Stored properties in the box"""
+        points = self.points()
+        positions = points.index.bbox(south, west, north, east, limit)
+        return self.store.get_properties([points.property_ids[position] for position in positions])
+
+    def radius(self, lat: float, lon: float, radius_miles: float,
+               limit: int = 500) -> List[Tuple[Property, float]]:
+        """(property, miles) of the stored properties within `radius_miles`, nearest first"""
+        points = self.points()
+        positions, miles = points.index.radius(lat, lon, radius_miles, limit)
+        property_ids = [points.property_ids[position] for position in positions]
+        properties = self.store.get_properties(property_ids)
+        distances = {property_id: float(distance) for property_id, distance in zip(property_ids, miles)}
+        return [(prop, distances[prop.property_id]) for prop in properties]
@@ -0,0 +1,142 @@
+"""
+Recorded and synthetic realtor.com GraphQL payloads for benchmarks and offline testing
+
+The files in `fixtures/` follow the shape of live `home_search`, `home` and
+autocomplete responses for the queries in `queries.py`. Larger pages are
+synthesized by cycling through the recorded homes and giving every copy its
+own ids, price, size and coordinates, so parsers see realistic structure at
+any volume.
+"""
+
+import json
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from queries import SEARCH_FIELD_GROUPS, field_group_keys, minify_query
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Downtown Dallas, where the recorded homes are
+DEFAULT_CENTER = (32.7767, -96.7970)
+
+
+@lru_cache(maxsize=None)
+def _fixture_text(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text()
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    """Load a recorded response from fixtures/ (a fresh copy on every call)"""
+    return json.loads(_fixture_text(name))
+
+
+def recorded_homes() -> List[Dict[str, Any]]:
+    """Homes from the recorded `home_search` page"""
+    return load_fixture("home_search_recorded.json")["data"]["home_search"]["results"]
+
+
+def recorded_home_detail() -> Dict[str, Any]:
+    """The recorded `home` (property details) record"""
+    return load_fixture("home_detail_recorded.json")["data"]["home"]
+
+
+@lru_cache(maxsize=None)
+def _template_texts() -> Tuple[str, ...]:
+    return tuple(json.dumps(home) for home in recorded_homes())
+
+
+def synthesize_home(index: int, rng: random.Random,
+                    center: Tuple[float, float] = DEFAULT_CENTER,
+                    spread_deg: float = 0.15,
+                    status: Optional[str] = None) -> Dict[str, Any]:
+    """Build one synthetic home from the recorded templates"""
+    templates = _template_texts()
+    home = json.loads(templates[index % len(templates)])
+
+    property_id = str(1_000_000_000 + index)
+    home["property_id"] = property_id
+    home["listing_id"] = str(2_000_000_000 + index)
+    home["href"] = f"https://www.realtor.com/realestateandhomes-detail/M{property_id}"
+    home["permalink"] = f"synthetic_M{property_id}"
+
+    price = rng.randrange(150_000, 2_500_000, 500)
+    sqft = rng.randint(600, 4_800)
+    home["list_price"] = price
+    home["price_per_sqft"] = round(price / sqft)
+    home["description"]["sqft"] = sqft
+    home["description"]["beds"] = rng.randint(1, 6)
+    home["description"]["baths_full"] = rng.randint(1, 4)
+    home["list_date"] = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00.000000Z"
+    if status:
+        home["status"] = status
+
+    coordinate = home["location"]["address"]["coordinate"]
+    coordinate["lat"] = round(center[0] + rng.uniform(-spread_deg, spread_deg), 6)
+    coordinate["lon"] = round(center[1] + rng.uniform(-spread_deg, spread_deg), 6)
+    home["location"]["address"]["street_number"] = str(100 + index % 9_900)
+
+    for estimate in home.get("current_estimates") or []:
+        estimate["estimate"] = int(price * rng.uniform(0.92, 1.08))
+    return home
+
+
+def synthesize_homes(count: int, seed: int = 0, **kwargs) -> List[Dict[str, Any]]:
+    """Build `count` synthetic homes; the same seed always yields the same homes"""
+    rng = random.Random(seed)
+    return [synthesize_home(index, rng, **kwargs) for index in range(count)]
+
+
+def requested_field_groups(query: str) -> Tuple[str, ...]:
+    """Field groups whose selection text appears in a `home_search` query"""
+    query = minify_query(query)
+    return tuple(
+        group for group, selection in SEARCH_FIELD_GROUPS.items() if minify_query(selection) in query
+    )
+
+
+def project_home(home: Dict[str, Any], field_groups: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the top-level keys selected by `field_groups`, as the live API would"""
+    keys = {key for group in field_groups for key in field_group_keys(group)}
+    return {key: value for key, value in home.items() if key in keys}
+
+
+def home_search_response(homes: List[Dict[str, Any]], total: Optional[int] = None) -> Dict[str, Any]:
+    """Wrap homes in a `home_search` GraphQL response"""
+    return {
+        "data": {
+            "home_search": {
+                "count": len(homes),
+                "total": len(homes) if total is None else total,
+                "results": homes,
+            }
+        }
+    }
+
+
+def home_detail_response(property_id: Optional[str] = None) -> Dict[str, Any]:
+    """A `home` GraphQL response, re-keyed to `property_id` when given"""
+    home = recorded_home_detail()
+    if property_id:
+        home["property_id"] = property_id
+    return {"data": {"home": home}}
+
+
+def autocomplete_response(location: str) -> Dict[str, Any]:
+    """An autocomplete response resolving to a ZIP code, an address or (otherwise) a city"""
+    location = location.strip()
+    if location.isdigit():
+        return {
+            "meta": {"version": "1.0"},
+            "autocomplete": [{
+                "_id": f"postal_code:{location}",
+                "area_type": "postal_code",
+                "postal_code": location,
+                "country": "USA",
+                "centroid": {"lon": DEFAULT_CENTER[1], "lat": DEFAULT_CENTER[0]},
+            }],
+        }
+    if location[:1].isdigit():
+        return load_fixture("autocomplete_address_recorded.json")
+    return load_fixture("autocomplete_city_recorded.json")
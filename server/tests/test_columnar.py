@@ -0,0 +1,57 @@
+import os
+import sys
+from datetime import date
+
+import pandas as pd
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import columnar
+from processors import process_property
+from synthetic_data import synthesize_homes
+from utils import ordered_properties, process_result
+
+
+@pytest.fixture(scope="module")
+def properties():
+    return [prop for prop in (process_property(home) for home in synthesize_homes(60)) if prop]
+
+
+def test_columns_hold_the_pandas_values_with_nulls_for_missing(properties):
+    columns = columnar.property_columns(properties)
+
+    frame = pd.concat([process_result(prop) for prop in properties], ignore_index=True)[ordered_properties]
+    expected = frame.replace({"None": None, "": None}).astype(object).where(frame.notna(), None)
+    assert list(columns) == ordered_properties
+    assert pd.DataFrame(columns, dtype=object).equals(expected)
+
+
+def test_missing_library_fails_with_an_install_hint():
+    for return_type, module in (("arrow", "pyarrow"), ("polars", "polars")):
+        try:
+            __import__(module)
+        except ImportError:
+            with pytest.raises(ImportError, match=f"pip install {module}"):
+                columnar.require(return_type)
+
+
+def test_arrow_table_has_the_fixed_schema(properties):
+    pytest.importorskip("pyarrow")
+    table = columnar.to_arrow(properties)
+    empty = columnar.to_arrow([])
+
+    assert table.schema == empty.schema == columnar.arrow_schema()
+    assert table.num_rows == len(properties)
+    assert table.column("property_id").to_pylist() == [prop.property_id for prop in properties]
+    assert all(value is None or isinstance(value, date) for value in table.column("list_date").to_pylist())
+
+
+def test_polars_frame_has_the_fixed_schema(properties):
+    pytest.importorskip("polars")
+    frame = columnar.to_polars(properties)
+
+    assert dict(frame.schema) == dict(columnar.to_polars([]).schema) == columnar.polars_schema()
+    assert frame.height == len(properties)
+    assert frame["property_id"].to_list() == [prop.property_id for prop in properties]
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact import PropertyTable
+from processors import get_key, process_extra_property_details, process_property
+from synthetic_data import recorded_homes
+
+
+@pytest.fixture
+def properties():
+    return [
+        process_property(home, extra_property_data=True, get_key_func=get_key,
+                         process_extra_property_details_func=process_extra_property_details)
+        for home in recorded_homes()
+    ]
+
+
+def test_views_round_trip(properties):
+    """Views match the original properties (scalar fields, or everything with details)"""
+    table = PropertyTable.from_properties(properties)
+    full = PropertyTable.from_properties(iter(properties), keep_details=True)
+
+    assert len(table) == len(properties)
+    assert [view.model_dump() for view in full] == [prop.model_dump() for prop in properties]
+    view, original = table[-1], properties[-1]
+    assert (view.property_id, view.list_price, view.list_date) == \
+        (original.property_id, original.list_price, original.list_date)
+    assert view.address.city == original.address.city
+    assert view.description.beds == original.description.beds
+    assert view.advertisers is None
+
+
+def test_to_pandas(properties):
+    """The DataFrame handoff keeps nullable integers and shares the numeric buffers"""
+    table = PropertyTable.from_properties(properties)
+    df = table.to_pandas()
+
+    assert list(df["property_id"]) == [prop.property_id for prop in properties]
+    assert str(df["list_price"].dtype) == "Int64"
+    assert df["city"].dtype == "category"
+    assert np.shares_memory(df["latitude"].to_numpy(), table.column("latitude"))
@@ -0,0 +1,48 @@
+import os
+import sys
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import BloomSeenSet, Deduplicator, home_key, merge_records
+from synthetic_data import recorded_home_detail, synthesize_homes
+
+
+def test_filter_drops_repeats_across_batches():
+    homes = synthesize_homes(10)
+    deduplicator = Deduplicator()
+
+    first = list(deduplicator.filter(homes[:6]))
+    second = list(deduplicator.filter(homes[3:] + [{"listing_id": "77"}, {"listing_id": "77"}]))
+
+    assert [home["property_id"] for home in first] == [home["property_id"] for home in homes[:6]]
+    assert [home_key(home) for home in second] == [home_key(home) for home in homes[6:]] + ["listing:77"]
+    assert deduplicator.duplicates == 4
+
+
+def test_bloom_seen_set_has_no_false_negatives():
+    seen = BloomSeenSet(capacity=20_000, error_rate=0.01)
+
+    added = sum(seen.add(key) for key in range(0, 40_000, 2))
+
+    assert added > 20_000 * 0.98
+    assert all(key in seen for key in range(0, 40_000, 2))
+    false_positives = sum(key in seen for key in range(1, 40_000, 2))
+    assert false_positives < 20_000 * 0.02
+    assert seen.size_bytes < 25_000
+
+
+def test_merge_records_lays_the_richer_record_over():
+    detail = recorded_home_detail()
+    search = {
+        "property_id": detail["property_id"],
+        "list_price": 1,
+        "description": {"beds": 3, "sqft": None},
+        "search_only": "kept",
+    }
+
+    merged = merge_records(search, detail)
+
+    assert merged["search_only"] == "kept"
+    assert merged["list_price"] == detail["list_price"]
+    assert merged["description"]["sqft"] == detail["description"]["sqft"]
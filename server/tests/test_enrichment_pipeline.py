@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import text
+from enrichment_pipeline import PropertyEnrichmentPipeline
+from external_data_service import EnrichedPropertyData, WalkScoreData
+
+
+class FakeExternalService:
+    """Stands in for ExternalDataService with a fixed per-property latency"""
+
+    def __init__(self, delay: float = 0.0, fail_ids=()):
+        self.delay = delay
+        self.fail_ids = set(fail_ids)
+        self.block_on_rate_limit = False
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def enrich_property(self, property_data):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if property_data['property_id'] in self.fail_ids:
+            raise RuntimeError("upstream failure")
+        return EnrichedPropertyData(
+            property_id=property_data['property_id'],
+            address='',
+            latitude=property_data['latitude'],
+            longitude=property_data['longitude'],
+            walk_score_data=WalkScoreData(walk_score=80, bike_score=70, transit_score=60),
+        )
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = PropertyEnrichmentPipeline(db_url=f"sqlite:///{tmp_path / 'properties.db'}")
+    with pipeline.engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE properties (
+                property_id TEXT PRIMARY KEY, address TEXT, latitude REAL, longitude REAL,
+                list_price INTEGER, description TEXT, walk_score INTEGER, bike_score INTEGER,
+                transit_score INTEGER, amenities TEXT, transit_data TEXT, demographics TEXT,
+                schools TEXT, enrichment_date TIMESTAMP, created_at TIMESTAMP, updated_at TIMESTAMP
+            )
+        """))
+        conn.execute(text("""
+            INSERT INTO properties (property_id, address, latitude, longitude, list_price, description)
+            VALUES (:property_id, :address, :latitude, :longitude, 500000, '{}')
+        """), [
+            {
+                'property_id': f"prop_{i:03d}",
+                'address': json.dumps({'formatted_address': f"{i} Main St"}),
+                'latitude': 37.0 + i / 1000,
+                'longitude': -122.0,
+            }
+            for i in range(40)
+        ])
+    return pipeline
+
+
+def _enriched_count(pipeline):
+    with pipeline.engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM properties WHERE walk_score = 80")).scalar()
+
+
+def test_concurrent_pipeline_enriches_every_property(pipeline):
+    pipeline.external_service = FakeExternalService(delay=0.01, fail_ids={'prop_007'})
+
+    stats = pipeline.enrich_properties_concurrent(
+        pipeline.iter_properties_to_enrich(days_since_enrichment=30, chunk_size=7),
+        workers=4, queue_depth=5, batch_size=6
+    )
+
+    assert stats == {'found': 40, 'processed': 39, 'errors': 1, 'skipped': 0}
+    assert _enriched_count(pipeline) == 39
+
+
+def test_concurrent_pipeline_scales_with_workers(pipeline):
+    pipeline.external_service = FakeExternalService(delay=0.02)
+    properties = pipeline.get_properties_to_enrich()
+
+    start = time.perf_counter()
+    pipeline.enrich_properties_concurrent(properties, workers=1, queue_depth=4)
+    single_worker = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pipeline.enrich_properties_concurrent(properties, workers=8, queue_depth=4)
+    eight_workers = time.perf_counter() - start
+
+    assert eight_workers < single_worker / 2
+
+
+def test_stop_request_drains_in_flight_work(pipeline):
+    service = FakeExternalService(delay=0.05)
+    pipeline.external_service = service
+    threading.Timer(0.1, pipeline.request_stop).start()
+
+    stats = pipeline.enrich_properties_concurrent(
+        pipeline.get_properties_to_enrich(), workers=2, queue_depth=2
+    )
+
+    assert stats['processed'] == service.calls
+    assert 0 < stats['processed'] < 40
+    assert _enriched_count(pipeline) == stats['processed']
+
+
+def test_writer_failure_stops_the_pipeline(pipeline):
+    pipeline.external_service = FakeExternalService()
+
+    def save_enriched_properties(records):
+        raise RuntimeError("disk full")
+
+    pipeline.save_enriched_properties = save_enriched_properties
+    results = {}
+    run = threading.Thread(target=lambda: results.update(pipeline.enrich_properties_concurrent(
+        pipeline.get_properties_to_enrich(), workers=4, queue_depth=2, batch_size=2
+    )), daemon=True)
+    run.start()
+    run.join(timeout=30)
+
+    assert not run.is_alive()
+    assert results['processed'] == 0 and results['errors'] > 0
+
+
+def test_stop_during_rate_limit_wait_saves_nothing(pipeline):
+    from datetime import datetime
+
+    service = pipeline.external_service
+    service.block_on_rate_limit = True
+    service.api_keys['walkscore'] = 'test-key'
+    # The Walk Score budget is spent, so the first call waits for up to a minute
+    service.rate_limits['walkscore'] = [datetime.now()] * 1000
+    threading.Timer(0.2, pipeline.request_stop).start()
+
+    start = time.perf_counter()
+    stats = pipeline.enrich_properties_concurrent(pipeline.get_properties_to_enrich(), workers=2, queue_depth=2)
+
+    assert time.perf_counter() - start < 10
+    assert stats['processed'] == 0
+    with pipeline.engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM properties WHERE enrichment_date IS NOT NULL")).scalar() == 0
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_writers import write_rows
+from processors import process_property
+from synthetic_data import synthesize_homes
+from utils import ordered_properties, process_result, property_row
+
+
+def _properties(count):
+    return [prop for prop in (process_property(home) for home in synthesize_homes(count)) if prop]
+
+
+@pytest.mark.parametrize("suffix", ["csv", "xlsx"])
+def test_streamed_file_matches_the_dataframe_export(tmp_path, suffix):
+    properties = _properties(120)
+    path = tmp_path / f"properties.{suffix}"
+
+    assert write_rows((property_row(prop) for prop in properties), path, ordered_properties,
+                      batch_size=7, queue_depth=2) == len(properties)
+
+    expected = pd.concat([process_result(prop) for prop in properties], ignore_index=True).replace(
+        {"None": pd.NA, None: pd.NA, "": pd.NA}
+    )
+    read = pd.read_csv if suffix == "csv" else pd.read_excel
+    expected_path = tmp_path / f"expected.{suffix}"
+    if suffix == "csv":
+        expected.to_csv(expected_path, index=False)
+    else:
+        expected.to_excel(expected_path, index=False)
+    pd.testing.assert_frame_equal(read(path, dtype=str), read(expected_path, dtype=str))
+
+
+def test_source_errors_reach_the_caller_after_earlier_rows(tmp_path):
+    def rows():
+        yield from ({"property_id": str(index)} for index in range(5))
+        raise RuntimeError("page failed")
+
+    path = tmp_path / "partial.csv"
+    with pytest.raises(RuntimeError, match="page failed"):
+        write_rows(rows(), path, ["property_id"], batch_size=2)
+
+    assert path.read_text().split() == ["property_id", "0", "1", "2", "3", "4"]
@@ -0,0 +1,21 @@
+import os
+import statistics
+import sys
+
+import pytest
+
+# Add the server and benchmarks directories to the Python path
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+sys.path.insert(0, os.path.join(SERVER_DIR, "benchmarks"))
+
+from bench_import_time import IMPORT_BUDGETS_MS, heavy_modules, import_times
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_MS))
+def test_entry_points_import_lazily_and_within_budget(module):
+    runs = [import_times(module) for _ in range(3)]
+
+    assert heavy_modules(runs[0]) == []
+    median_ms = statistics.median(times[module][1] for times in runs) / 1000
+    assert median_ms <= IMPORT_BUDGETS_MS[module], f"import {module} took {median_ms:.0f} ms"
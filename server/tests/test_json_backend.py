@@ -0,0 +1,76 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+import requests
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from external_data_service import ExternalDataService
+from json_backend import StreamedJSON, get_backend
+from processors import get_key, process_extra_property_details, process_property
+from synthetic_data import home_search_response, recorded_homes, synthesize_homes
+
+RESULTS_PATH = ("data", "home_search", "results")
+
+
+def test_streamed_items_match_full_decode_for_any_chunking():
+    document = home_search_response(synthesize_homes(40), total=999)
+    document["errors"] = [{"message": "partial"}]
+    body = json.dumps(document, ensure_ascii=False, indent=1).encode()
+    envelope = json.loads(body)
+    envelope["data"]["home_search"]["results"] = []
+    rng = random.Random(7)
+
+    for _ in range(10):
+        cuts = sorted(rng.sample(range(1, len(body)), rng.randint(1, 300)))
+        chunks = [body[start:end] for start, end in zip([0] + cuts, cuts + [len(body)])]
+        closed = []
+        streamed = StreamedJSON(chunks, RESULTS_PATH, close=lambda: closed.append(True)).start()
+
+        assert streamed.document["data"]["home_search"]["total"] == 999
+        assert list(streamed) == document["data"]["home_search"]["results"]
+        assert streamed.document == envelope
+        assert closed == [True]
+
+
+def test_documents_without_the_array_and_truncated_bodies():
+    streamed = StreamedJSON([b'{"data": null, "errors": [{"message": "PersistedQueryNotFound"}]}'],
+                            RESULTS_PATH).start()
+    assert list(streamed) == []
+    assert streamed.document["errors"][0]["message"] == "PersistedQueryNotFound"
+
+    body = json.dumps(home_search_response(synthesize_homes(3))).encode()
+    with pytest.raises(ValueError):
+        list(StreamedJSON([body[:-40]], RESULTS_PATH).start())
+
+
+@pytest.mark.parametrize("backend_name", ["json", "orjson", "msgspec"])
+def test_python_mode_dump_matches_json_mode(backend_name):
+    """Every backend encodes model_dump() output (datetimes, URLs, enums) like model_dump(mode='json')"""
+    backend = get_backend(backend_name)
+    if backend.name != backend_name:
+        pytest.skip(f"{backend_name} is not installed")
+
+    properties = [
+        process_property(home, extra_property_data=True, get_key_func=get_key,
+                         process_extra_property_details_func=process_extra_property_details)
+        for home in recorded_homes()
+    ]
+
+    encoded = backend.dumps([prop.model_dump() for prop in properties])
+
+    assert backend.loads(encoded) == json.loads(json.dumps([prop.model_dump(mode="json") for prop in properties]))
+
+
+def test_non_json_api_response_returns_none():
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'<html>oops</html>'
+    service = ExternalDataService()
+    service.session.get = lambda *args, **kwargs: response
+
+    assert service._make_api_call("https://api.example.com", {}, 'walkscore') is None
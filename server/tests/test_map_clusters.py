@@ -0,0 +1,63 @@
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_clusters import MapClusterer, mercator_pixels
+from spatial_index import IndexedPoints
+
+
+@pytest.fixture(scope="module")
+def points():
+    rng = np.random.default_rng(11)
+    count = 5000
+    latitudes = np.concatenate([rng.normal(32.8, 0.05, count - 50), rng.uniform(25, 48, 50)])
+    longitudes = np.concatenate([rng.normal(-96.8, 0.05, count - 50), rng.uniform(-120, -70, 50)])
+    prices = rng.integers(100_000, 900_000, count).astype(float)
+    prices[::5] = np.nan
+    return IndexedPoints.build([f"p{index}" for index in range(count)], latitudes, longitudes, prices)
+
+
+def test_clusters_match_per_cell_aggregates(points):
+    zoom = 6
+    result = MapClusterer(lambda: points, cell_pixels=64, min_cluster_size=5).clusters(24, -121, 49, -69, zoom)
+
+    x, y = mercator_pixels(points.latitudes, points.longitudes, zoom)
+    cells = defaultdict(list)
+    for position, cell in enumerate(zip((x // 64).astype(int), (y // 64).astype(int))):
+        cells[cell].append(position)
+    expected_clusters = {}
+    expected_points = set()
+    for members in cells.values():
+        if len(members) >= 5:
+            prices = points.list_prices[members]
+            expected_clusters[len(members), round(points.latitudes[members].mean(), 9)] = (
+                int(np.median(prices[~np.isnan(prices)]))
+            )
+        else:
+            expected_points.update(points.property_ids[position] for position in members)
+
+    assert result['total'] == len(points.property_ids)
+    assert {(cluster['count'], round(cluster['latitude'], 9)): cluster['median_price']
+            for cluster in result['clusters']} == expected_clusters
+    assert {point['property_id'] for point in result['points']} == expected_points
+
+
+def test_tiles_are_cached_until_the_points_are_rebuilt(points):
+    current = {'points': points}
+    clusterer = MapClusterer(lambda: current['points'], max_cluster_zoom=14)
+    viewport = (32.75, -96.85, 32.85, -96.75)
+
+    first = clusterer.clusters(*viewport, 12)
+    assert clusterer.clusters(*viewport, 12) == first
+    assert clusterer._tile.cache_info().hits > 0
+
+    current['points'] = IndexedPoints.build(points.property_ids[:10], points.latitudes[:10], points.longitudes[:10])
+    assert clusterer.clusters(*viewport, 12)['total'] <= 10
+    # Past max_cluster_zoom every property is an individual point
+    assert clusterer.clusters(*viewport, 15)['clusters'] == []
@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Counter, Histogram, MetricsRegistry, render_prometheus
+from realtor_standin_server import StandinConfig, serve_in_thread
+
+
+def test_histogram_exposition():
+    registry = MetricsRegistry()
+    histogram = Histogram("test_seconds", "Test histogram", ["stage"], buckets=(0.1, 1.0), registry=registry)
+    counter = Counter("test_total", "Test counter", ["kind"], registry=registry)
+
+    for value in (0.05, 0.5, 5.0):
+        histogram.labels(stage='a"b').observe(value)
+    counter.labels(kind="x").inc(2)
+
+    text = render_prometheus(registry)
+
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="a\\"b",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a\\"b",le="1"} 2' in text
+    assert 'test_seconds_bucket{stage="a\\"b",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="a\\"b"} 3' in text
+    assert 'test_total{kind="x"} 2' in text
+
+
+def test_metrics_endpoint_reports_scrape_stages_and_retries():
+    pytest.importorskip("flask_cors")
+    from dreamery_property_scraper import DreameryPropertyScraper
+    from realtor_api import app
+
+    server, base_url = serve_in_thread(StandinConfig(page_size=20, total=20, rate_429=0.3, retry_after=1, seed=3))
+    try:
+        scraper = DreameryPropertyScraper(base_url=base_url)
+        for _ in range(3):
+            assert scraper.search_properties_advanced(location="Dallas, TX")
+    finally:
+        server.shutdown()
+
+    client = app.test_client()
+    client.get("/api/realtor/health")
+    response = client.get("/metrics")
+    text = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    for stage in ("scraper.autocomplete", "scraper.graphql_page", "parse.process_property", "serialize.jsonify"):
+        assert f'dreamery_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'dreamery_rate_limited_total{source="127.0.0.1",kind="upstream_429"}' in text
+    assert 'dreamery_http_retries_total{host="127.0.0.1",reason="429"}' in text
+    assert 'dreamery_http_request_duration_seconds_count{app="realtor_api",endpoint="health_check",method="GET",status="200"} 1' in text
+    assert 'dreamery_in_flight{stage="http.realtor_api"} 1' in text
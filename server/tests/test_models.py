@@ -162,3 +162,52 @@ class TestModels:
         assert ReturnType.pandas.value == "pandas"
         assert ReturnType.pydantic.value == "pydantic"
         assert ReturnType.raw.value == "raw"
+
+
+class TestDescriptionPhotos:
+    """Test the lazily rewritten and validated alternate photos"""
+
+    PHOTOS = [{"href": "https://ap.rdcpix.com/abc123s.jpg"}, {"href": "https://ap.rdcpix.com/def456s.jpg"}]
+
+    def test_alt_photos_are_validated_on_first_access_and_cached(self):
+        """Test that rewriting and URL validation wait until alt_photos is read"""
+        from pydantic import ValidationError
+
+        description = Description(alt_photo_hrefs=["https://ap.rdcpix.com/abc123s.jpg"])
+        assert "alt_photos" not in description.__dict__
+
+        photos = description.alt_photos
+        assert [str(photo) for photo in photos] == ["https://ap.rdcpix.com/abc123od-w480_h360_x2.webp?w=1080&q=75"]
+        assert description.alt_photos is photos
+
+        invalid = Description(alt_photo_hrefs=["not a url"])
+        with pytest.raises(ValidationError):
+            invalid.alt_photos
+
+    def test_parse_description_drops_alt_photos(self):
+        """Test that alt_photos=False leaves the photos out"""
+        from parsers import parse_description
+
+        result = {"description": {"beds": 3}, "photos": self.PHOTOS}
+
+        assert len(parse_description(result).alt_photos) == 2
+        dropped = parse_description(result, alt_photos=False)
+        assert dropped.alt_photo_hrefs is None and dropped.alt_photos is None
+        assert dropped.beds == 3
+
+    def test_dump_shape_and_old_dumps(self):
+        """Test that dumps keep the alt_photos key and that old dumps still load"""
+        from parsers import parse_description
+
+        description = parse_description({"description": {"beds": 3}, "photos": self.PHOTOS})
+        dump = description.model_dump()
+
+        assert set(dump) == set(Description.model_fields) - {"alt_photo_hrefs"} | {"alt_photos"}
+        assert dump["alt_photos"] == description.alt_photos
+        assert description.model_dump(mode="json")["alt_photos"] == [str(photo) for photo in description.alt_photos]
+
+        reloaded = Description.model_validate(dump)
+        assert reloaded.alt_photos == description.alt_photos
+        assert reloaded.model_dump() == dump
+        assert Description.model_validate({"alt_photos": None}).alt_photos is None
+
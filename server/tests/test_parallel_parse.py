@@ -0,0 +1,52 @@
+import os
+import sys
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from compact import PropertyTable
+from parallel_parse import ParsePool
+from processors import get_key, process_extra_property_details, process_property
+from synthetic_data import synthesize_homes
+from utils import process_result
+
+
+def test_pool_results_match_in_process_parsing():
+    homes = synthesize_homes(90)
+    homes[3]["source"] = None
+    properties = [
+        prop for prop in (
+            process_property(home, mls_only=True, get_key_func=get_key,
+                             process_extra_property_details_func=process_extra_property_details)
+            for home in homes
+        ) if prop
+    ]
+
+    with ParsePool(workers=2, chunk_size=25, min_homes=0) as pool:
+        table = pool.parse(homes, mls_only=True)
+        frame = pool.parse_frame(homes, mls_only=True)
+
+    assert len(table) == len(properties) == len(homes) - 1
+    assert [prop.model_dump() for prop in table] == [
+        prop.model_dump() for prop in PropertyTable.from_properties(properties, keep_details=True)
+    ]
+    expected = pd.concat([process_result(prop) for prop in properties], ignore_index=True)
+    pd.testing.assert_frame_equal(frame, expected)
+
+
+def test_concat_merges_categories_and_text():
+    properties = [
+        prop for prop in (process_property(home) for home in synthesize_homes(30, status="sold")) if prop
+    ]
+    whole = PropertyTable.from_properties(properties, keep_details=True)
+
+    joined = PropertyTable.concat([
+        PropertyTable.from_properties(properties[:10], keep_details=True),
+        PropertyTable.from_properties([], keep_details=True),
+        PropertyTable.from_properties(properties[10:], keep_details=True),
+    ])
+
+    assert [prop.model_dump() for prop in joined] == [prop.model_dump() for prop in whole]
+    assert list(joined.column("city")) == list(whole.column("city"))
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from properties_schema import ENRICHMENT_DATE_INDEX, apply_migrations, enrichment_candidates_query
+
+
+def test_migrations_add_enrichment_index_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    assert ENRICHMENT_DATE_INDEX.name in apply_migrations(engine)
+    assert apply_migrations(engine) == []
+
+    compiled = enrichment_candidates_query(True, True).compile(engine)
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", ("2024-01-01", 10)).fetchall()
+
+    assert all("SCAN properties" not in row[-1] for row in plan)
+    assert any(ENRICHMENT_DATE_INDEX.name in row[-1] for row in plan)
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors import process_property
+from property_store import PropertyStore
+from realtor_standin_server import StandinConfig, serve_in_thread
+from scraper_api import scrape_property
+from synthetic_data import synthesize_homes
+from utils import property_row
+
+PARAMS = {"location": "Dallas, TX", "listing_type": "FOR_SALE"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PropertyStore(f"sqlite:///{tmp_path / 'store.db'}")
+
+
+@pytest.fixture(scope="module")
+def properties():
+    return [prop for prop in (process_property(home) for home in synthesize_homes(80)) if prop]
+
+
+def test_fresh_search_returns_the_stored_properties_in_order(store, properties):
+    store.save_search(PARAMS, properties, limit=100)
+
+    stored = store.fresh_search(PARAMS, limit=100, max_age=60)
+
+    assert [property_row(prop) for prop in stored] == [property_row(prop) for prop in properties]
+    assert len(store.fresh_search(PARAMS, limit=10, max_age=60)) == 10
+    # Fewer results than the stored limit: the search was complete, so a larger limit is served too
+    assert len(store.fresh_search(PARAMS, limit=1000, max_age=60)) == len(properties)
+    assert store.fresh_search({**PARAMS, "radius": 1.0}, limit=100, max_age=60) is None
+
+
+def test_stale_or_truncated_searches_are_not_served(store, properties):
+    store.save_search(PARAMS, properties[:20], limit=20)
+    time.sleep(0.05)
+
+    assert store.fresh_search(PARAMS, limit=20, max_age=0.01) is None
+    assert store.fresh_search(PARAMS, limit=50, max_age=60) is None
+    assert len(store.fresh_search(PARAMS, limit=20, max_age=60)) == 20
+
+
+def test_query_filters_match_the_properties(store, properties):
+    store.save_properties(properties)
+    sample = properties[0]
+
+    found = store.query(state=sample.address.state.lower(), city=sample.address.city.upper(), min_beds=2,
+                        max_price=900_000)
+
+    expected = {
+        prop.property_id for prop in properties
+        if prop.address.state == sample.address.state and prop.address.city == sample.address.city
+        and (prop.description.beds or 0) >= 2 and prop.list_price is not None and prop.list_price <= 900_000
+    }
+    assert expected and {prop.property_id for prop in found} == expected
+    list_dates = [prop.list_date for prop in found if prop.list_date]
+    assert list_dates == sorted(list_dates, reverse=True)
+
+
+def test_repeat_scrape_is_answered_from_the_store(monkeypatch, store):
+    config = StandinConfig(page_size=50, total=120)
+    server, base_url = serve_in_thread(config)
+    monkeypatch.setenv("REALTOR_BASE_URL", base_url)
+    stats = server.app.config["STANDIN_STATS"]
+    try:
+        first = scrape_property("Dallas, TX", return_type="pydantic", limit=200, store=store, max_age=600)
+        searches = stats.snapshot()["home_search.200"]
+        second = scrape_property("Dallas, TX", return_type="pandas", limit=200, store=store, max_age=600)
+    finally:
+        server.shutdown()
+
+    assert searches > 0 and first
+    assert stats.snapshot()["home_search.200"] == searches
+    assert list(second["property_id"]) == [prop.property_id for prop in first]
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors import process_property
+from raw_filters import RawFilter
+from synthetic_data import synthesize_homes
+
+
+def test_filter_keeps_exactly_the_homes_parsing_would_keep():
+    homes = synthesize_homes(300)
+    for index, home in enumerate(homes):
+        if index % 7 == 0:
+            home["source"] = None
+        if index % 5 == 0:
+            home.setdefault("flags", {})["is_pending"] = True
+    bbox = (32.7, -96.9, 32.85, -96.7)
+    raw_filter = RawFilter.coerce({
+        "mls_only": True, "exclude_pending": True, "max_price": 1_200_000, "beds_min": 3, "bbox": bbox,
+    })
+
+    survivors = list(raw_filter.filter(homes))
+
+    parsed = [process_property(home, mls_only=True, exclude_pending=True) for home in homes]
+    expected = [
+        prop.property_id for prop in parsed
+        if prop is not None and prop.list_price <= 1_200_000 and prop.description.beds >= 3
+        and bbox[0] <= prop.latitude <= bbox[2] and bbox[1] <= prop.longitude <= bbox[3]
+    ]
+    assert [home["property_id"] for home in survivors] == expected
+    assert 0 < len(expected) < len(homes)
+    assert sum(raw_filter.rejected.values()) == len(homes) - len(expected)
+    assert set(raw_filter.rejected) == {"mls", "pending", "list_price", "beds", "bbox"}
+
+
+def test_pending_searches_keep_pending_homes():
+    homes = synthesize_homes(10)
+    homes[0].setdefault("flags", {})["is_pending"] = True
+
+    assert len(list(RawFilter().with_options(exclude_pending=True, listing_type="pending").filter(homes))) == 10
+    assert len(list(RawFilter().with_options(exclude_pending=True).filter(homes))) == 9
+    with pytest.raises(ValueError, match="Unknown raw filter field"):
+        RawFilter.coerce({"price_max": 1})
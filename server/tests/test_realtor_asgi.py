@@ -0,0 +1,76 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("aiohttp")
+
+import realtor_api
+import realtor_asgi
+from async_scraper import AsyncPropertyScraper
+from dreamery_property_scraper import DreameryPropertyScraper
+from json_backend import dumps, loads
+from realtor_standin_server import StandinConfig, serve_in_thread
+
+
+@pytest.fixture
+def apps(monkeypatch):
+    server, base_url = serve_in_thread(StandinConfig(page_size=20, total=20))
+    monkeypatch.setattr(realtor_api, "scraper", DreameryPropertyScraper(base_url=base_url))
+    monkeypatch.setattr(realtor_asgi, "scraper", AsyncPropertyScraper(base_url=base_url))
+    yield realtor_api.app.test_client()
+    server.shutdown()
+
+
+async def asgi_request(method, path, body=None, query_string=b""):
+    """(status, decoded JSON) of one request to the ASGI app"""
+    messages = [{"type": "http.request", "body": dumps(body) if body is not None else b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "query_string": query_string, "headers": []}
+    await realtor_asgi.app(scope, receive, send)
+    return sent[0]["status"], loads(sent[1]["body"])
+
+
+def test_asgi_routes_match_flask_responses(apps):
+    flask_client = apps
+    search = {"location": "Dallas, TX", "limit": 5}
+
+    async def run():
+        try:
+            search_response = await asgi_request("POST", "/api/realtor/search", search)
+            property_id = search_response[1]["properties"][0]["property_id"]
+            return search_response, property_id, [
+                await asgi_request("GET", f"/api/realtor/property/{property_id}"),
+                await asgi_request("GET", "/api/realtor/suggestions", query_string=b"q=Dallas&limit=3"),
+                await asgi_request("GET", "/api/realtor/health"),
+                await asgi_request("POST", "/api/realtor/search", {}),
+                await asgi_request("GET", "/api/realtor/search"),
+            ]
+        finally:
+            await realtor_asgi.scraper.close()
+
+    search_response, property_id, others = asyncio.run(run())
+
+    expected = [
+        flask_client.post("/api/realtor/search", json=search),
+        flask_client.get(f"/api/realtor/property/{property_id}"),
+        flask_client.get("/api/realtor/suggestions?q=Dallas&limit=3"),
+        flask_client.get("/api/realtor/health"),
+        flask_client.post("/api/realtor/search", json={}),
+    ]
+    for (status, body), response in zip([search_response] + others, expected):
+        assert status == response.status_code
+        assert body == loads(response.data)
+    assert len(search_response[1]["properties"]) == 5
+    assert others[-1][0] == 405
@@ -0,0 +1,291 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup import Deduplicator
+from dreamery_property_scraper import DreameryPropertyScraper
+from realtor_standin_server import StandinConfig, _matching_indexes, create_app, serve_in_thread
+
+
+@pytest.fixture
+def standin():
+    config = StandinConfig(page_size=50, total=120)
+    server, base_url = serve_in_thread(config)
+    yield config, server.app.config["STANDIN_STATS"], base_url
+    server.shutdown()
+
+
+def test_scraper_uses_base_url(standin):
+    config, stats, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+
+    properties = scraper.search_properties_advanced(location="Dallas, TX", limit=200)
+
+    assert len(properties) == config.page_size
+    assert len({prop.property_id for prop in properties}) == config.page_size
+    assert scraper.get_access_token().startswith("standin-")
+    counts = stats.snapshot()
+    assert counts["suggest.200"] == 1
+    assert counts["home_search.200"] == 1
+    assert counts["auth_token.200"] == 1
+
+
+def test_base_url_from_environment(monkeypatch, standin):
+    _, _, base_url = standin
+    monkeypatch.setenv("REALTOR_BASE_URL", base_url)
+
+    scraper = DreameryPropertyScraper()
+
+    assert scraper.SEARCH_GQL_URL.startswith(base_url)
+    assert scraper.ADDRESS_AUTOCOMPLETE_URL == f"{base_url}/suggest"
+    assert DreameryPropertyScraper.SEARCH_GQL_URL.startswith("https://www.realtor.com")
+
+
+def test_injected_429s_are_retried(standin):
+    config, stats, base_url = standin
+    config.rate_429 = 1.0
+    # urllib3 treats Retry-After: 0 as absent and falls back to its (long) backoff
+    config.retry_after = 1
+    scraper = DreameryPropertyScraper(base_url=base_url)
+
+    assert scraper.search_properties_advanced(location="Dallas, TX") == []
+
+    # One request plus the three retries configured on the session
+    assert stats.snapshot()["suggest.429"] == 4
+
+
+def test_map_projection_requests_and_parses_fewer_fields(standin):
+    config, _, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+
+    full = scraper.search_properties_advanced(location="Dallas, TX")
+    projected = scraper.search_properties_advanced(location="Dallas, TX", field_groups="map")
+
+    assert len(projected) == len(full) == config.page_size
+    assert len(scraper._build_search_query("area", "map")) < len(scraper._build_search_query("area")) / 2
+    home = projected[0]
+    assert home.latitude is not None and home.address.city
+    assert home.description.beds is not None and home.description.primary_photo
+    assert home.description.alt_photos is None and home.advertisers is None and home.tax_record is None
+    assert full[0].description.alt_photos
+
+
+def test_unknown_field_group_is_rejected(standin):
+    _, _, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+
+    with pytest.raises(ValueError, match="Unknown field group"):
+        scraper.search_properties(location="Dallas, TX", field_groups=["core", "photos"])
+
+
+def test_filters_are_applied_upstream(standin):
+    config, _, base_url = standin
+    config.page_size = 200
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    expected = {str(1_000_000_000 + index) for index in _matching_indexes(
+        config, {"list_price_max": 1_000_000, "beds_min": 3, "type": ["single_family"]})}
+    assert 0 < len(expected) < config.total
+
+    properties = scraper.search_properties_advanced(location="Dallas, TX", listing_type="sold", max_price=1_000_000,
+                                                    beds=3, property_types=["single_family"], limit=200)
+
+    assert {prop.property_id for prop in properties} == expected
+    assert all(prop.status == "SOLD" for prop in properties)
+    with pytest.raises(ValueError, match="Unknown property type"):
+        scraper.search_properties(location="Dallas, TX", property_types=["castle"])
+
+
+def test_persisted_queries_send_hash_after_first_request(standin):
+    _, stats, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url, use_persisted_queries=True)
+
+    first = scraper.search_properties_advanced(location="Dallas, TX", field_groups="list")
+    second = scraper.search_properties_advanced(location="Dallas, TX", field_groups="list")
+
+    assert len(first) == len(second) > 0
+    counts = stats.snapshot()
+    assert counts["persisted_query.miss"] == 1
+    assert counts["persisted_query.registered"] == 1
+    assert counts["persisted_query.hit"] == 1
+
+
+def test_persisted_queries_fall_back_when_unsupported(standin):
+    config, stats, base_url = standin
+    config.persisted_queries = False
+    scraper = DreameryPropertyScraper(base_url=base_url, use_persisted_queries=True)
+
+    assert scraper.search_properties_advanced(location="Dallas, TX")
+    assert scraper.search_properties_advanced(location="Dallas, TX")
+
+    assert scraper.use_persisted_queries is False
+    assert stats.snapshot()["persisted_query.unsupported"] == 1
+    assert stats.snapshot()["home_search.200"] == 2
+
+
+def test_tiled_radius_search_returns_every_home_once(standin):
+    config, stats, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    lon, lat = -96.789841, 32.779472  # the recorded address centroid
+    expected = {str(1_000_000_000 + index)
+                for index in _matching_indexes(config, {"coordinates": [lon, lat], "radius": "10mi"})}
+    assert len(expected) > config.page_size
+
+    properties = scraper.search_properties_advanced(location="2530 Al Lipscomb Way, Dallas, TX",
+                                                    radius=10, limit=1000)
+
+    assert len(properties) == len(expected)
+    assert {prop.property_id for prop in properties} == expected
+    assert stats.snapshot()["home_search.200"] > 1
+
+
+def test_failed_tile_is_retried(standin):
+    config, stats, base_url = standin
+    config.fail_home_search = 1
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    lon, lat = -96.789841, 32.779472
+    expected = {str(1_000_000_000 + index)
+                for index in _matching_indexes(config, {"coordinates": [lon, lat], "radius": "10mi"})}
+
+    properties = scraper.search_properties_advanced(location="2530 Al Lipscomb Way, Dallas, TX",
+                                                    radius=10, limit=1000)
+
+    assert {prop.property_id for prop in properties} == expected
+    assert stats.snapshot()["home_search.500"] == 1
+
+
+def test_date_range_is_sharded_into_windows(standin):
+    config, stats, base_url = standin
+    config.total = 300
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    expected = {str(1_000_000_000 + index)
+                for index in _matching_indexes(config, {"date_min": "2024-02-01", "date_max": "2024-09-30"})}
+    assert len(expected) > config.page_size
+
+    properties = scraper.search_properties_advanced(location="Dallas, TX", listing_type="sold",
+                                                    date_from="2024-02-01", date_to="2024-09-30", limit=1000)
+
+    assert len(properties) == len(expected)
+    assert {prop.property_id for prop in properties} == expected
+    assert stats.snapshot()["home_search.200"] > 1
+
+
+def test_date_from_alone_is_an_open_ended_range(standin):
+    config, stats, base_url = standin
+    config.total = 300
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    expected = {str(1_000_000_000 + index) for index in _matching_indexes(config, {"date_min": "2024-06-01"})}
+    assert config.page_size < len(expected) < config.total
+
+    properties = scraper.search_properties_advanced(location="Dallas, TX", listing_type="sold",
+                                                    date_from="2024-06-01", limit=1000)
+
+    assert {prop.property_id for prop in properties} == expected
+    assert stats.snapshot()["home_search.200"] > 1
+
+
+def test_date_to_alone_is_an_open_ended_range(standin):
+    config, _, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    expected = {str(1_000_000_000 + index) for index in _matching_indexes(config, {"date_max": "2024-03-01"})}
+    assert 0 < len(expected) < config.page_size
+
+    properties = scraper.search_properties_advanced(location="Dallas, TX", listing_type="sold",
+                                                    date_to="2024-03-01")
+
+    assert {prop.property_id for prop in properties} == expected
+
+
+def test_selective_raw_filter_still_fills_a_planned_search(standin):
+    config, _, base_url = standin
+    config.total = 1000
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    dated = dict(location="Dallas, TX", listing_type="sold", date_from="2024-01-01", date_to="2024-12-31")
+    prices = sorted(prop.list_price for prop in scraper.search_properties_advanced(**dated, limit=1000))
+    threshold = prices[len(prices) // 2]
+
+    properties = scraper.search_properties_advanced(**dated, limit=300, raw_filter={"min_price": threshold})
+
+    assert len(properties) == 300
+    assert all(prop.list_price >= threshold for prop in properties)
+
+
+def test_shared_deduplicator_still_fills_a_planned_search(standin):
+    config, _, base_url = standin
+    config.total = 1000
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    deduplicator = Deduplicator()
+    dated = dict(location="Dallas, TX", listing_type="sold", date_from="2024-01-01", date_to="2024-12-31",
+                 limit=300, deduplicator=deduplicator)
+
+    first = scraper.search_properties_advanced(**dated)
+    second = scraper.search_properties_advanced(**dated)
+
+    assert len(first) == len(second) == 300
+    assert not {prop.property_id for prop in first} & {prop.property_id for prop in second}
+
+
+def test_shared_deduplicator_skips_homes_from_earlier_searches(standin):
+    config, _, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    deduplicator = Deduplicator()
+
+    first = scraper.search_properties_advanced(location="Dallas, TX", limit=30, deduplicator=deduplicator)
+    second = scraper.search_properties_advanced(location="75201", limit=200, deduplicator=deduplicator)
+
+    assert len(first) == 30
+    assert len(second) == config.page_size - 30
+    assert not {prop.property_id for prop in first} & {prop.property_id for prop in second}
+
+
+def test_homes_rejected_by_one_search_stay_unseen(standin):
+    config, _, base_url = standin
+    scraper = DreameryPropertyScraper(base_url=base_url)
+    deduplicator = Deduplicator()
+    everything = scraper.search_properties_advanced(location="Dallas, TX")
+    threshold = sorted(prop.list_price for prop in everything)[len(everything) // 2]
+
+    expensive = scraper.search_properties_advanced(location="Dallas, TX", raw_filter={"min_price": threshold},
+                                                   deduplicator=deduplicator)
+    rest = scraper.search_properties_advanced(location="Dallas, TX", deduplicator=deduplicator)
+
+    assert 0 < len(expensive) < config.page_size
+    assert len(expensive) + len(rest) == config.page_size
+    assert all(prop.list_price < threshold for prop in rest)
+
+
+def test_scraper_is_shared_safely_across_threads(standin):
+    config, stats, base_url = standin
+    config.latency_ms = 50
+    scraper = DreameryPropertyScraper(base_url=base_url)
+
+    def search(_):
+        return scraper.get_access_token(), scraper.session, len(scraper.search_properties_advanced(location="Dallas, TX"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(search, range(8)))
+
+    # One token fetch, one Session per thread, all mounted on the same connection pool
+    assert len({token for token, _, _ in results}) == 1
+    assert stats.snapshot()["auth_token.200"] == 1
+    sessions = {id(session): session for _, session, _ in results}.values()
+    assert len(sessions) == 8
+    assert len({id(session.get_adapter(base_url)) for session in sessions}) == 1
+    assert all(count == config.page_size for _, _, count in results)
+
+
+def test_config_endpoint_parses_booleans_explicitly():
+    config = StandinConfig()
+    client = create_app(config).test_client()
+
+    assert client.post("/_standin/config", json={"persisted_queries": "false"}).status_code == 200
+    assert config.persisted_queries is False
+    assert client.post("/_standin/config", json={"persisted_queries": 1}).get_json()["persisted_queries"] is True
+
+    response = client.post("/_standin/config", json={"page_size": 10, "persisted_queries": "nope"})
+    assert response.status_code == 400
+    assert config.page_size == 200 and config.persisted_queries is True
@@ -0,0 +1,55 @@
+import os
+import sys
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_planner import SpatialTilePlanner, Tile, haversine_miles
+
+PAGE_SIZE = 10
+CENTER = (32.78, -96.80)
+
+
+def _home(index: int, lat: float, lon: float):
+    return {"property_id": str(index), "location": {"address": {"coordinate": {"lat": lat, "lon": lon}}}}
+
+
+HOMES = [_home(row * 20 + col, CENTER[0] - 0.05 + row * 0.005, CENTER[1] - 0.05 + col * 0.005)
+         for row in range(20) for col in range(20)]
+
+
+def _fetch_page(variables):
+    lon, lat = variables["coordinates"]
+    radius = float(variables["radius"].rstrip("mi"))
+    matching = [home for home in HOMES if haversine_miles(lat, lon, *_coordinates(home)) <= radius]
+    return matching[variables["offset"]:variables["offset"] + PAGE_SIZE], len(matching)
+
+
+def _coordinates(home):
+    coordinate = home["location"]["address"]["coordinate"]
+    return coordinate["lat"], coordinate["lon"]
+
+
+def test_a_tile_that_keeps_failing_marks_the_result_incomplete(caplog):
+    root = Tile.around(*CENTER, 3)
+    failing = root.split()[3]
+    calls = []
+
+    def fetch_page(variables):
+        if variables["coordinates"] == [failing.center[1], failing.center[0]]:
+            calls.append(variables)
+            raise ConnectionError("upstream 503")
+        return _fetch_page(variables)
+
+    planner = SpatialTilePlanner(fetch_page, retry_backoff=0)
+    homes = planner.search_radius(*CENTER, 3)
+
+    in_radius = [home for home in HOMES if haversine_miles(*CENTER, *_coordinates(home)) <= 3]
+    expected = {home["property_id"] for home in in_radius if not failing.contains(*_coordinates(home))}
+    assert len(expected) < len(in_radius)
+    assert {home["property_id"] for home in homes} == expected
+    assert len(calls) == planner.max_attempts
+    assert planner.last_stats.failures == 1 and planner.last_stats.retries == planner.max_attempts - 1
+    assert not planner.last_stats.complete
+    assert "INCOMPLETE" in caplog.text
+
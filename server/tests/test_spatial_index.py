@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the server directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors import process_property
+from property_store import PropertyStore
+from search_planner import haversine_miles
+from spatial_index import SpatialIndex, StoreSpatialIndex, haversine_miles_array
+from synthetic_data import synthesize_homes
+
+
+def test_queries_match_brute_force():
+    rng = np.random.default_rng(7)
+    latitudes, longitudes = rng.uniform(32, 33, 20_000), rng.uniform(-97.5, -96.5, 20_000)
+    index = SpatialIndex(latitudes, longitudes, cell_degrees=0.013)
+
+    for _ in range(25):
+        south, west = rng.uniform(31.9, 32.9), rng.uniform(-97.6, -96.6)
+        north, east = south + rng.uniform(0, 0.3), west + rng.uniform(0, 0.3)
+        expected = np.nonzero((latitudes >= south) & (latitudes <= north)
+                              & (longitudes >= west) & (longitudes <= east))[0]
+        assert np.array_equal(np.sort(index.bbox(south, west, north, east)), expected)
+
+        lat, lon, radius = rng.uniform(32, 33), rng.uniform(-97.5, -96.5), rng.uniform(0, 4)
+        miles = haversine_miles_array(lat, lon, latitudes, longitudes)
+        positions, distances = index.radius(lat, lon, radius)
+        assert np.array_equal(np.sort(positions), np.nonzero(miles <= radius)[0])
+        assert np.all(np.diff(distances) >= 0)
+        nearest, _ = index.radius(lat, lon, radius, limit=3)
+        assert np.array_equal(nearest, positions[:3])
+
+    assert haversine_miles_array(32.7, -96.8, np.array([33.1]), np.array([-97.2]))[0] == pytest.approx(
+        haversine_miles(32.7, -96.8, 33.1, -97.2))
+    with pytest.raises(ValueError):
+        index.bbox(33, -97, 32, -96)
+
+
+def test_store_index_returns_stored_properties_by_distance(tmp_path):
+    store = PropertyStore(f"sqlite:///{tmp_path / 'store.db'}")
+    properties = [prop for prop in (process_property(home) for home in synthesize_homes(200)) if prop]
+    store.save_properties(properties)
+    center = properties[0]
+
+    matches = StoreSpatialIndex(store).radius(center.latitude, center.longitude, 2.0, limit=10)
+
+    expected = sorted(
+        (haversine_miles(center.latitude, center.longitude, prop.latitude, prop.longitude), prop.property_id)
+        for prop in properties if prop.latitude is not None
+    )
+    expected = [(property_id, miles) for miles, property_id in expected if miles <= 2.0][:10]
+    assert [(prop.property_id, pytest.approx(miles)) for prop, miles in matches] == expected
+    assert matches[0][0].property_id == center.property_id
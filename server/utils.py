@@ -1,10 +1,12 @@
 from __future__ import annotations
-from typing import Union, List, Dict
-import pandas as pd
+from typing import TYPE_CHECKING, Any, Union, List, Dict
 from datetime import datetime
 from models import Property, ListingType, Advertisers
 from exceptions import InvalidListingType, InvalidDate
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 ordered_properties = [
     "property_url",
     "property_id",
@@ -74,8 +76,16 @@ ordered_properties = [
 
 
 def process_result(result: Property) -> pd.DataFrame:
+    import pandas as pd
+
+    return pd.DataFrame([property_row(result)], columns=ordered_properties)
+
+
+def property_row(result: Property) -> Dict[str, Any]:
+    """One row of the scrape_property DataFrame, keyed by ordered_properties"""
     prop_data = {prop: None for prop in ordered_properties}
-    prop_data.update(result.model_dump())
+    # alt_photos is filled below from the raw hrefs, without URL validation
+    prop_data.update(result.model_dump(exclude={"description": {"alt_photos"}}))
 
     if "address" in prop_data and prop_data["address"]:
         address_data = prop_data["address"]
@@ -132,7 +142,8 @@ def process_result(result: Property) -> pd.DataFrame:
     description = result.description
     if description:
         prop_data["primary_photo"] = str(description.primary_photo) if description.primary_photo else None
-        prop_data["alt_photos"] = ", ".join(str(url) for url in description.alt_photos) if description.alt_photos else None
+        alt_photo_urls = description.alt_photo_urls()
+        prop_data["alt_photos"] = ", ".join(alt_photo_urls) if alt_photo_urls else None
         prop_data["style"] = (
             description.style
             if isinstance(description.style, str)
@@ -149,10 +160,7 @@ def process_result(result: Property) -> pd.DataFrame:
         prop_data["stories"] = description.stories
         prop_data["text"] = description.text
 
-    properties_df = pd.DataFrame([prop_data])
-    properties_df = properties_df.reindex(columns=ordered_properties)
-
-    return properties_df[ordered_properties]
+    return {prop: prop_data[prop] for prop in ordered_properties}
 
 
 def validate_input(listing_type: str) -> None: